@@ -0,0 +1,13 @@
+"""Timings of the team balancer by lobby size: python -m benchmarks.team_balance"""
+import random
+import timeit
+from helper.team_balance import best_splits, pick_split
+
+rng = random.Random(42)
+print(f"{'players':>7} {'best_splits':>12} {'pick_split':>12}")
+for n in range(2, 21):
+    ratings = [rng.randint(0, 3200) for _ in range(n)]
+    runs = 200 if n <= 14 else 20
+    split_time = timeit.timeit(lambda: best_splits(ratings), number=runs) / runs
+    pick_time = timeit.timeit(lambda: pick_split(ratings, tolerance=100, rng=rng), number=runs) / runs
+    print(f"{n:>7} {split_time * 1e6:>10.1f}µs {pick_time * 1e6:>10.1f}µs")
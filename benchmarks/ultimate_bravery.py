@@ -0,0 +1,49 @@
+"""Per-build cost of Ultimate Bravery builds: python -m benchmarks.ultimate_bravery"""
+import time
+import random
+from helper.ultimate_bravery import BraveryPool, BuildCode, ROLES, FULL_ITEM_GOLD, MASTERWORK_ITEMS
+from tests.test_ultimate_bravery import make_patch
+
+rng = random.Random(1)
+patch = make_patch(rng)
+
+start = time.perf_counter()
+pool = BraveryPool(patch, "sr")
+print(f"Pool build: {(time.perf_counter() - start) * 1000:.2f}ms "
+      f"({len(pool.champions)} champions, {len(pool.boots)} boots, {len(pool.full_items)} full items)")
+
+def legacy_roll(mode, taken_champions, taken_roles):
+    # The previous per-build work: rebuild every pool from the patch, then sample
+    champions = [c for c in patch.champions.keys() if c not in taken_champions]
+    rng.choice(champions)
+    roles = [r for r in ROLES if r not in taken_roles]
+    rng.choice(roles)
+    valid_spells = [s["name"] for s in patch.spells if "CLASSIC" in s["modes"]]
+    rng.sample(valid_spells, 2)
+    rift_items = patch.items_by_map.get("11", frozenset())
+    boots = sorted(patch.items[i]["name"] for i in patch.items_by_tag.get("Boots", frozenset()) & rift_items)
+    full_items = sorted(
+        patch.items[i]["name"] for i in patch.items_with_gold_at_least(FULL_ITEM_GOLD) & rift_items
+        if patch.items[i]["name"] not in MASTERWORK_ITEMS
+    )
+    [rng.choice(boots)] + rng.sample(full_items, 5)
+    primary = rng.choice(patch.runes)
+    secondary = rng.choice([p for p in patch.runes if p["id"] != primary["id"]])
+    rng.sample([r for slot in secondary["slots"][1:] for r in slot["runes"]], 2)
+
+def lobby(semi):
+    seed = rng.getrandbits(32)
+    for index in range(10):
+        pool.build_for(BuildCode("sr", "1.0.1", seed, 10, index, semi=semi))
+
+rounds = 20000
+taken = ["Champ1", "Champ2", "Champ3", "Champ4"]
+for label, roll, builds in (("legacy", lambda: legacy_roll("sr", taken, ["TOP"]), 1),
+                            ("build code", lambda: pool.build_for(BuildCode("sr", "1.0.1", rng.getrandbits(32), 10, rng.randrange(10))), 1),
+                            ("lobby of 10", lambda: lobby(semi=False), 10),
+                            ("semi-brave lobby of 10", lambda: lobby(semi=True), 10),
+                            ("semi-brave reroll", lambda: pool.build_for(BuildCode("sr", "1.0.1", 7, 10, 3, rng.randrange(50), semi=True)), 1)):
+    start = time.perf_counter()
+    for _ in range(rounds // builds):
+        roll()
+    print(f"{label:<24} {(time.perf_counter() - start) / rounds * 1e6:8.1f}µs per build")
@@ -6,8 +6,14 @@ import sys
 import asyncio
 from helper.card_emojis import CardEmojiManager
 from helper.db import Database
+from helper.http_client import HttpClient
+from helper.http_cache import ResponseCache
+from helper.ddragon import DataDragonStore
+from helper.message_edits import EditCoalescer
+from helper.identity_store import IdentityStore
+from helper.steam_apps import SteamAppCatalog
 from logger import get_logger
-from config import DISCORDBOT_TOKEN
+from config import DISCORDBOT_TOKEN, STEAM_API_KEY
 
 log = get_logger(__name__)
 
@@ -56,9 +62,30 @@ async def run_bot():
         log.error(f"Failed to initialize database: {e}")
         return  # Verhindere, dass der Bot ohne DB weiterläuft
 
-    async with bot:
-        await load_extensions()
-        await bot.start(DISCORDBOT_TOKEN)
+    # Shared HTTP client and response cache used by all cogs for external APIs
+    bot.http_client = HttpClient(cache=ResponseCache())
+    bot.ddragon = DataDragonStore(bot.http_client)
+    # Vanity URL and Riot ID resolutions, kept in the database across restarts
+    bot.identities = IdentityStore(bot.db)
+    # Names of all Steam apps, memory-mapped from disk and refreshed daily
+    bot.steam_apps = SteamAppCatalog(bot.http_client, STEAM_API_KEY)
+    # Lobby message edits of all game cogs, merged per message
+    bot.message_edits = EditCoalescer()
+
+    try:
+        async with bot:
+            # Load League of Legends static data before the cogs need it
+            await bot.ddragon.load()
+            bot.ddragon.start()
+            bot.steam_apps.load()
+            bot.steam_apps.start()
+            await load_extensions()
+            await bot.start(DISCORDBOT_TOKEN)
+    finally:
+        bot.ddragon.stop()
+        bot.steam_apps.stop()
+        log.info(bot.message_edits.summary())
+        await bot.http_client.close()
 
 # -----------------------------------------
 # 🔧 CLI ENTRYPOINT FOR SYNCING SLASH COMMANDS
@@ -67,6 +94,7 @@ async def run_bot():
 
 async def sync_commands():
     # Globally sync all slash commands without running the bot
+    bot.http_client = HttpClient()
     try:
         await bot.login(DISCORDBOT_TOKEN)
         await load_extensions()  # Ensure all app_commands are loaded
@@ -77,6 +105,7 @@ async def sync_commands():
         log.error(f"Failed to sync commands: {e}")
     finally:
         await bot.close()
+        await bot.http_client.close()
 
 # -----------------------------------------
 # Main entry point for running or syncing the bot
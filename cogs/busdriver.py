@@ -35,6 +35,7 @@ class Busdriver(commands.GroupCog, name="busdriverv2"):
             self.points = {}  # Points scored by each player
             self.results = {}  # Results of each player's turn
             self.game_message = None  # The game message for interaction
+            self.lobby_view = None  # The lobby view, reused by every lobby update
             self.awaiting_continue = False  # Whether the game is waiting for a player to continue
             self.sips_given = {}  # player_id -> int
             self.sips_drunk = {}  # player_id -> int
@@ -53,6 +54,7 @@ class Busdriver(commands.GroupCog, name="busdriverv2"):
             session = self.GameSession(interaction.user)  # Create a new game session
             self.sessions[guild_id] = session
             view = LobbyView(self, guild_id)  # Create a lobby view for players to join
+            session.lobby_view = view
 
             # Send an embed message to display the lobby
             embed = discord.Embed(title="Busdriver Lobby", description="Players:\n*(no one)*", color=discord.Color.orange())
@@ -96,11 +98,14 @@ class Busdriver(commands.GroupCog, name="busdriverv2"):
         """Updates the lobby message with the current list of players."""
         try:
             session = self.sessions[guild_id]
-            player_list = "\n".join([p.display_name for p in session.players]) or "*no one*"
 
-            embed = discord.Embed(title="Busdriver Lobby", description=f"Players:\n{player_list}", color=discord.Color.orange())
-            await session.game_message.edit(embed=embed, view=LobbyView(self, guild_id))
-            log.info(f"Updated lobby for guild {guild_id}.")
+            def render():
+                player_list = "\n".join([p.display_name for p in session.players]) or "*no one*"
+                embed = discord.Embed(title="Busdriver Lobby", description=f"Players:\n{player_list}", color=discord.Color.orange())
+                return {"embed": embed, "view": session.lobby_view}
+
+            # Joins and leaves in quick succession end up in one edit
+            self.bot.message_edits.request(session.game_message, render)
         except Exception as e:
             # Log and handle unexpected errors
             log.error(f"Error updating lobby for guild {guild_id}: {e}")
@@ -110,6 +115,7 @@ class Busdriver(commands.GroupCog, name="busdriverv2"):
         try:
             session = self.sessions[guild_id]
             session.started = True
+            self.bot.message_edits.discard(session.game_message)  # No lobby update may overwrite the game
             session.deck = generate_standard_deck()  # Generate a shuffled deck
 
             for player in session.players:
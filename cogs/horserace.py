@@ -108,21 +108,21 @@ class HorseRace(commands.GroupCog, name="horserace"):
         """Updates the lobby message with the current list of players."""
         session = self.sessions[guild_id]
 
-        desc = ""
-        for p in session.players.values():
-            suit = p["horse"]
-            emoji = self.bot.card_emojis.get(f"A{suit}", "❓")
-            desc += f"{p['member'].mention} {emoji} {p['bet']} sips\n"
+        def render():
+            desc = ""
+            for p in session.players.values():
+                suit = p["horse"]
+                emoji = self.bot.card_emojis.get(f"A{suit}", "❓")
+                desc += f"{p['member'].mention} {emoji} {p['bet']} sips\n"
 
-        if not desc:
-            desc = "*No one yet*"
+            if not desc:
+                desc = "*No one yet*"
 
-        embed = discord.Embed(title="🐎 Horse Race Lobby", description=desc, color=discord.Color.green())
-        try:
-            await session.message.edit(embed=embed, view=PregameView(self, guild_id))
-            log.info(f"Updated lobby for guild {guild_id}.")
-        except Exception as e:
-            log.error(f"Failed to update lobby for guild {guild_id}: {e}")
+            embed = discord.Embed(title="🐎 Horse Race Lobby", description=desc, color=discord.Color.green())
+            return {"embed": embed, "view": session.lobby_view}
+
+        # Joins and leaves in quick succession end up in one edit
+        self.bot.message_edits.request(session.message, render)
 
     async def start_race_game(self, guild_id, channel):
         """Starts the actual race game."""
@@ -352,6 +352,7 @@ class PregameView(discord.ui.View):
             return
 
         session.lobby_view.stop()  # Stop the lobby view
+        self.cog.bot.message_edits.discard(session.message)  # Drop lobby updates that are still pending
         await session.message.edit(view=None)  # Clear the lobby view
         await self.cog.start_race_game(self.guild_id, interaction.channel)  # Start the race
 
@@ -20,6 +20,7 @@ class KingsCup(commands.GroupCog, name="kingscup"):
             self.mates = {}  # user_id -> mate_id
             self.kings_drawn = 0
             self.message = None
+            self.lobby_view = None
 
         def create_deck(self):
             suits = ["Hearts", "Diamonds", "Spades", "Clubs"]
@@ -37,6 +38,7 @@ class KingsCup(commands.GroupCog, name="kingscup"):
         self.sessions[guild_id] = session
 
         view = KingsCupLobbyView(self, guild_id)
+        session.lobby_view = view
         embed = discord.Embed(title="👑 Kings Cup Lobby", description="Join the game before it starts!",
                               color=discord.Color.gold())
         session.message = await interaction.response.send_message(embed=embed, view=view)
@@ -67,6 +69,18 @@ class KingsCup(commands.GroupCog, name="kingscup"):
             "A": "Waterfall - Everyone drinks in order!"
         }
 
+    async def update_lobby(self, guild_id):
+        session = self.sessions[guild_id]
+
+        def render():
+            players = "\n".join(member.display_name for member in session.players.values()) or "*No one yet*"
+            embed = discord.Embed(title="👑 Kings Cup Lobby", description=f"Join the game before it starts!\n\nPlayers:\n{players}",
+                                  color=discord.Color.gold())
+            return {"embed": embed, "view": session.lobby_view}
+
+        # Joins and leaves in quick succession end up in one edit
+        self.bot.message_edits.request(session.message, render)
+
     async def update_game_embed(self, guild_id):
         session = self.sessions[guild_id]
         embed = discord.Embed(title="Kings Cup In Progress", color=discord.Color.dark_gold())
@@ -94,6 +108,7 @@ class KingsCup(commands.GroupCog, name="kingscup"):
 
     async def start_kingscup(self, guild_id, channel):
         session = self.sessions[guild_id]
+        self.bot.message_edits.discard(session.message)
         await session.message.edit(view=None)
 
         embed = discord.Embed(title="Kings Cup Started!", description="Game is running in voice/video chat.",
@@ -1,42 +1,59 @@
 import discord
-from discord.ext import commands
+import asyncio
+from discord.ext import commands, tasks
 from discord import app_commands
 from discord.ui import View, button, Button
-import aiohttp
 import random
 import re
 from urllib.parse import quote
+from helper.riot_client import RiotClient, PRIORITY_BACKGROUND
+from helper.live_game_watcher import LiveGameWatcher
+from helper.match_store import MatchStore, summarize_matches, aggregate
+from helper.league_ranks import rank_score, format_rank, pick_solo_entry, parse_rank
+from helper.team_balance import pick_split
+from helper.identity_store import KIND_RIOT_ID, IdentityLookupError
+from helper.riot_routing import PlatformLocator, platform_host, regional_host, account_host, DEFAULT_PLATFORM, AUTO
+from datetime import timedelta
 from logger import get_logger
 from config import RIOT_API_KEY
 
 log = get_logger(__name__)
 
-VERSION = "14.9.1"
-BASE_URL = f"http://ddragon.leagueoflegends.com/cdn/{VERSION}/data/en_US"
-CHAMPION_URL = f"{BASE_URL}/champion.json"
+# Regions selectable in commands, "auto" probes the likely platforms
+REGION_CHOICES = [
+    app_commands.Choice(name="Auto-detect", value=AUTO),
+    app_commands.Choice(name="EUW", value="euw1"),
+    app_commands.Choice(name="EUNE", value="eun1"),
+    app_commands.Choice(name="NA", value="na1"),
+    app_commands.Choice(name="KR", value="kr"),
+    app_commands.Choice(name="JP", value="jp1"),
+    app_commands.Choice(name="TR", value="tr1"),
+    app_commands.Choice(name="BR", value="br1"),
+    app_commands.Choice(name="LAN", value="la1"),
+    app_commands.Choice(name="LAS", value="la2"),
+    app_commands.Choice(name="OCE", value="oc1"),
+    app_commands.Choice(name="ME", value="me1"),
+]
+DETAIL_TIMEOUT = 5  # Seconds each detail request of /lol stats may take before it is shown as unknown
+LIVE_GAME_TIMEOUT = 3  # Seconds the spectator request may take before the live status is shown as unknown
+
+# Background refresh of linked accounts
+REFRESH_LOOP_MINUTES = 10  # Minutes between refresh batches
+REFRESH_MAX_AGE = timedelta(hours=1)  # Linked accounts older than this are refreshed
+REFRESH_BUDGET_SHARE = 0.1  # Share of the Riot application rate limit the refresher may use
+REQUESTS_PER_REFRESH = 3  # Summoner, league entries and mastery score
 
 class League(commands.GroupCog, name="lol"):
     """Main class for League of Legends-related commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.champion_mapping = None  # Cache for champion ID-to-name mapping
-
-    async def get_champion_mapping(self):
-        """Fetches and caches the champion ID-to-name mapping from Riot's API"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(CHAMPION_URL) as resp:
-                    if resp.status != 200:
-                        log.error(f"Failed to fetch champion mapping. HTTP Status: {resp.status}")
-                        return {}
-                    data = await resp.json()
-                    champions = data['data']
-                    log.info("Successfully fetched champion mapping.")
-                    return {int(info['key']): name for name, info in champions.items()}
-        except Exception as e:
-            log.error(f"Error fetching champion mapping: {e}")
-            return {}
+        self.riot = RiotClient(bot.http_client, RIOT_API_KEY)  # Rate-limited Riot API client
+        self.locator = PlatformLocator(self.riot)  # Finds and remembers the platform of an account
+        self.watcher = LiveGameWatcher(self.riot, self.announce_game_start, self.announce_game_end)
+        self.watch_channels = {}  # puuid -> set of channel IDs that announce the player's games
+        self.matches = MatchStore(self.riot)  # Permanent on-disk match cache
+        self.refresh_linked_accounts.start()
 
     @staticmethod
     def parse_riot_id(input_str: str):
@@ -57,112 +74,511 @@ class League(commands.GroupCog, name="lol"):
 
         return game_name, tag_line
 
+    @staticmethod
+    def error_message(status, not_found_text):
+        """Returns the user-facing message for a failed Riot API request"""
+        if status == 404:
+            return not_found_text
+        if status == 429:
+            return "The Riot API is busy right now. Please try again in a moment."
+        return "The Riot API is currently unavailable. Please try again later."
+
+    async def fetch_optional(self, host, method, path, timeout, not_found=None, cache=True):
+        """Fetches a Riot endpoint whose result is optional for the response
+        Returns the decoded data, `not_found` for a 404, or None if the request failed or timed out"""
+        try:
+            resp = await asyncio.wait_for(self.riot.get(host, method, path, cache=cache), timeout=timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"Riot request {method} timed out after {timeout}s.")
+            return None
+        except Exception as e:
+            log.warning(f"Riot request {method} failed: {e}")
+            return None
+
+        if resp.status == 404:
+            return not_found
+        if resp.status != 200:
+            log.warning(f"Riot request {method} failed. HTTP Status: {resp.status}")
+            return None
+        return resp.data
+
+    async def resolve_riot_id(self, riot_id, platform=None):
+        """Resolves a Riot ID to its account data
+        Returns (status, account) where account is None unless the status is 200"""
+        parsed = self.parse_riot_id(riot_id)
+        if not parsed:
+            return 404, None
+        game_name, tag_line = parsed
+
+        async def lookup_account():
+            resp = await self.riot.get(account_host(platform or DEFAULT_PLATFORM), "account-v1.by-riot-id",
+                                       f"/riot/account/v1/accounts/by-riot-id/{quote(game_name)}/{quote(tag_line)}", cache=False)
+            if resp.status == 404:
+                return None
+            if resp.status != 200:
+                raise IdentityLookupError(resp.status)
+            return resp.data
+
+        # Known Riot IDs come from the identity store without any request
+        try:
+            account = await self.bot.identities.resolve(KIND_RIOT_ID, f"{game_name}#{tag_line}", lookup_account)
+        except IdentityLookupError as e:
+            log.warning(f"Riot ID lookup failed. HTTP Status: {e.status}")
+            return e.status, None
+        return (200, account) if account is not None else (404, None)
+
+    async def resolve_platform(self, puuid, region):
+        """Returns the platform for an account: the chosen region, or the probed one in auto mode"""
+        if region and region != AUTO:
+            self.locator.remember(puuid, region)
+            return region
+        return await self.locator.locate(puuid)
+
+    async def resolve_player(self, interaction, riot_id, region, ephemeral=False):
+        """Resolves a Riot ID and the platform the account plays on
+        Returns (account, platform), or (None, None) after sending an error message"""
+        status, account = await self.resolve_riot_id(riot_id, None if region in (None, AUTO) else region)
+        if account is None:
+            await interaction.followup.send(self.error_message(status, "Riot ID not found or invalid. Use the format Name#Tag."), ephemeral=ephemeral)
+            return None, None
+
+        platform = await self.resolve_platform(account["puuid"], region)
+        if platform is None:
+            await interaction.followup.send("No League account found for this Riot ID on the usual servers. Please pick a region.", ephemeral=ephemeral)
+            return None, None
+        return account, platform
+
     @commands.Cog.listener()
     async def on_ready(self):
         """Event listener triggered when the bot is ready"""
         log.info("League module loaded and ready.")
+        self.reload_watches()
+        self.watcher.start()
+
+    async def cog_unload(self):
+        """Stops the background tasks when the cog is unloaded"""
+        self.watcher.stop()
+        self.refresh_linked_accounts.cancel()
+
+    ## LINKED ACCOUNTS
+
+    def refresh_batch_size(self):
+        """Returns how many linked accounts one refresh batch may update within its rate budget"""
+        bucket = self.riot.limiter.app_bucket(platform_host(DEFAULT_PLATFORM))
+        rates = [window.limit / window.seconds for window in bucket.windows]
+        if not rates:
+            return 0
+        budget = REFRESH_BUDGET_SHARE * min(rates) * REFRESH_LOOP_MINUTES * 60
+        return max(1, int(budget // REQUESTS_PER_REFRESH))
+
+    @tasks.loop(minutes=REFRESH_LOOP_MINUTES)
+    async def refresh_linked_accounts(self):
+        """Task that refreshes rank, LP and mastery of the least recently updated linked accounts"""
+        try:
+            accounts = self.bot.db.get_stale_lol_accounts(REFRESH_MAX_AGE, self.refresh_batch_size())
+        except Exception as e:
+            log.error(f"Error loading linked League accounts for refresh: {e}")
+            return
+
+        results = await asyncio.gather(*(self.refresh_account(a["puuid"], a["platform"]) for a in accounts), return_exceptions=True)
+        failed = sum(1 for r in results if r is not True)
+        if accounts:
+            log.info(f"Refreshed {len(accounts) - failed}/{len(accounts)} linked League accounts.")
+
+    async def refresh_account(self, puuid, platform):
+        """Fetches and stores the current rank, LP and mastery score of a linked account"""
+        host = platform_host(platform)
+        resp = await self.riot.get(host, "summoner-v4.by-puuid", f"/lol/summoner/v4/summoners/by-puuid/{puuid}", priority=PRIORITY_BACKGROUND, cache=False)
+        if resp.status != 200:
+            log.warning(f"Refreshing linked account failed. HTTP Status: {resp.status}")
+            return False
+        summoner = resp.data
+
+        entries_resp, score_resp = await asyncio.gather(
+            self.riot.get(host, "league-v4.entries-by-summoner", f"/lol/league/v4/entries/by-summoner/{summoner['id']}", priority=PRIORITY_BACKGROUND, cache=False),
+            self.riot.get(host, "champion-mastery-v4.scores", f"/lol/champion-mastery/v4/scores/by-puuid/{puuid}", priority=PRIORITY_BACKGROUND, cache=False),
+        )
+        if entries_resp.status != 200 or score_resp.status != 200:
+            log.warning(f"Refreshing linked account failed. HTTP Status: {entries_resp.status}/{score_resp.status}")
+            return False
+
+        entry = pick_solo_entry(entries_resp.data) or {}
+        self.bot.db.update_lol_account_stats(
+            puuid, summoner["id"], summoner.get("summonerLevel"),
+            entry.get("tier"), entry.get("rank"), entry.get("leaguePoints"), entry.get("wins"), entry.get("losses"),
+            score_resp.data
+        )
+        return True
+
+    @refresh_linked_accounts.before_loop
+    async def before_refresh(self):
+        """Waits until the bot is ready before starting the refresh task"""
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="link", description="Links your Discord account to your Riot ID.")
+    @app_commands.describe(riot_id="Riot ID in the format Name#Tag", region="Server the account plays on")
+    @app_commands.choices(region=REGION_CHOICES)
+    async def link(self, interaction: discord.Interaction, riot_id: str, region: app_commands.Choice[str] = None):
+        """Links the user's Discord account to a Riot account"""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            account, platform = await self.resolve_player(interaction, riot_id, region.value if region else AUTO, ephemeral=True)
+            if account is None:
+                return
+
+            display_id = f"{account.get('gameName', '')}#{account.get('tagLine', '')}"
+            self.bot.db.link_lol_account(interaction.user.id, account["puuid"], display_id, platform)
+            await interaction.followup.send(f"Linked your account to **{display_id}**. Use `/lol stats` without a name to see your own stats.", ephemeral=True)
+            log.info(f"{interaction.user.display_name} linked Riot ID {display_id}.")
+
+            # Fill in rank and mastery right away so the leaderboard includes the new account
+            await self.refresh_account(account["puuid"], platform)
+        except Exception as e:
+            log.error(f"Error linking Riot ID {riot_id}: {e}")
+            await interaction.followup.send("An error occurred while linking your account. Please try again later.", ephemeral=True)
+
+    @app_commands.command(name="unlink", description="Removes the link between your Discord account and your Riot ID.")
+    async def unlink(self, interaction: discord.Interaction):
+        """Removes the user's linked Riot account"""
+        try:
+            if self.bot.db.unlink_lol_account(interaction.user.id):
+                await interaction.response.send_message("Your Riot account has been unlinked.", ephemeral=True)
+            else:
+                await interaction.response.send_message("You have no linked Riot account.", ephemeral=True)
+        except Exception as e:
+            log.error(f"Error unlinking Riot account of {interaction.user.id}: {e}")
+            await interaction.response.send_message("An error occurred while unlinking your account. Please try again later.", ephemeral=True)
+
+    @app_commands.command(name="leaderboard", description="Shows the rank ladder of this server's linked League accounts.")
+    async def leaderboard(self, interaction: discord.Interaction):
+        """Displays the linked members of the server ordered by rank and LP"""
+        try:
+            members = {m.id: m for m in interaction.guild.members if not m.bot}
+            accounts = self.bot.db.get_lol_accounts_for_users(members.keys())
+            if not accounts:
+                await interaction.response.send_message("No one on this server has linked a Riot account yet. Use `/lol link`.", ephemeral=True)
+                return
+
+            def sort_key(pair):
+                account = pair[1]
+                score = rank_score(account["tier"], account["division"], account["league_points"])
+                return (score is not None, score or 0)
+
+            lines = []
+            for position, (discord_id, account) in enumerate(sorted(accounts, key=sort_key, reverse=True)[:20], start=1):
+                rank = format_rank(account["tier"], account["division"], account["league_points"])
+                lines.append(f"{position}. {members[discord_id].display_name} ({account['riot_id']}) – {rank}")
+
+            embed = discord.Embed(title="🏆 League Leaderboard", description="\n".join(lines), color=discord.Color.gold())
+            embed.set_footer(text="Ranks are refreshed in the background every hour")
+            await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            log.error(f"Error creating League leaderboard: {e}")
+            await interaction.response.send_message("An error occurred while creating the leaderboard. Please try again later.", ephemeral=True)
+
+    ## LIVE GAME WATCHER
+
+    def reload_watches(self):
+        """Loads all watched players from the database and updates the watcher"""
+        try:
+            watch_channels = {}
+            riot_ids = {}
+            for _, channel_id, puuid, riot_id, platform in self.bot.db.get_lol_watches():
+                watch_channels.setdefault(puuid, set()).add(channel_id)
+                riot_ids[puuid] = (riot_id, platform)
+
+            for puuid in list(self.watcher.players):
+                if puuid not in watch_channels:
+                    self.watcher.unwatch(puuid)
+            for puuid, (riot_id, platform) in riot_ids.items():
+                self.watcher.watch(puuid, riot_id, platform_host(platform))
+            self.watch_channels = watch_channels
+            log.info(f"Watching {len(watch_channels)} League players for live games.")
+        except Exception as e:
+            log.error(f"Error loading watched League players: {e}")
+
+    async def announce(self, puuid, message):
+        """Sends a live game update to every channel watching the player"""
+        for channel_id in self.watch_channels.get(puuid, ()):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                continue
+            try:
+                await channel.send(message)
+            except Exception as e:
+                log.warning(f"Failed to announce live game update in channel {channel_id}: {e}")
+
+    async def announce_game_start(self, player, game):
+        game_mode = game.get("gameMode", "Unknown")
+        await self.announce(player.puuid, f"🎮 **{player.riot_id}** just started a game → Mode: {game_mode}")
+
+    async def announce_game_end(self, player, duration):
+        minutes = round(duration / 60)
+        await self.announce(player.puuid, f"🏁 **{player.riot_id}** finished their game after about {minutes} minutes.")
+
+    @app_commands.command(name="watchchannel", description="Sets the channel for live game announcements. Leave empty to disable them.")
+    @app_commands.default_permissions(manage_guild=True)
+    async def watchchannel(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
+        """Sets or clears the live game announcement channel of the server"""
+        try:
+            self.bot.db.set_lol_watch_channel(interaction.guild.id, channel.id if channel else None)
+            self.reload_watches()
+            if channel:
+                await interaction.response.send_message(f"Live games of watched players will be announced in {channel.mention}.", ephemeral=True)
+            else:
+                await interaction.response.send_message("Live game announcements disabled.", ephemeral=True)
+            log.info(f"Live game channel for guild {interaction.guild.id} set to {channel.id if channel else None}.")
+        except Exception as e:
+            log.error(f"Error setting live game channel: {e}")
+            await interaction.response.send_message("An error occurred while saving the channel. Please try again later.", ephemeral=True)
+
+    @staticmethod
+    def may_watch(interaction, linked, puuid):
+        """Members may watch their own linked account, anyone else's needs Manage Server"""
+        own = linked is not None and linked["puuid"] == puuid
+        return own or interaction.user.guild_permissions.manage_guild
+
+    @app_commands.command(name="watch", description="Announces when a player starts or finishes a League game.")
+    @app_commands.describe(riot_id="Riot ID in the format Name#Tag. Leave empty for your linked account.", region="Server the account plays on")
+    @app_commands.choices(region=REGION_CHOICES)
+    async def watch(self, interaction: discord.Interaction, riot_id: str = None, region: app_commands.Choice[str] = None):
+        """Adds the caller's linked account, or with Manage Server any Riot ID, to the watched players of the server"""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            linked = self.bot.db.get_lol_account(interaction.user.id)
+            if riot_id is None:
+                if linked is None:
+                    await interaction.followup.send("You have no linked Riot account. Use `/lol link` first.", ephemeral=True)
+                    return
+                puuid, display_id, platform = linked["puuid"], linked["riot_id"], linked["platform"]
+            else:
+                account, platform = await self.resolve_player(interaction, riot_id, region.value if region else AUTO, ephemeral=True)
+                if account is None:
+                    return
+                puuid = account["puuid"]
+                display_id = f"{account.get('gameName', '')}#{account.get('tagLine', '')}"
+
+            if not self.may_watch(interaction, linked, puuid):
+                await interaction.followup.send("You can only watch your own linked account. Watching other players requires the Manage Server permission.", ephemeral=True)
+                return
+
+            self.bot.db.add_lol_watched_player(interaction.guild.id, puuid, display_id, platform)
+            self.reload_watches()
+            await interaction.followup.send(f"Now watching **{display_id}**. Games are announced once a channel is set with `/lol watchchannel`.", ephemeral=True)
+            log.info(f"Guild {interaction.guild.id} now watches {display_id}.")
+        except Exception as e:
+            log.error(f"Error adding watched player {riot_id}: {e}")
+            await interaction.followup.send("An error occurred while adding the player. Please try again later.", ephemeral=True)
+
+    @app_commands.command(name="unwatch", description="Stops announcing a player's League games.")
+    @app_commands.describe(riot_id="Riot ID in the format Name#Tag. Leave empty for your linked account.")
+    async def unwatch(self, interaction: discord.Interaction, riot_id: str = None):
+        """Removes the caller's linked account, or with Manage Server any Riot ID, from the watched players of the server"""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            linked = self.bot.db.get_lol_account(interaction.user.id)
+            if riot_id is None:
+                if linked is None:
+                    await interaction.followup.send("You have no linked Riot account. Use `/lol link` first.", ephemeral=True)
+                    return
+                puuid, riot_id = linked["puuid"], linked["riot_id"]
+            else:
+                status, account = await self.resolve_riot_id(riot_id)
+                if account is None:
+                    await interaction.followup.send(self.error_message(status, "Riot ID not found or invalid. Use the format Name#Tag."), ephemeral=True)
+                    return
+                puuid = account["puuid"]
+
+            if not self.may_watch(interaction, linked, puuid):
+                await interaction.followup.send("You can only unwatch your own linked account. Unwatching other players requires the Manage Server permission.", ephemeral=True)
+                return
+
+            if self.bot.db.remove_lol_watched_player(interaction.guild.id, puuid):
+                self.reload_watches()
+                await interaction.followup.send(f"Stopped watching **{riot_id}**.", ephemeral=True)
+            else:
+                await interaction.followup.send(f"**{riot_id}** is not being watched.", ephemeral=True)
+        except Exception as e:
+            log.error(f"Error removing watched player {riot_id}: {e}")
+            await interaction.followup.send("An error occurred while removing the player. Please try again later.", ephemeral=True)
 
     @app_commands.command(name="stats", description="Shows League of Legends stats based on Riot ID or Summoner Name")
-    async def lolstats(self, interaction: discord.Interaction, summoner_name: str):
+    @app_commands.describe(summoner_name="Riot ID (Name#Tag) or Summoner Name. Leave empty for your linked account.", region="Server the account plays on")
+    @app_commands.choices(region=REGION_CHOICES)
+    async def lolstats(self, interaction: discord.Interaction, summoner_name: str = None, region: app_commands.Choice[str] = None):
         """Fetches and displays League of Legends stats for a given Riot ID or Summoner Name"""
         await interaction.response.defer()
-        log.info(f"Fetching stats for: {summoner_name}")
-
-        if self.champion_mapping is None:
-            # Fetch champion mapping if not already cached
-            self.champion_mapping = await self.get_champion_mapping()
+        log.info(f"Fetching stats for: {summoner_name or interaction.user.display_name}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                parsed = self.parse_riot_id(summoner_name)
-
-                if parsed:
-                    # Handle Riot ID format
-                    game_name, tag_line = parsed
-                    url = f"https://europe.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{quote(game_name)}/{quote(tag_line)}?api_key={RIOT_API_KEY}"
-                    async with session.get(url) as resp:
-                        if resp.status != 200:
-                            log.warning(f"Riot ID not found or invalid. HTTP Status: {resp.status}")
-                            await interaction.followup.send("Riot ID not found or invalid.")
-                            return
-                        account_data = await resp.json()
-                        puuid = account_data["puuid"]
-
-                    summoner_url = f"https://euw1.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}?api_key={RIOT_API_KEY}"
-                else:
-                    # Handle Summoner Name format
-                    safe_name = quote(summoner_name.strip())
-                    summoner_url = f"https://euw1.api.riotgames.com/lol/summoner/v4/summoners/by-name/{safe_name}?api_key={RIOT_API_KEY}"
-
-                async with session.get(summoner_url) as resp:
-                    if resp.status != 200:
-                        log.warning(f"Summoner not found. HTTP Status: {resp.status}")
-                        await interaction.followup.send("Summoner not found.")
-                        return
-                    summoner_data = await resp.json()
-
-                # Extract summoner details
-                summoner_id = summoner_data["id"]
-                puuid = summoner_data["puuid"]
-                summoner_name = summoner_data.get("name", summoner_name)
-                level = summoner_data.get("summonerLevel", "Unknown")
-
-                # Fetch ranked stats
-                ranked_url = f"https://euw1.api.riotgames.com/lol/league/v4/entries/by-summoner/{summoner_id}?api_key={RIOT_API_KEY}"
-                async with session.get(ranked_url) as resp:
-                    ranked_data = await resp.json()
-
-                if ranked_data:
-                    ranked_info = ranked_data[0]
-                    ranked_text = f"{ranked_info['tier']} {ranked_info['rank']} - {ranked_info['leaguePoints']} LP\nWins: {ranked_info['wins']} | Losses: {ranked_info['losses']}"
-                else:
-                    ranked_text = "Unranked"
-
-                # Fetch champion mastery score
-                mastery_score_url = f"https://euw1.api.riotgames.com/lol/champion-mastery/v4/scores/by-puuid/{puuid}?api_key={RIOT_API_KEY}"
-                async with session.get(mastery_score_url) as resp:
-                    mastery_score = await resp.json()
-
-                # Fetch top champion mastery
-                mastery_url = f"https://euw1.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}?api_key={RIOT_API_KEY}"
-                async with session.get(mastery_url) as resp:
-                    mastery_data = await resp.json()
-
-                top_champions = []
-                for champ in mastery_data[:3]:
-                    champ_id = champ['championId']
-                    champ_points = champ['championPoints']
-                    champ_name = self.champion_mapping.get(champ_id, f"Champion {champ_id}")
-                    top_champions.append(f"{champ_name}: {champ_points} points")
-
-                # Check live game status
-                live_url = f"https://euw1.api.riotgames.com/lol/spectator/v5/active-games/by-summoner/{summoner_id}?api_key={RIOT_API_KEY}"
-                async with session.get(live_url) as resp:
-                    live_status = "**Currently not in a game.**"
-                    if resp.status == 200:
-                        live_game = await resp.json()
-                        game_mode = live_game.get("gameMode", "Unknown")
-                        live_status = f"**Currently in a game → Mode: {game_mode}**"
-
-                # Build and send the embed
-                embed = discord.Embed(title=f"{summoner_name} → Level {level}", color=discord.Color.blue())
-                embed.add_field(name="Rank", value=ranked_text, inline=False)
-                embed.add_field(name="Total Champion Points", value=f"{mastery_score} points", inline=False)
-                embed.add_field(name="Top Champions", value="\n".join(top_champions), inline=False)
-                embed.add_field(name="Live Status", value=live_status, inline=False)
-
-                await interaction.followup.send(embed=embed)
-                log.info(f"Successfully fetched stats for {summoner_name}.")
+            riot = self.riot
+            region = region.value if region else AUTO
+
+            if summoner_name is None:
+                # Use the linked account, which already knows its PUUID
+                linked = self.bot.db.get_lol_account(interaction.user.id)
+                if linked is None:
+                    await interaction.followup.send("You have no linked Riot account. Use `/lol link` or pass a Riot ID.")
+                    return
+                summoner_name = linked["riot_id"]
+                platform = region if region != AUTO else linked["platform"]
+                host = platform_host(platform)
+                resp = await riot.get(host, "summoner-v4.by-puuid", f"/lol/summoner/v4/summoners/by-puuid/{linked['puuid']}")
+            elif self.parse_riot_id(summoner_name):
+                # Handle Riot ID format, the platform is detected unless a region was chosen
+                account, platform = await self.resolve_player(interaction, summoner_name, region)
+                if account is None:
+                    return
+                host = platform_host(platform)
+                resp = await riot.get(host, "summoner-v4.by-puuid", f"/lol/summoner/v4/summoners/by-puuid/{account['puuid']}")
+            else:
+                # Handle Summoner Name format, names are only unique per platform
+                host = platform_host(region if region != AUTO else DEFAULT_PLATFORM)
+                safe_name = quote(summoner_name.strip())
+                resp = await riot.get(host, "summoner-v4.by-name", f"/lol/summoner/v4/summoners/by-name/{safe_name}")
+
+            if resp.status != 200:
+                log.warning(f"Summoner lookup failed. HTTP Status: {resp.status}")
+                await interaction.followup.send(self.error_message(resp.status, "Summoner not found."))
+                return
+            summoner_data = resp.data
+
+            # Extract summoner details
+            summoner_id = summoner_data["id"]
+            puuid = summoner_data["puuid"]
+            summoner_name = summoner_data.get("name", summoner_name)
+            level = summoner_data.get("summonerLevel", "Unknown")
+
+            # Fetch ranked stats, mastery and live game status concurrently
+            ranked_data, mastery_score, mastery_data, live_game = await asyncio.gather(
+                self.fetch_optional(host, "league-v4.entries-by-summoner", f"/lol/league/v4/entries/by-summoner/{summoner_id}", DETAIL_TIMEOUT),
+                self.fetch_optional(host, "champion-mastery-v4.scores", f"/lol/champion-mastery/v4/scores/by-puuid/{puuid}", DETAIL_TIMEOUT),
+                self.fetch_optional(host, "champion-mastery-v4.masteries", f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}", DETAIL_TIMEOUT),
+                self.fetch_optional(host, "spectator-v5.active-game", f"/lol/spectator/v5/active-games/by-summoner/{puuid}", LIVE_GAME_TIMEOUT, not_found=False, cache=False),
+            )
+
+            if ranked_data is None:
+                ranked_text = "Unknown"
+            elif ranked_data:
+                ranked_info = ranked_data[0]
+                ranked_text = f"{ranked_info['tier']} {ranked_info['rank']} - {ranked_info['leaguePoints']} LP\nWins: {ranked_info['wins']} | Losses: {ranked_info['losses']}"
+            else:
+                ranked_text = "Unranked"
+
+            mastery_text = f"{mastery_score} points" if mastery_score is not None else "Unknown"
+
+            # Champion names come from the locally stored Data Dragon patch
+            patch = self.bot.ddragon.current
+            champion_names = patch.champion_names_by_key if patch else {}
+
+            top_champions = []
+            for champ in (mastery_data or [])[:3]:
+                champ_id = champ['championId']
+                champ_points = champ['championPoints']
+                champ_name = champion_names.get(champ_id, f"Champion {champ_id}")
+                top_champions.append(f"{champ_name}: {champ_points} points")
+            top_text = "\n".join(top_champions) or ("Unknown" if mastery_data is None else "No champions played yet.")
+
+            # Live game status: a game object, False if not in a game, None if unknown
+            if live_game is None:
+                live_status = "**Live status unknown.**"
+            elif live_game is False:
+                live_status = "**Currently not in a game.**"
+            else:
+                game_mode = live_game.get("gameMode", "Unknown")
+                live_status = f"**Currently in a game → Mode: {game_mode}**"
+
+            # Build and send the embed
+            embed = discord.Embed(title=f"{summoner_name} → Level {level}", color=discord.Color.blue())
+            embed.add_field(name="Rank", value=ranked_text, inline=False)
+            embed.add_field(name="Total Champion Points", value=mastery_text, inline=False)
+            embed.add_field(name="Top Champions", value=top_text, inline=False)
+            embed.add_field(name="Live Status", value=live_status, inline=False)
+
+            await interaction.followup.send(embed=embed)
+            log.info(f"Successfully fetched stats for {summoner_name}.")
         except Exception as e:
             # Log and handle unexpected errors
             log.error(f"Error fetching stats for {summoner_name}: {e}")
             await interaction.followup.send("An error occurred while fetching stats. Please try again later.")
 
+    async def load_match_summaries(self, interaction, riot_id, count, region):
+        """Resolves a Riot ID and loads the player's recent matches
+        Returns (display_id, summaries), or (None, None) after sending an error message"""
+        account, platform = await self.resolve_player(interaction, riot_id, region.value if region else AUTO)
+        if account is None:
+            return None, None
+
+        puuid = account["puuid"]
+        matches = await self.matches.get_recent_matches(regional_host(platform), puuid, count)
+        display_id = f"{account.get('gameName', '')}#{account.get('tagLine', '')}"
+        return display_id, summarize_matches(matches, puuid)
+
+    @app_commands.command(name="history", description="Shows the most recent League matches of a player.")
+    @app_commands.describe(riot_id="Riot ID in the format Name#Tag", count="Number of matches (1-20)", region="Server the account plays on")
+    @app_commands.choices(region=REGION_CHOICES)
+    async def history(self, interaction: discord.Interaction, riot_id: str, count: app_commands.Range[int, 1, 20] = 10, region: app_commands.Choice[str] = None):
+        """Displays a player's most recent matches with champion, KDA and result"""
+        await interaction.response.defer()
+        try:
+            display_id, summaries = await self.load_match_summaries(interaction, riot_id, count, region)
+            if summaries is None:
+                return
+            if not summaries:
+                await interaction.followup.send("No matches found.")
+                return
+
+            lines = [
+                f"{'✅' if s.win else '❌'} **{s.champion}** {s.kills}/{s.deaths}/{s.assists} "
+                f"({s.kda:.2f} KDA) · {s.queue} · {s.duration // 60} min · <t:{s.played_at}:R>"
+                for s in summaries
+            ]
+            embed = discord.Embed(title=f"Match History → {display_id}", description="\n".join(lines), color=discord.Color.blue())
+            await interaction.followup.send(embed=embed)
+            log.info(f"Sent match history for {display_id} ({len(summaries)} matches).")
+        except Exception as e:
+            log.error(f"Error fetching match history for {riot_id}: {e}")
+            await interaction.followup.send("An error occurred while fetching the match history. Please try again later.")
+
+    @app_commands.command(name="recap", description="Summarizes win rate, KDA and champion pool over recent matches.")
+    @app_commands.describe(riot_id="Riot ID in the format Name#Tag", count="Number of matches (1-50)", region="Server the account plays on")
+    @app_commands.choices(region=REGION_CHOICES)
+    async def recap(self, interaction: discord.Interaction, riot_id: str, count: app_commands.Range[int, 1, 50] = 20, region: app_commands.Choice[str] = None):
+        """Displays aggregated stats over a player's most recent matches"""
+        await interaction.response.defer()
+        try:
+            display_id, summaries = await self.load_match_summaries(interaction, riot_id, count, region)
+            if summaries is None:
+                return
+            if not summaries:
+                await interaction.followup.send("No matches found.")
+                return
+
+            stats = aggregate(summaries)
+            champion_lines = [
+                f"**{champ}**: {played} games, {wins / played * 100:.0f}% WR"
+                for champ, played, wins in stats["champions"][:5]
+            ]
+
+            embed = discord.Embed(title=f"Recap → {display_id}", description=f"Last {stats['games']} matches", color=discord.Color.gold())
+            embed.add_field(name="Win Rate", value=f"{stats['win_rate']:.0f}% ({stats['wins']}W / {stats['games'] - stats['wins']}L)", inline=True)
+            embed.add_field(name="Average KDA", value=f"{stats['kills']:.1f} / {stats['deaths']:.1f} / {stats['assists']:.1f} ({stats['kda']:.2f})", inline=True)
+            embed.add_field(name="Champion Pool", value="\n".join(champion_lines), inline=False)
+            await interaction.followup.send(embed=embed)
+            log.info(f"Sent recap for {display_id} ({stats['games']} matches).")
+        except Exception as e:
+            log.error(f"Error creating recap for {riot_id}: {e}")
+            await interaction.followup.send("An error occurred while creating the recap. Please try again later.")
+
     @app_commands.command(name="randomgroups", description="Creates a custom game lobby and generates two random teams.")
-    async def randomgroups(self, interaction: discord.Interaction):
-        """Creates a custom game lobby and generates two random teams"""
+    @app_commands.describe(
+        balanced="Balance the teams by rank (linked accounts or a rating set in the lobby)",
+        randomness="Rating points a split may be worse than the most balanced one (balanced mode)"
+    )
+    async def randomgroups(self, interaction: discord.Interaction, balanced: bool = False, randomness: app_commands.Range[int, 0, 400] = 100):
+        """Creates a custom game lobby and generates two random or skill-balanced teams"""
         try:
-            view = TeamLobby(interaction.user)
+            view = TeamLobby(interaction.user, self.bot.db if balanced else None, randomness)
             embed = view.get_lobby_embed()
             await interaction.response.send_message(embed=embed, view=view)
             log.info(f"Custom lobby created by {interaction.user.display_name}.")
@@ -174,11 +590,16 @@ class League(commands.GroupCog, name="lol"):
 ## VIEWS & BUTTONS
 
 class TeamLobby(View):
-    def __init__(self, author: discord.User):
+    def __init__(self, author: discord.User, db=None, tolerance=0):
         super().__init__(timeout=300)  # Lobby läuft max. 5 Minuten
         self.players = []
         self.author = author
         self.message = None
+        self.db = db  # Set in balanced mode to look up the ranks of linked accounts
+        self.tolerance = tolerance  # Rating points a balanced split may be worse than the best one
+        self.manual_ratings = {}  # user ID -> rating entered in the lobby, overrides linked ranks
+        if db is None:
+            self.remove_item(self.set_rating)
 
     @button(label="Join", style=discord.ButtonStyle.green)
     async def join(self, interaction: discord.Interaction, button: Button):
@@ -188,7 +609,8 @@ class TeamLobby(View):
             return
 
         self.players.append(user)
-        await interaction.response.edit_message(embed=self.get_lobby_embed(), view=self)
+        await interaction.response.defer()
+        self.request_update(interaction)
 
     @button(label="Leave", style=discord.ButtonStyle.red)
     async def leave(self, interaction: discord.Interaction, button: Button):
@@ -198,7 +620,8 @@ class TeamLobby(View):
             return
 
         self.players.remove(user)
-        await interaction.response.edit_message(embed=self.get_lobby_embed(), view=self)
+        await interaction.response.defer()
+        self.request_update(interaction)
 
     @button(label="Generate Teams", style=discord.ButtonStyle.blurple)
     async def generate(self, interaction: discord.Interaction, button: Button):
@@ -210,18 +633,39 @@ class TeamLobby(View):
             await interaction.response.send_message("Need at least 2 players to generate teams.", ephemeral=True)
             return
 
-        team1, team2 = self.split_teams(self.players)
-        embed = discord.Embed(title="Teams Generated", color=discord.Color.green())
-        embed.add_field(name="Team 1", value="\n".join(p.display_name for p in team1), inline=True)
-        embed.add_field(name="Team 2", value="\n".join(p.display_name for p in team2), inline=True)
+        if self.db is not None:
+            ratings = self.load_ratings()
+            team1, team2 = self.split_balanced(self.players, ratings)
+            embed = discord.Embed(title="Balanced Teams Generated", color=discord.Color.green())
+            for name, team in (("Team 1", team1), ("Team 2", team2)):
+                average = sum(ratings[p.id] for p in team) / len(team)
+                embed.add_field(name=f"{name} (Ø {average:.0f})", value="\n".join(p.display_name for p in team), inline=True)
+            embed.set_footer(text="Ratings: 100 per division plus LP. Unrated players count as the lobby average.")
+        else:
+            team1, team2 = self.split_teams(self.players)
+            embed = discord.Embed(title="Teams Generated", color=discord.Color.green())
+            embed.add_field(name="Team 1", value="\n".join(p.display_name for p in team1), inline=True)
+            embed.add_field(name="Team 2", value="\n".join(p.display_name for p in team2), inline=True)
 
         for child in self.children:
             child.disabled = True
 
+        interaction.client.message_edits.discard(interaction.message)
         await interaction.response.edit_message(embed=embed, view=self)
 
+    @button(label="Set Rating", style=discord.ButtonStyle.grey)
+    async def set_rating(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.send_modal(RatingModal(self))
+
+    def request_update(self, interaction):
+        # Joins and leaves in quick succession end up in one edit
+        interaction.client.message_edits.request(interaction.message, lambda: {"embed": self.get_lobby_embed(), "view": self})
+
     def get_lobby_embed(self):
-        embed = discord.Embed(title="Custom Lobby", description="Click 'Join' to participate", color=discord.Color.blue())
+        description = "Click 'Join' to participate"
+        if self.db is not None:
+            description += "\nTeams are balanced by the ranks of linked accounts. Use 'Set Rating' if you have none."
+        embed = discord.Embed(title="Custom Lobby", description=description, color=discord.Color.blue())
         if self.players:
             embed.add_field(name="Current Players", value="\n".join(p.display_name for p in self.players), inline=False)
         else:
@@ -235,6 +679,42 @@ class TeamLobby(View):
         mid = len(shuffled) // 2
         return shuffled[:mid], shuffled[mid:]
 
+    def load_ratings(self):
+        """Returns user ID -> rating for all players. Manual ratings win over linked ranks,
+        players without either get the average of the rated players"""
+        ratings = {}
+        try:
+            for discord_id, account in self.db.get_lol_accounts_for_users([p.id for p in self.players]):
+                score = rank_score(account["tier"], account["division"], account["league_points"])
+                if score is not None:
+                    ratings[discord_id] = score
+        except Exception as e:
+            log.error(f"Error loading ranks for balanced teams: {e}")
+        ratings.update(self.manual_ratings)
+
+        known = [ratings[p.id] for p in self.players if p.id in ratings]
+        default = round(sum(known) / len(known)) if known else 0
+        return {p.id: ratings.get(p.id, default) for p in self.players}
+
+    def split_balanced(self, players, ratings):
+        _, team1, team2 = pick_split([ratings[p.id] for p in players], tolerance=self.tolerance)
+        return [players[i] for i in team1], [players[i] for i in team2]
+
+class RatingModal(discord.ui.Modal, title="Set Your Rating"):
+    def __init__(self, lobby):
+        super().__init__()
+        self.lobby = lobby
+        self.rank_input = discord.ui.TextInput(label="Your rank", placeholder="e.g. Gold 2, Diamond I 40 LP or 1450", required=True, max_length=30)
+        self.add_item(self.rank_input)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        score = parse_rank(self.rank_input.value)
+        if score is None:
+            await interaction.response.send_message("Could not read that rank. Try something like `Gold 2` or `Master 120`.", ephemeral=True)
+            return
+        self.lobby.manual_ratings[interaction.user.id] = score
+        await interaction.response.send_message(f"Your rating for this lobby is **{score}**.", ephemeral=True)
+
 async def setup(bot):
     """Setup function to add the League cog to the bot"""
     try:
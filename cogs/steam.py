@@ -1,55 +1,193 @@
 import discord
-from discord.ext import commands
+import asyncio
+from discord.ext import commands, tasks
 from discord import app_commands
-import aiohttp
 import re
-from difflib import get_close_matches
+from datetime import timedelta
+from helper.game_search import LibraryIndexCache
+from helper.steam_library import LibraryCache, parse_owned_games
+from helper.identity_store import KIND_STEAM_VANITY, IdentityLookupError
+from helper.latency import LatencyTracker
+from helper.steam_presence import PlayerSummaryCache, PERSONA_STATES
+from helper.steam_achievements import AchievementSchema, SchemaCache, SCHEMA_URL, PLAYER_ACHIEVEMENTS_URL
 from logger import get_logger
 from config import STEAM_API_KEY
 
 log = get_logger(__name__)
 
+AUTOCOMPLETE_LOG_INTERVAL = 500  # Autocomplete latency percentiles are logged every this many calls
+MENTION_PATTERN = re.compile(r"<@!?(\d+)>")
+MAX_COMPARED_ACHIEVEMENTS = 15  # Rows of the achievement comparison table
+
+# Background sync of linked libraries
+SYNC_LOOP_MINUTES = 5  # Minutes between sync batches
+SYNC_MAX_AGE = timedelta(hours=12)  # Linked libraries older than this are synced again
+SYNC_BATCH_SIZE = 10  # Libraries synced per batch
+SYNC_SPACING = 5  # Seconds between two GetOwnedGames requests of the sync
+
 class Steam(commands.GroupCog, name="steam"):
     """Main class for Steam-related commands."""
 
     def __init__(self, bot):
         """Initializes the Steam cog with the bot instance."""
         self.bot = bot
+        self.libraries = LibraryCache()  # SteamID64 -> parsed owned games
+        self.library_indexes = LibraryIndexCache()  # SteamID64 -> search index of the owned games
+        self.warming = set()  # Identifiers whose library is being loaded for autocomplete
+        self.warm_tasks = set()  # Running warm_library tasks, referenced so they are not garbage collected
+        self.autocomplete_latency = LatencyTracker("Steam game autocomplete")
+        self.summaries = PlayerSummaryCache(bot.http_client, STEAM_API_KEY)  # Batched, briefly shared player summaries
+        self.schemas = SchemaCache()  # appid -> parsed achievement schema
+        self.sync_linked_libraries.start()
 
     @commands.Cog.listener()
     async def on_ready(self):
         """Event listener triggered when the bot is ready."""
         log.info("Steam module loaded and ready.")
 
+    async def cog_unload(self):
+        """Stops the background sync when the cog is unloaded."""
+        self.sync_linked_libraries.cancel()
+        for task in self.warm_tasks:
+            task.cancel()
+        log.info(self.autocomplete_latency.summary())
+
+    ## LINKED ACCOUNTS
+
+    @tasks.loop(minutes=SYNC_LOOP_MINUTES)
+    async def sync_linked_libraries(self):
+        """Task that stores the owned games of the least recently synced linked accounts."""
+        try:
+            accounts = self.bot.db.get_stale_steam_accounts(SYNC_MAX_AGE, SYNC_BATCH_SIZE)
+        except Exception as e:
+            log.error(f"Error loading linked Steam accounts for sync: {e}")
+            return
+
+        synced = 0
+        for user_id, steamid in accounts:
+            # One request at a time keeps the sync at a fixed, low request rate
+            try:
+                synced += await self.sync_library(user_id, steamid)
+            except Exception as e:
+                log.error(f"Error syncing the Steam library of {steamid}: {e}")
+            await asyncio.sleep(SYNC_SPACING)
+        if accounts:
+            log.info(f"Synced {synced}/{len(accounts)} linked Steam libraries.")
+
+    async def sync_library(self, user_id, steamid):
+        """Fetches the owned games of a linked account and stores them. Returns True on success."""
+        library = await self.fetch_owned_games(steamid)
+        if library is None:
+            return False
+        self.bot.db.replace_steam_library(user_id, list(zip(library.appids, library.names, library.playtime_forever)))
+        return True
+
+    @sync_linked_libraries.before_loop
+    async def before_sync(self):
+        """Waits until the bot is ready before starting the sync task."""
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="link", description="Links your Discord account to your Steam account.")
+    @app_commands.describe(steamid="SteamID64, profile URL or custom URL")
+    async def link(self, interaction: discord.Interaction, steamid: str):
+        """Links the user's Discord account to a Steam account."""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            steamid64 = await self.get_steamid(steamid)
+            if not steamid64:
+                await self.send_invalid_identifier(interaction, steamid)
+                return
+
+            user_id = self.bot.db.link_steam_account(interaction.user.id, steamid64)
+            if await self.sync_library(user_id, steamid64):
+                message = "Linked your Steam account. Your games now show up in `/steam whoowns` and `/steam common`."
+            else:
+                message = "Linked your Steam account, but your games could not be loaded. Make sure your game details are public."
+            await interaction.followup.send(message, ephemeral=True)
+            log.info(f"{interaction.user.display_name} linked Steam account {steamid64}.")
+        except Exception as e:
+            log.error(f"Error linking Steam account {steamid}: {e}")
+            await interaction.followup.send("An error occurred while linking your account. Please try again later.", ephemeral=True)
+
+    @app_commands.command(name="unlink", description="Removes the link between your Discord and Steam accounts.")
+    async def unlink(self, interaction: discord.Interaction):
+        """Removes the user's linked Steam account."""
+        try:
+            if self.bot.db.unlink_steam_account(interaction.user.id):
+                await interaction.response.send_message("Your Steam account has been unlinked.", ephemeral=True)
+            else:
+                await interaction.response.send_message("You have no linked Steam account.", ephemeral=True)
+        except Exception as e:
+            log.error(f"Error unlinking Steam account of {interaction.user.id}: {e}")
+            await interaction.response.send_message("An error occurred while unlinking your account. Please try again later.", ephemeral=True)
+
+    @app_commands.command(name="whoowns", description="Shows which members of this server own a game.")
+    @app_commands.describe(game="Name of the game")
+    async def whoowns(self, interaction: discord.Interaction, game: str):
+        """Lists the linked server members owning a game, answered from the synced libraries."""
+        try:
+            matches = self.bot.db.search_steam_games(game, limit=1)
+            if not matches:
+                await interaction.response.send_message(f"No linked member owns a game matching `{game}`.", ephemeral=True)
+                return
+            appid, name = matches[0]
+
+            members = {m.id: m for m in interaction.guild.members if not m.bot}
+            owners = self.bot.db.get_steam_game_owners(appid, members.keys())
+            lines = [f"{members[discord_id].display_name} – {round(playtime / 60)} h" for discord_id, playtime in owners[:40]]
+            if len(owners) > 40:
+                lines.append(f"…and {len(owners) - 40} more")
+
+            embed = discord.Embed(title=f"🎮 Who owns {name}? ({len(owners)})", url=f"https://store.steampowered.com/app/{appid}",
+                                  description="\n".join(lines) or "No one on this server.", color=discord.Color.blue())
+            embed.set_footer(text="Based on linked Steam accounts, synced in the background")
+            await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            log.error(f"Error looking up owners of {game}: {e}")
+            await interaction.response.send_message("An error occurred while looking up the game. Please try again later.", ephemeral=True)
+
+    @staticmethod
+    def split_identifier(identifier):
+        """Splits a Steam identifier into (steamid64, vanity). Exactly one of both is set."""
+        # Check if the identifier is a valid SteamID64
+        if identifier.isdigit() and len(identifier) >= 17:
+            return identifier, None
+
+        # Check if the identifier is a profile URL and extract the ID or vanity
+        url_pattern = r"(?:https?://)?steamcommunity\.com/(id|profiles)/([^/]+)/?"
+        match = re.match(url_pattern, identifier)
+        if match:
+            identifier = match.group(2)
+            if match.group(1) == "profiles" and identifier.isdigit():
+                return identifier, None  # It's already a SteamID64
+        return None, identifier
+
     async def get_steamid(self, identifier):
         """Resolves a Steam identifier (SteamID64, profile URL, or vanity URL) to a SteamID64."""
         try:
-            # Check if the identifier is a valid SteamID64
-            if identifier.isdigit() and len(identifier) >= 17:
-                return identifier
-
-            # Check if the identifier is a profile URL and extract the ID or vanity
-            url_pattern = r"(?:https?://)?steamcommunity\.com/(id|profiles)/([^/]+)/?"
-            match = re.match(url_pattern, identifier)
-            if match:
-                identifier = match.group(2)
-                if match.group(1) == "profiles" and identifier.isdigit():
-                    return identifier  # It's already a SteamID64
-
-            # Try resolving the identifier as a vanity URL
-            url = f"https://api.steampowered.com/ISteamUser/ResolveVanityURL/v1/?key={STEAM_API_KEY}&vanityurl={identifier}"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        log.warning(f"Failed to resolve vanity URL. HTTP Status: {resp.status}")
-                        return None
-                    data = await resp.json()
-                    if data["response"]["success"] == 1:
-                        log.info(f"Successfully resolved vanity URL to SteamID64: {data['response']['steamid']}")
-                        return data["response"]["steamid"]
-
-            # Could not resolve the identifier
-            log.warning(f"Could not resolve identifier: {identifier}")
+            steamid64, identifier = self.split_identifier(identifier)
+            if steamid64:
+                return steamid64
+
+            # Try resolving the identifier as a vanity URL, known ones come from the identity store
+            async def resolve_vanity():
+                url = f"https://api.steampowered.com/ISteamUser/ResolveVanityURL/v1/?key={STEAM_API_KEY}&vanityurl={identifier}"
+                resp = await self.bot.http_client.get_json(url, cache=False)
+                if resp.status != 200:
+                    raise IdentityLookupError(resp.status)
+                data = resp.data
+                if data["response"]["success"] == 1:
+                    log.info(f"Successfully resolved vanity URL to SteamID64: {data['response']['steamid']}")
+                    return data["response"]["steamid"]
+                return None
+
+            steamid64 = await self.bot.identities.resolve(KIND_STEAM_VANITY, identifier, resolve_vanity)
+            if steamid64 is None:
+                # Could not resolve the identifier
+                log.warning(f"Could not resolve identifier: {identifier}")
+            return steamid64
+        except IdentityLookupError as e:
+            log.warning(f"Failed to resolve vanity URL: {e}")
             return None
         except Exception as e:
             # Log and handle unexpected errors
@@ -82,41 +220,70 @@ class Steam(commands.GroupCog, name="steam"):
             # Log and handle unexpected errors
             log.error(f"Error sending invalid identifier message: {e}")
     
-    @staticmethod
-    def find_best_match(games, user_input):
-        """Finds the best matching game from a list of games based on user input."""
-        user_input = re.sub(r'\W+', '', user_input).lower()
-        exact = []
-        starts = []
-        contains = []
-
-        for game in games:
-            raw_name = game.get("name", "")
-            normalized_name = re.sub(r'\W+', '', raw_name).lower()
-
-            if normalized_name == user_input:
-                exact.append(game)
-            elif normalized_name.startswith(user_input):
-                starts.append(game)
-            elif user_input in normalized_name:
-                contains.append(game)
-
-        if exact:
-            return exact[0]
-        if starts:
-            return starts[0]
-        if contains:
-            from difflib import get_close_matches
-            norm_names = [re.sub(r'\W+', '', g["name"]).lower() for g in contains]
-            matches = get_close_matches(user_input, norm_names, n=1, cutoff=0.0)
-            if matches:
-                for g in contains:
-                    if re.sub(r'\W+', '', g["name"]).lower() == matches[0]:
-                        return g
-            contains.sort(key=lambda g: g.get("playtime_forever", 0), reverse=True)
-            return contains[0]
-
-        return None
+    async def fetch_owned_games(self, steamid64):
+        """Fetches the owned games of a SteamID64. Returns an OwnedLibrary, or None if the request failed."""
+        library = self.libraries.get(steamid64)
+        if library is not None:
+            return library
+        url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={STEAM_API_KEY}&steamid={steamid64}&include_appinfo=true"
+        # Large libraries are parsed game by game into a compact library instead of full dicts
+        resp = await self.bot.http_client.get_json(url, decoder=parse_owned_games)
+        if resp.status != 200 or resp.data is None:
+            log.warning(f"Failed to fetch owned games of {steamid64}. HTTP Status: {resp.status}")
+            return None
+        return self.libraries.put(steamid64, resp.data)
+
+    async def get_library_index(self, steamid64):
+        """Returns the search index of a library, built on the first lookup of that library.
+        Returns None if the library could not be fetched."""
+        index = self.library_indexes.get(steamid64)
+        if index is not None:
+            return index
+        games = await self.fetch_owned_games(steamid64)
+        if games is None:
+            return None
+        return self.library_indexes.put(steamid64, games)
+
+    async def warm_library(self, identifier):
+        """Resolves an identifier and loads its library index in the background, for autocomplete."""
+        try:
+            steamid64 = await self.get_steamid(identifier)
+            if steamid64:
+                await self.get_library_index(steamid64)
+        except Exception as e:
+            log.warning(f"Error warming the library of {identifier}: {e}")
+        finally:
+            self.warming.discard(identifier)
+
+    async def game_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Suggests games of the chosen account's library. Only answers from memory, a library
+        that is not loaded yet is fetched in the background for the next keystroke."""
+        with self.autocomplete_latency.measure():
+            identifier = (interaction.namespace.steamid or "").strip()
+            if not identifier:
+                return []
+
+            steamid64, vanity = self.split_identifier(identifier)
+            if vanity:
+                _, steamid64 = self.bot.identities.peek(KIND_STEAM_VANITY, vanity)
+            library = self.library_indexes.get(steamid64) if steamid64 else None
+
+            if library is None:
+                if identifier not in self.warming:
+                    self.warming.add(identifier)
+                    task = asyncio.create_task(self.warm_library(identifier))
+                    self.warm_tasks.add(task)
+                    task.add_done_callback(self.warm_tasks.discard)
+                return []
+
+            choices = [
+                app_commands.Choice(name=game.name[:100], value=game.name[:100])
+                for game in library.suggest(current) if game.name
+            ]
+
+        if self.autocomplete_latency.count % AUTOCOMPLETE_LOG_INTERVAL == 0:
+            log.info(self.autocomplete_latency.summary())
+        return choices
 
     @app_commands.command(name="profile", description="Shows the Steam profile of a player.")
     async def steamprofile(self, interaction: discord.Interaction, steamid: str):
@@ -130,21 +297,16 @@ class Steam(commands.GroupCog, name="steam"):
                 await self.send_invalid_identifier(interaction, steamid)
                 return
 
-            url = f"https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/?key={STEAM_API_KEY}&steamids={steamid64}"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        log.warning(f"Failed to fetch profile. HTTP Status: {resp.status}")
-                        await interaction.followup.send("Failed to fetch Steam profile.")
-                        return
-                    data = await resp.json()
+            player = (await self.summaries.get([steamid64])).get(steamid64)
+            if player is None:
+                await interaction.followup.send("Failed to fetch Steam profile.")
+                return
 
-            player = data["response"]["players"][0]
             embed = discord.Embed(title=player["personaname"], url=player["profileurl"], color=discord.Color.blue())
             embed.set_thumbnail(url=player["avatarfull"])
 
             # Add account status and creation time
-            status = player.get("personastate", "Unknown")
+            status = PERSONA_STATES.get(player.get("personastate"), "Unknown")
             embed.add_field(name="Status", value=status)
 
             time_created = player.get("timecreated")
@@ -181,13 +343,12 @@ class Steam(commands.GroupCog, name="steam"):
                 return
 
             url = f"https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v1/?key={STEAM_API_KEY}&steamid={steamid64}"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        log.warning(f"Failed to fetch recent games. HTTP Status: {resp.status}")
-                        await interaction.followup.send("Failed to fetch recently played games.")
-                        return
-                    data = await resp.json()
+            resp = await self.bot.http_client.get_json(url)
+            if resp.status != 200:
+                log.warning(f"Failed to fetch recent games. HTTP Status: {resp.status}")
+                await interaction.followup.send("Failed to fetch recently played games.")
+                return
+            data = resp.data
 
             games = data.get("response", {}).get("games", [])
 
@@ -207,6 +368,7 @@ class Steam(commands.GroupCog, name="steam"):
             await interaction.followup.send("An error occurred while fetching recent games. Please try again later.")
 
     @app_commands.command(name="gametime", description="Shows the total playtime for a specific game.")
+    @app_commands.autocomplete(game_name=game_name_autocomplete)
     async def steamgame(self, interaction: discord.Interaction, steamid: str, game_name: str):
         """Fetches and displays the total playtime for a specific game."""
         await interaction.response.defer()
@@ -216,43 +378,56 @@ class Steam(commands.GroupCog, name="steam"):
             await self.send_invalid_identifier(interaction, steamid)
             return
 
-        url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={STEAM_API_KEY}&steamid={steamid64}&include_appinfo=true"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.json()
-
-        games = data.get("response", {}).get("games", [])
-        found = self.find_best_match(games, game_name)
+        library = await self.get_library_index(steamid64)
+        if library is None:
+            await interaction.followup.send("Failed to fetch the game library.")
+            return
+        found = library.find(game_name)
 
         if not found:
             await interaction.followup.send("Game not found or no playtime recorded.")
             return
 
-        hours_total = round(found["playtime_forever"] / 60)
-        hours_recent = round(found.get("playtime_2weeks", 0) / 60)
+        hours_total = round(found.playtime_forever / 60)
+        hours_recent = round(found.playtime_2weeks / 60)
 
         embed = discord.Embed(
-            title=found["name"],
+            title=found.name,
             description=f"🎮 Total playtime: **{hours_total} hours**\n🕒 Last 2 weeks: **{hours_recent} hours**",
             color=discord.Color.purple()
         )
 
        # img_logo_url is NOT always present or not valid
-        logo_hash = found.get("img_logo_url")
-        appid = found.get("appid")
+        logo_hash = found.img_logo_url
+        appid = found.appid
 
         if logo_hash:
             logo_url = f"https://media.steampowered.com/steamcommunity/public/images/apps/{appid}/{logo_hash}.jpg"
             embed.set_thumbnail(url=logo_url)
 
         # Optional: Steam Stats
-        if found.get("has_community_visible_stats"):
+        if found.has_community_visible_stats:
             stats_url = f"https://steamcommunity.com/stats/{appid}/achievements/"
             embed.add_field(name="🔗 Steam Stats", value=f"[View Achievements]({stats_url})", inline=False)
         
         await interaction.followup.send(embed=embed)
 
+    @staticmethod
+    def common_games_embed(games):
+        """Builds the common games embed from [(name, combined playtime in minutes)], most played first."""
+        lines = []
+        length = 0
+        for name, minutes in games:
+            line = f"**{name}** – {round(minutes / 60)} h combined"
+            if length + len(line) > 3900:
+                lines.append(f"…and {len(games) - len(lines)} more")
+                break
+            lines.append(line)
+            length += len(line) + 1
+        return discord.Embed(title=f"🎮 Common Games ({len(games)})", description="\n".join(lines), color=discord.Color.green())
+
     @app_commands.command(name="common", description="Shows games that all given Steam accounts have in common.")
+    @app_commands.describe(steamids="Steam names, IDs or @mentions of members with a linked account, separated by spaces")
     async def steamcommon(self, interaction: discord.Interaction, steamids: str):
         """Fetches and displays games that all given Steam accounts have in common."""
         await interaction.response.defer()
@@ -262,31 +437,273 @@ class Steam(commands.GroupCog, name="steam"):
             await interaction.followup.send("Please provide at least two Steam names or IDs.")
             return
 
-        games_owned = []
+        try:
+            # Mentioned members are looked up through their linked accounts
+            mentioned = [int(m.group(1)) for m in map(MENTION_PATTERN.fullmatch, steamid_list) if m]
+            if mentioned:
+                linked = self.bot.db.get_steam_accounts_for_users(mentioned)
+                missing = [discord_id for discord_id in mentioned if discord_id not in linked]
+                if missing:
+                    await interaction.followup.send(f"<@{missing[0]}> has not linked a Steam account yet. Use `/steam link`.")
+                    return
+                if len(mentioned) == len(steamid_list):
+                    # Only members: one query over the synced libraries, no Steam requests at all
+                    rows = self.bot.db.get_common_steam_games(mentioned)
+                    if not rows:
+                        await interaction.followup.send("No common games found.")
+                        return
+                    await interaction.followup.send(embed=self.common_games_embed([(name or self.bot.steam_apps.name(appid) or appid, playtime) for appid, name, playtime in rows]))
+                    return
+                steamid_list = [linked[int(m.group(1))] if (m := MENTION_PATTERN.fullmatch(sid)) else sid for sid in steamid_list]
+
+            # Resolve all accounts at once, then fetch all libraries at once
+            steamid64s = await asyncio.gather(*(self.get_steamid(sid) for sid in steamid_list))
+            for sid, steamid64 in zip(steamid_list, steamid64s):
+                if not steamid64:
+                    await self.send_invalid_identifier(interaction, sid)
+                    return
+
+            libraries = await asyncio.gather(*(self.fetch_owned_games(steamid64) for steamid64 in steamid64s))
+            for sid, games in zip(steamid_list, libraries):
+                if not games:
+                    await interaction.followup.send(f"Could not load the game library of `{sid}`. The profile's game details may be private.")
+                    return
+
+            # Intersect the appid sets, starting with the smallest library
+            appid_sets = sorted((set(library.appids) for library in libraries), key=len)
+            common_appids = appid_sets[0].intersection(*appid_sets[1:])
+
+            if not common_appids:
+                await interaction.followup.send("No common games found.")
+                return
 
-        for sid in steamid_list:
-            steamid64 = await self.get_steamid(sid)
-            if not steamid64:
-                await self.send_invalid_identifier(interaction, sid)
+            # Games the group played the most together come first
+            playtime = dict.fromkeys(common_appids, 0)
+            names = {}
+            for library in libraries:
+                for appid, name, minutes in zip(library.appids, library.names, library.playtime_forever):
+                    if appid in playtime:
+                        playtime[appid] += minutes
+                        names.setdefault(appid, name)
+            ranked = sorted(common_appids, key=playtime.get, reverse=True)
+
+            embed = self.common_games_embed([(names.get(appid) or self.bot.steam_apps.name(appid) or appid, playtime[appid]) for appid in ranked])
+            await interaction.followup.send(embed=embed)
+            log.info(f"Found {len(ranked)} common games for {len(steamid_list)} accounts.")
+        except Exception as e:
+            # Log and handle unexpected errors
+            log.error(f"Error fetching common games for {steamids}: {e}")
+            await interaction.followup.send("An error occurred while fetching common games. Please try again later.")
+
+    @app_commands.command(name="online", description="Shows which members of this server are online on Steam and what they play.")
+    async def online(self, interaction: discord.Interaction):
+        """Displays the Steam presence of all linked server members."""
+        await interaction.response.defer()
+        try:
+            members = {m.id: m for m in interaction.guild.members if not m.bot}
+            linked = self.bot.db.get_steam_accounts_for_users(members.keys())
+            if not linked:
+                await interaction.followup.send("No one on this server has linked a Steam account yet. Use `/steam link`.")
                 return
 
-            url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={STEAM_API_KEY}&steamid={steamid64}&include_appinfo=true"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    data = await resp.json()
+            # One request per 100 linked members, shared by everyone opening the board within a minute
+            summaries = await self.summaries.get(list(linked.values()))
+
+            playing = []
+            online = []
+            for discord_id, steamid in linked.items():
+                player = summaries.get(steamid)
+                if player is None:
+                    continue
+                name = members[discord_id].display_name
+                if player.get("gameextrainfo"):
+                    playing.append(f"**{name}** – {player['gameextrainfo']}")
+                elif player.get("personastate", 0) != 0:
+                    online.append(f"{name} ({PERSONA_STATES.get(player['personastate'], 'Online')})")
+
+            embed = discord.Embed(title="🎮 Steam Online", color=discord.Color.green())
+            embed.add_field(name=f"In Game ({len(playing)})", value=self.truncate_lines(sorted(playing)) or "No one", inline=False)
+            embed.add_field(name=f"Online ({len(online)})", value=self.truncate_lines(sorted(online)) or "No one", inline=False)
+            embed.set_footer(text=f"{len(linked)} linked members · updated every minute")
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            log.error(f"Error creating Steam online board: {e}")
+            await interaction.followup.send("An error occurred while loading the online board. Please try again later.")
 
-            games = data.get("response", {}).get("games", [])
-            gameset = set(game["name"] for game in games)
-            games_owned.append(gameset)
+    @staticmethod
+    def truncate_lines(lines, limit=1000):
+        """Joins lines, cutting them off to fit into an embed field."""
+        text = ""
+        for index, line in enumerate(lines):
+            if len(text) + len(line) + 1 > limit:
+                return f"{text}…and {len(lines) - index} more"
+            text += line + "\n"
+        return text.rstrip("\n")
+
+    async def resolve_accounts(self, interaction: discord.Interaction, identifiers):
+        """Resolves Steam identifiers and member mentions to [(label, steamid64)].
+        Returns None after sending an error message if one of them cannot be resolved."""
+        mentioned = [int(m.group(1)) for m in map(MENTION_PATTERN.fullmatch, identifiers) if m]
+        linked = self.bot.db.get_steam_accounts_for_users(mentioned) if mentioned else {}
+
+        async def resolve(identifier):
+            match = MENTION_PATTERN.fullmatch(identifier)
+            if match:
+                member = interaction.guild.get_member(int(match.group(1)))
+                return (member.display_name if member else identifier), linked.get(int(match.group(1)))
+            return identifier, await self.get_steamid(identifier)
+
+        accounts = await asyncio.gather(*(resolve(identifier) for identifier in identifiers))
+        for identifier, (label, steamid64) in zip(identifiers, accounts):
+            if steamid64 is None:
+                if MENTION_PATTERN.fullmatch(identifier):
+                    await interaction.followup.send(f"{identifier} has not linked a Steam account yet. Use `/steam link`.")
+                else:
+                    await self.send_invalid_identifier(interaction, identifier)
+                return None
+        return accounts
+
+    async def find_appid(self, steamid64, game):
+        """Finds the appid of a game by App ID, in the library of an account, or in the app catalog."""
+        if game.strip().isdigit():
+            return int(game)
+        library = await self.get_library_index(steamid64)
+        found = library.find(game) if library is not None else None
+        if found is not None:
+            return found.appid
+        matches = self.bot.steam_apps.search(game, limit=1)
+        return matches[0][0] if matches else None
+
+    async def get_achievement_schema(self, appid):
+        """Returns the parsed achievement schema of a game, or None if it could not be fetched.
+
+        A game without achievements gets an empty schema, only that one is cached.
+        """
+        schema = self.schemas.get(appid)
+        if schema is not None:
+            return schema
+        try:
+            resp = await self.bot.http_client.get_json(SCHEMA_URL, params={"key": STEAM_API_KEY, "appid": appid})
+        except Exception as e:
+            log.warning(f"Failed to fetch achievement schema of {appid}: {e!r}")
+            return None
+        if resp.status != 200 or not isinstance(resp.data, dict) or "game" not in resp.data:
+            log.warning(f"Failed to fetch achievement schema of {appid}. HTTP Status: {resp.status}")
+            return None
+        return self.schemas.put(AchievementSchema(appid, resp.data))
 
-        common_games = set.intersection(*games_owned)
+    async def fetch_player_achievements(self, steamid64, appid):
+        # Private profiles answer with an error status and success false, which the schema handles
+        resp = await self.bot.http_client.get_json(PLAYER_ACHIEVEMENTS_URL, params={"key": STEAM_API_KEY, "steamid": steamid64, "appid": appid}, cache=False)
+        return resp.data
 
-        if not common_games:
-            await interaction.followup.send("No common games found.")
+    @app_commands.command(name="achievements", description="Compares the achievements of Steam accounts in a game.")
+    @app_commands.describe(game="Name or App ID of the game", accounts="Steam names, IDs or @mentions of members with a linked account, separated by spaces")
+    async def achievements(self, interaction: discord.Interaction, game: str, accounts: str):
+        """Fetches and compares the unlocked achievements of several accounts."""
+        await interaction.response.defer()
+        identifiers = accounts.split()[:10]
+        if not identifiers:
+            await interaction.followup.send("Please provide at least one Steam name or ID.")
             return
 
-        embed = discord.Embed(title="🎮 Common Games", description="\n".join(sorted(common_games)), color=discord.Color.green())
-        await interaction.followup.send(embed=embed)
+        try:
+            players = await self.resolve_accounts(interaction, identifiers)
+            if players is None:
+                return
+            appid = await self.find_appid(players[0][1], game)
+            if appid is None:
+                await interaction.followup.send(f"Game `{game}` not found.")
+                return
+
+            # Schema and all players' achievements at once
+            schema, *player_data = await asyncio.gather(
+                self.get_achievement_schema(appid),
+                *(self.fetch_player_achievements(steamid64, appid) for _, steamid64 in players)
+            )
+            if schema is None:
+                await interaction.followup.send("The achievements of this game could not be loaded. Please try again later.")
+                return
+            if not len(schema):
+                await interaction.followup.send("This game has no achievements.")
+                return
+
+            # One bit per achievement, comparisons are plain integer operations
+            total = len(schema)
+            bitsets = [schema.bitset(data) for data in player_data]
+            embed = discord.Embed(title=f"🏆 {schema.game_name}", url=f"https://steamcommunity.com/stats/{appid}/achievements/", color=discord.Color.gold())
+            for (label, _), bits in zip(players, bitsets):
+                if bits is None:
+                    value = "Stats private or game not owned"
+                else:
+                    unlocked = bits.bit_count()
+                    value = f"{unlocked}/{total} ({unlocked / total * 100:.0f}%)"
+                embed.add_field(name=label, value=value, inline=True)
+
+            known = [(label, bits) for (label, _), bits in zip(players, bitsets) if bits is not None]
+            if len(known) > 1:
+                unlocked_by_all = schema.all_bits
+                unlocked_by_any = 0
+                for _, bits in known:
+                    unlocked_by_all &= bits
+                    unlocked_by_any |= bits
+                embed.add_field(name="Together", value=(
+                    f"Unlocked by everyone: {unlocked_by_all.bit_count()}\n"
+                    f"Unlocked by no one: {(schema.all_bits & ~unlocked_by_any).bit_count()}"
+                ), inline=False)
+
+                # Table of the achievements only some of the players have
+                differing = schema.bits_to_indexes(unlocked_by_any & ~unlocked_by_all)
+                if differing:
+                    header = " ".join(str(number) for number in range(1, len(known) + 1))
+                    rows = [
+                        " ".join("x".rjust(len(str(number))) if bits >> index & 1 else ".".rjust(len(str(number)))
+                                 for number, (_, bits) in enumerate(known, start=1)) + "  " + schema.display_names[index][:32]
+                        for index in differing[:MAX_COMPARED_ACHIEVEMENTS]
+                    ]
+                    legend = ", ".join(f"{number} = {label}" for number, (label, _) in enumerate(known, start=1))[:200]
+                    # Embed field values are limited to 1024 characters
+                    while rows and len(legend) + len(header) + sum(len(row) + 1 for row in rows) > 960:
+                        rows.pop()
+                    more = f"\n…and {len(differing) - len(rows)} more" if len(differing) > len(rows) else ""
+                    embed.add_field(name="Differences", value=f"{legend}\n```\n{header}\n" + "\n".join(rows) + f"\n```{more}", inline=False)
+
+            await interaction.followup.send(embed=embed)
+            log.info(f"Compared {total} achievements of {schema.game_name} for {len(players)} accounts.")
+        except Exception as e:
+            # Log and handle unexpected errors
+            log.error(f"Error comparing achievements for {game}: {e}")
+            await interaction.followup.send("An error occurred while comparing achievements. Please try again later.")
+
+    @app_commands.command(name="game", description="Searches the Steam store catalog for a game.")
+    @app_commands.describe(name="Name of the game")
+    async def steamstoregame(self, interaction: discord.Interaction, name: str):
+        """Looks up a game in the local Steam app catalog."""
+        try:
+            catalog = self.bot.steam_apps
+            if not catalog.loaded:
+                await interaction.response.send_message("The Steam app catalog is still being downloaded. Please try again in a few minutes.", ephemeral=True)
+                return
+
+            matches = catalog.search(name, limit=6)
+            if not matches:
+                await interaction.response.send_message(f"No Steam game found for `{name}`.", ephemeral=True)
+                return
+
+            appid, title = matches[0]
+            embed = discord.Embed(title=title, url=f"https://store.steampowered.com/app/{appid}", color=discord.Color.blue())
+            embed.set_image(url=f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/header.jpg")
+            embed.add_field(name="App ID", value=str(appid), inline=True)
+            if len(matches) > 1:
+                others = "\n".join(f"[{other}](https://store.steampowered.com/app/{other_id})" for other_id, other in matches[1:])
+                embed.add_field(name="Other Matches", value=others, inline=False)
+
+            await interaction.response.send_message(embed=embed)
+            log.info(f"Found Steam game {title} ({appid}) for: {name}")
+        except Exception as e:
+            # Log and handle unexpected errors
+            log.error(f"Error searching Steam game {name}: {e}")
+            await interaction.response.send_message("An error occurred while searching the game. Please try again later.", ephemeral=True)
 
 async def setup(bot):
     """Sets up the Steam cog."""
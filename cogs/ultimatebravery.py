@@ -1,68 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
+import re
 import random
+import asyncio
 from logger import get_logger
+from helper.ultimate_bravery import PoolCache, BuildCode
 
 log = get_logger(__name__)
 
-VERSION = "14.9.1"
-BASE_URL = f"http://ddragon.leagueoflegends.com/cdn/{VERSION}/data/en_US"
-CHAMPION_URL = f"{BASE_URL}/champion.json"
-ITEM_URL = f"{BASE_URL}/item.json"
-SUMMONER_SPELL_URL = f"{BASE_URL}/summoner.json"
-RUNES_URL = f"{BASE_URL}/runesReforged.json"
-
-ROLES = ["TOP", "JUNGLE", "MID", "ADC", "SUPPORT"]
-STARTER_ITEMS = ["Doran's Blade", "Doran's Ring", "Doran's Shield", "Cull", "Tear of the Goddess", "Corrupting Potion", "Dark Seal", "Long Sword", "Amplifying Tome", "Cloth Armor", "Sapphire Crystal"]
-SUPPORT_UPGRADES = [
-    "Celestial Opposition",
-    "Solstice Sleigh",
-    "Bloodsong",
-    "Dream Maker",
-    "Zaz’Zak’s Realmspike"
-]
-JUNGLE_ITEMS = {
-    "Mosstomper Seedling": "Mosstomper",
-    "Scorchclaw Pup": "Scorchclaw",
-    "Gustwalker Hatchling": "Gustwalker"
-}
-
-# Ornn Masterwork Items (should be excluded from Ultimate Bravery)
-MASTERWORK_ITEMS = {
-    "Forgefire Crest",
-    "Rimeforged Grasp",
-    "Molten Edge",
-    "Liandry's Lament",
-    "Rabadon's Deathcrown",
-    "Infinity Force",
-    "Syzygy",
-    "Dreamshatter",
-    "Shurelya's Requiem",
-    "Cry of the Shrieking City",
-    "Reliquary of the Golden Dawn",
-    "Upgraded Aeropack",
-    "The Unspoken Parasite",
-    "Starcaster",
-    "Vespertide",
-    "Bloodward",
-    "Obsidian Cleaver",
-    "Ceaseless Hunger",
-    "Typhoon",
-    "Deicide",
-    "Edge of Finality",
-    "Flicker",
-    "Heavensfall",
-    "Icathia's Curse",
-    "Leviathan",
-    "Might of the Ruined King",
-    "Sandshrike's Claw",
-    "Seat of Command",
-    "Shojin's Resolve",
-    "The Baron's Gift",
-    "Wyrmfallen Sacrifice"
-}
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord limit of embeds in one message
+# Discord allows 6000 characters over all embeds of a message, the rest is headroom for rerolls
+MAX_EMBED_CHARS_PER_MESSAGE = 5400
+REROLL_ID_PATTERN = re.compile(r"ub:(?P<code>[a-z0-9.\-]+):(?P<user_id>\d+)")  # custom_id of a RerollButton
 
 class UltimateBravery(commands.Cog):
     """Main class for the Ultimate Bravery game cog."""
@@ -71,157 +21,132 @@ class UltimateBravery(commands.Cog):
         """Initializes the Ultimate Bravery cog with the bot instance."""
         self.bot = bot
         self.events = {}
+        self.pools = PoolCache()  # Build pools by patch and game mode
+        self.rng = random.Random()  # Draws the lobby seeds
+
+    async def cog_load(self):
+        # Reroll buttons keep working across restarts, their custom_id holds the whole build
+        self.bot.add_dynamic_items(RerollButton)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(RerollButton)
 
     @commands.Cog.listener()
     async def on_ready(self):
         """Event listener triggered when the bot is ready."""
         log.info("Ultimate Bravery module loaded and ready.")
 
-    async def fetch_json(self, session, url):
-        """Fetches JSON data from a given URL.
-
-        Args:
-            session (aiohttp.ClientSession): The HTTP session to use for the request.
-            url (str): The URL to fetch data from.
-
-        Returns:
-            dict: The JSON data fetched from the URL, or an empty dictionary if the request fails.
-        """
-        try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    log.warning(f"Failed to fetch data from {url}. HTTP Status: {response.status}")
-                    return {}
-                return await response.json()
-        except Exception as e:
-            # Log and handle unexpected errors
-            log.error(f"Error fetching data from {url}: {e}")
-            return {}
-
     @app_commands.command(name="ultimatebravery", description="Start an Ultimate Bravery event")
-    @app_commands.describe(spielmodus="Choose the game mode")
+    @app_commands.describe(spielmodus="Choose the game mode", semi_brave="Only roles and items that suit each champion")
     @app_commands.choices(spielmodus=[
         app_commands.Choice(name="Summoner's Rift", value="sr"),
         app_commands.Choice(name="ARAM", value="aram")
     ])
-    async def ultimatebravery(self, interaction: discord.Interaction, spielmodus: app_commands.Choice[str]):
+    async def ultimatebravery(self, interaction: discord.Interaction, spielmodus: app_commands.Choice[str], semi_brave: bool = False):
         """Starts an Ultimate Bravery event.
 
         Args:
             interaction (discord.Interaction): The interaction object for the command.
             spielmodus (app_commands.Choice[str]): The selected game mode.
+            semi_brave (bool): Whether builds are limited to roles and items that suit the champion.
         """
         try:
-            await interaction.response.send_message("Ultimate Bravery started! Click **Join** to participate.", view=JoinView(self, interaction.user.id, spielmodus.value))
+            title = "Semi-Brave Ultimate Bravery" if semi_brave else "Ultimate Bravery"
+            await interaction.response.send_message(f"{title} started! Click **Join** to participate.", view=JoinView(self, interaction.user.id, spielmodus.value, semi_brave))
             log.info(f"Ultimate Bravery event started by {interaction.user.display_name}.")
         except Exception as e:
             # Log and handle unexpected errors
             log.error(f"Error starting Ultimate Bravery event: {e}")
             await interaction.response.send_message("An error occurred while starting the event. Please try again later.", ephemeral=True)
 
-    async def generate_build(self, user, mode, taken_champions, taken_roles):
-        """Generates a random build for a player.
+    @app_commands.command(name="ultimatebravery_build", description="Show an Ultimate Bravery build from its build code")
+    @app_commands.describe(code="The build code from the footer of a build")
+    async def ultimatebravery_build(self, interaction: discord.Interaction, code: str):
+        """Shows the build behind a build code.
 
         Args:
-            user (discord.User): The user for whom the build is being generated.
-            mode (str): The game mode (e.g., "sr" or "aram").
-            taken_champions (list): A list of champions already assigned.
-            taken_roles (list): A list of roles already assigned.
-
-        Returns:
-            tuple: A tuple containing the embed, champion, and role.
+            interaction (discord.Interaction): The interaction object for the command.
+            code (str): The build code.
         """
+        build_code = BuildCode.parse(code)
+        if build_code is None:
+            await interaction.response.send_message("That is not a valid build code.", ephemeral=True)
+            return
+
         try:
-            async with aiohttp.ClientSession() as session:
-                champions_data = await self.fetch_json(session, CHAMPION_URL)
-                items_data = await self.fetch_json(session, ITEM_URL)
-                spells_data = await self.fetch_json(session, SUMMONER_SPELL_URL)
-                runes_data = await self.fetch_json(session, RUNES_URL)
-
-            # Select a random champion
-            champions = [c for c in champions_data["data"].keys() if c not in taken_champions]
-            champion = random.choice(champions)
-            taken_champions.append(champion)
-
-            # Assign a role if the mode is Summoner's Rift
-            role = None
-            if mode == "sr":
-                roles = [r for r in ROLES if r not in taken_roles]
-                role = random.choice(roles)
-                taken_roles.append(role)
-
-            # Select summoner spells
-            valid_spells = [s["name"] for s in spells_data["data"].values() if (mode == "sr" and "CLASSIC" in s["modes"]) or (mode == "aram" and "ARAM" in s["modes"])]
-            spell1 = random.choice(valid_spells)
-            spell2 = random.choice([s for s in valid_spells if s != spell1])
-            if mode == "sr" and role == "JUNGLE":
-                spell1 = "Smite"
-                spell2 = random.choice([s for s in valid_spells if s != "Smite"])
-
-            # Select items
-            boots = [
-                i["name"] for i in items_data["data"].values()
-                if "Boots" in i.get("tags", [])
-                and i.get("maps", {}).get("11", False)
-                and i["name"] != "Slightly Magical Boots"
-            ]
-            full_items = [
-                i["name"] for i in items_data["data"].values()
-                if i.get("gold", {}).get("total", 0) >= 2000 and i.get("maps", {}).get("11", False) and i["name"] not in MASTERWORK_ITEMS
-            ]
-            build_items = [random.choice(boots)] + random.sample(full_items, 5)
-
-            # Select runes
-            primary_path = random.choice(runes_data)
-            primary_keystone = random.choice(primary_path["slots"][0]["runes"])
-            primary_runes = [random.choice(slot["runes"]) for slot in primary_path["slots"][1:]]
-
-            secondary_paths = [p for p in runes_data if p["id"] != primary_path["id"]]
-            secondary_path = random.choice(secondary_paths)
-            secondary_runes_pool = [r for slot in secondary_path["slots"][1:] for r in slot["runes"]]
-            secondary_runes = random.sample(secondary_runes_pool, 2)
-
-            # Select starter items
-            if role == "SUPPORT":
-                starter = f"World Atlas → {random.choice(SUPPORT_UPGRADES)}"
-            elif role == "JUNGLE":
-                jungle_choice = random.choice(list(JUNGLE_ITEMS.items()))
-                starter = f"{jungle_choice[0]} → {jungle_choice[1]}"
-            else:
-                starter = random.choice(STARTER_ITEMS)
+            pool = await self.get_pool(build_code.mode, build_code.version)
+            if pool.version != build_code.version:
+                await interaction.response.send_message(f"Patch {build_code.version} is no longer available.", ephemeral=True)
+                return
+            await interaction.response.send_message(embed=build_embed(interaction.user, pool.build_for(build_code), build_code))
+        except Exception as e:
+            # Log and handle unexpected errors
+            log.error(f"Error showing build {code}: {e}")
+            await interaction.response.send_message("An error occurred while loading the build. Please try again later.", ephemeral=True)
 
-            # Select the first skill to max
-            first_skill = random.choice(["Q", "W", "E"])
+    async def get_pool(self, mode, version=None):
+        """Returns the build pool for a game mode.
 
-            # Build the embed
-            embed = discord.Embed(title=f"🎲 Ultimate Bravery for {user.display_name}", color=discord.Color.gold())
-            embed.add_field(name="Role & Champion", value=f"{role or '-'} → **{champion}**", inline=False)
-            embed.add_field(name="Summoner Spells & First Max", value=f"{spell1} + {spell2} → First Max: {first_skill}", inline=False)
-            embed.add_field(name="Runes", value=f"**{primary_path['name']}**: {primary_keystone['name']}, {', '.join(r['name'] for r in primary_runes)}\n**{secondary_path['name']}**: {', '.join(r['name'] for r in secondary_runes)}", inline=False)
-            embed.add_field(name="Starter & Items", value=f"Starter: {starter}\n" + "\n".join(f"- {item}" for item in build_items), inline=False)
+        Args:
+            mode (str): The game mode (e.g., "sr" or "aram").
+            version (str): The patch of a build code. Falls back to the current patch if that
+                patch is not stored locally.
 
-            log.info(f"Generated build for {user.display_name}: Champion - {champion}, Role - {role}")
-            return embed, champion, role
-        except Exception as e:
-            # Log and handle unexpected errors
-            log.error(f"Error generating build for {user.display_name}: {e}")
-            return None, None, None
+        Returns:
+            BraveryPool: The pool of the patch.
+        """
+        # Static data comes from the locally stored Data Dragon patch
+        patch = self.bot.ddragon.current
+        if patch is None:
+            raise RuntimeError("Data Dragon data is not loaded")
+        if version is None or version == patch.version:
+            return self.pools.get(patch, mode)
+
+        pool = self.pools.peek(version, mode)
+        if pool is None and version in self.bot.ddragon.local_versions():
+            old_patch = await asyncio.to_thread(self.bot.ddragon.load_local, version)
+            pool = self.pools.get(old_patch, mode)
+        return pool or self.pools.get(patch, mode)
+
+def build_embed(user, build, code):
+    """Builds the embed showing a player's build."""
+    embed = discord.Embed(title=f"🎲 Ultimate Bravery for {user.display_name}", color=discord.Color.gold())
+    embed.add_field(name="Role & Champion", value=f"{build.role or '-'} → **{build.champion}**", inline=False)
+    embed.add_field(name="Summoner Spells & First Max", value=f"{build.spells[0]} + {build.spells[1]} → First Max: {build.first_skill}", inline=False)
+    embed.add_field(name="Runes", value=f"**{build.primary_path}**: {build.keystone}, {', '.join(build.primary_runes)}\n**{build.secondary_path}**: {', '.join(build.secondary_runes)}", inline=False)
+    embed.add_field(name="Starter & Items", value=f"Starter: {build.starter}\n" + "\n".join(f"- {item}" for item in build.items), inline=False)
+    embed.set_footer(text=f"Build code: {code}")
+    return embed
+
+def pack_embeds(embeds):
+    """Splits embeds into consecutive chunks that each fit into one message."""
+    chunks = []
+    chars = 0
+    for embed in embeds:
+        if not chunks or len(chunks[-1]) == MAX_EMBEDS_PER_MESSAGE or chars + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE:
+            chunks.append([])
+            chars = 0
+        chunks[-1].append(embed)
+        chars += len(embed)
+    return chunks
 
 class JoinView(discord.ui.View):
     """View for the Ultimate Bravery lobby where players can join or generate builds."""
 
-    def __init__(self, cog, host_id, mode):
+    def __init__(self, cog, host_id, mode, semi=False):
         """Initializes the JoinView.
 
         Args:
             cog (UltimateBravery): The parent cog instance.
             host_id (int): The ID of the host who started the event.
             mode (str): The selected game mode.
+            semi (bool): Whether builds are limited to roles and items that suit the champion.
         """
         super().__init__(timeout=None)
         self.cog = cog  # Reference to the parent cog
         self.host_id = host_id  # ID of the host who started the event
         self.mode = mode  # Game mode (e.g., Summoner's Rift or ARAM)
+        self.semi = semi  # Semi-brave builds
         self.players = []  # List of players who joined the lobby
 
     @discord.ui.button(label="Join", style=discord.ButtonStyle.green)
@@ -235,10 +160,12 @@ class JoinView(discord.ui.View):
         if interaction.user.id not in [u.id for u in self.players]:
             # Add the player to the list if they haven't joined yet
             self.players.append(interaction.user)
-            await interaction.response.edit_message(
-                content=f"Ultimate Bravery started! Participants: {', '.join([u.display_name for u in self.players])}",
-                view=self
-            )
+            await interaction.response.defer()
+            # Joins in quick succession end up in one edit
+            self.cog.bot.message_edits.request(interaction.message, lambda: {
+                "content": f"{'Semi-Brave Ultimate Bravery' if self.semi else 'Ultimate Bravery'} started! Participants: {', '.join([u.display_name for u in self.players])}",
+                "view": self
+            })
             log.info(f"{interaction.user.display_name} joined the Ultimate Bravery lobby.")
         else:
             # Notify the player if they have already joined
@@ -263,69 +190,124 @@ class JoinView(discord.ui.View):
             return
 
         try:
-            taken_champs = []  # List of champions already assigned
-            taken_roles = []  # List of roles already assigned (for Summoner's Rift)
-            for player in self.players:
-                # Generate a build for each player
-                embed, champ, role = await self.cog.generate_build(player, self.mode, taken_champs, taken_roles)
-                await interaction.channel.send(
-                    content=player.mention,
-                    embed=embed,
-                    view=RerollView(self.cog, player, self.mode, taken_champs.copy(), taken_roles.copy())
-                )
-                log.info(f"Generated build for {player.display_name}: Champion - {champ}, Role - {role}")
+            pool = await self.cog.get_pool(self.mode)
+            seed = self.cog.rng.getrandbits(32)
+            codes = [BuildCode(self.mode, pool.version, seed, len(self.players), i, semi=self.semi) for i in range(len(self.players))]
 
             # Disable all buttons in the lobby after builds are generated
             for child in self.children:
                 child.disabled = True
-
-            await interaction.message.edit(content="❗ **Lobby closed. Builds have been generated.**", view=self)
+            self.cog.bot.message_edits.discard(interaction.message)
+            await interaction.response.edit_message(content="❗ **Lobby closed. Builds have been generated.**", view=self)
+
+            embeds = []
+            for player, code in zip(self.players, codes):
+                build = pool.build_for(code)
+                embeds.append(build_embed(player, build, code))
+                log.info(f"Generated build for {player.display_name}: Champion - {build.champion}, Role - {build.role}")
+
+            # As many builds per message as Discord allows instead of one message per player
+            start = 0
+            for chunk in pack_embeds(embeds):
+                players = self.players[start:start + len(chunk)]
+                view = discord.ui.View(timeout=None)
+                for player, code in zip(players, codes[start:]):
+                    view.add_item(RerollButton(code, player.id, player.display_name))
+                await interaction.channel.send(content=" ".join(p.mention for p in players), embeds=chunk, view=view)
+                start += len(chunk)
         except Exception as e:
             # Log and handle unexpected errors
             log.error(f"Error generating builds: {e}")
-            await interaction.response.send_message("An error occurred while generating builds. Please try again later.", ephemeral=True)
+            if interaction.response.is_done():
+                await interaction.followup.send("An error occurred while generating builds. Please try again later.", ephemeral=True)
+            else:
+                await interaction.response.send_message("An error occurred while generating builds. Please try again later.", ephemeral=True)
+
+class RerollButton(discord.ui.DynamicItem[discord.ui.Button], template=REROLL_ID_PATTERN):
+    """Reroll button of one player's build, without any state besides its custom_id.
 
-class RerollView(discord.ui.View):
-    """View for allowing players to reroll their builds."""
+    The custom_id holds the build code and the player's ID, so a click derives the next build
+    from the code alone, also after a restart.
+    """
 
-    def __init__(self, cog, player, mode, taken_champs, taken_roles):
-        """Initializes the RerollView.
+    def __init__(self, code, user_id, name=None, label=None):
+        """Initializes the RerollButton.
 
         Args:
-            cog (UltimateBravery): The parent cog instance.
-            player (discord.User): The player who owns this view.
-            mode (str): The selected game mode.
-            taken_champs (list): A list of champions already assigned.
-            taken_roles (list): A list of roles already assigned.
+            code (BuildCode): The code of the player's current build.
+            user_id (int): The ID of the player who owns the build.
+            name (str): The player's name for the label.
+            label (str): The full label, used instead of the name when the button is rebuilt.
         """
-        super().__init__(timeout=900)  # Timeout after 15 minutes
-        self.cog = cog  # Reference to the parent cog
-        self.player = player  # The player who owns this view
-        self.mode = mode  # Game mode (e.g., Summoner's Rift or ARAM)
-        self.taken_champs = taken_champs  # List of champions already assigned
-        self.taken_roles = taken_roles  # List of roles already assigned
+        if label is None:
+            label = f"Reroll {name}"[:80] if name else "Reroll"
+        super().__init__(discord.ui.Button(label=label, style=discord.ButtonStyle.red, custom_id=f"ub:{code}:{user_id}"))
+        self.code = code
+        self.user_id = user_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        code = BuildCode.parse(match["code"])
+        if code is None:
+            raise ValueError(f"Invalid build code {match['code']}")
+        return cls(code, int(match["user_id"]), label=item.label)
+
+    @classmethod
+    def view_from_message(cls, message, replace=None):
+        """Rebuilds the reroll buttons of a builds message as RerollButtons.
+
+        A view of only dynamic items is never stored by discord.py, so rerolls do not leave any
+        state behind.
 
-    @discord.ui.button(label="Reroll my Build", style=discord.ButtonStyle.red)
-    async def reroll(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handles rerolling the player's build.
+        Args:
+            message (discord.Message): The message with the builds.
+            replace (RerollButton): A button that takes the place of the one with its user ID.
+
+        Returns:
+            discord.ui.View: The view with one RerollButton per player.
+        """
+        view = discord.ui.View(timeout=None)
+        for row in message.components:
+            for component in getattr(row, "children", [row]):
+                match = REROLL_ID_PATTERN.fullmatch(getattr(component, "custom_id", None) or "")
+                code = BuildCode.parse(match["code"]) if match else None
+                if code is None:
+                    continue
+                if replace is not None and int(match["user_id"]) == replace.user_id:
+                    replace.item.label = component.label
+                    view.add_item(replace)
+                else:
+                    view.add_item(cls(code, int(match["user_id"]), label=component.label))
+        return view
+
+    async def callback(self, interaction: discord.Interaction):
+        """Handles rerolling the build of the player whose button was clicked.
 
         Args:
             interaction (discord.Interaction): The interaction object for the button click.
-            button (discord.ui.Button): The button that was clicked.
         """
-        if interaction.user != self.player:
+        if interaction.user.id != self.user_id:
             # Ensure only the player can reroll their own build
             await interaction.response.send_message("You can only reroll your own build!", ephemeral=True)
             return
 
         try:
-            # Generate a new build for the player
-            embed, champ, role = await self.cog.generate_build(self.player, self.mode, self.taken_champs, self.taken_roles)
-            await interaction.response.edit_message(embed=embed)
-            log.info(f"{self.player.display_name} rerolled their build: Champion - {champ}, Role - {role}")
+            # Derive the next build and swap it into this player's embed
+            cog = interaction.client.get_cog("UltimateBravery")
+            pool = await cog.get_pool(self.code.mode, self.code.version)
+            code = self.code.rerolled(pool.version)
+            build = pool.build_for(code)
+
+            # Embeds and reroll buttons of a message are in the same order
+            view = RerollButton.view_from_message(interaction.message, replace=RerollButton(code, self.user_id))
+            position = next(i for i, item in enumerate(view.children) if item.user_id == self.user_id)
+            embeds = list(interaction.message.embeds)
+            embeds[position] = build_embed(interaction.user, build, code)
+            await interaction.response.edit_message(embeds=embeds, view=view)
+            log.info(f"{interaction.user.display_name} rerolled their build: Champion - {build.champion}, Role - {build.role}")
         except Exception as e:
             # Log and handle unexpected errors
-            log.error(f"Error rerolling build for {self.player.display_name}: {e}")
+            log.error(f"Error rerolling build for {interaction.user.display_name}: {e}")
             await interaction.response.send_message("An error occurred while rerolling your build. Please try again later.", ephemeral=True)
 
 async def setup(bot):
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import requests
 from logger import get_logger
 from config import GITHUB_REPO, GITHUB_TOKEN
 
@@ -88,15 +87,15 @@ class UserSupport(commands.Cog):
 
         try:
             # Send the request to create the GitHub issue
-            response = requests.post(url, headers=headers, json=data)
-            if response.status_code == 201:
+            response = await self.bot.http_client.post_json(url, json=data, headers=headers)
+            if response.status == 201:
                 # Issue created successfully
-                issue_url = response.json().get("html_url", "")
+                issue_url = (response.data or {}).get("html_url", "")
                 await interaction.followup.send(f"Your {label} has been submitted.", ephemeral=True)
                 log.info(f"GitHub issue created successfully: {issue_url}")
             else:
                 # Log the error if the issue creation fails
-                log.error(f"Failed to create GitHub issue. Status: {response.status_code}, Response: {response.text}")
+                log.error(f"Failed to create GitHub issue. Status: {response.status}, Response: {response.data}")
                 await interaction.followup.send(f"Failed to submit {label}. Please try again later.", ephemeral=True)
         except Exception as e:
             # Log and handle unexpected errors
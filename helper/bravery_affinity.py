@@ -0,0 +1,163 @@
+from array import array
+
+# Champion class (Data Dragon champion tag) -> weight of each role
+CLASS_ROLES = {
+    "Fighter": {"TOP": 3, "JUNGLE": 2},
+    "Tank": {"TOP": 2, "JUNGLE": 2, "SUPPORT": 2},
+    "Mage": {"MID": 3, "SUPPORT": 1},
+    "Assassin": {"MID": 2, "JUNGLE": 2},
+    "Marksman": {"ADC": 4, "MID": 1},
+    "Support": {"SUPPORT": 4},
+}
+
+# Champion class -> Data Dragon item tags that suit it
+CLASS_ITEM_TAGS = {
+    "Fighter": {"Damage", "Health", "CooldownReduction", "AbilityHaste", "LifeSteal", "Armor", "SpellBlock"},
+    "Tank": {"Health", "Armor", "SpellBlock", "HealthRegen", "Tenacity", "Aura"},
+    "Mage": {"SpellDamage", "MagicPenetration", "Mana", "CooldownReduction", "AbilityHaste"},
+    "Assassin": {"Damage", "ArmorPenetration", "CooldownReduction", "AbilityHaste", "NonbootsMovement"},
+    "Marksman": {"Damage", "CriticalStrike", "AttackSpeed", "OnHit", "ArmorPenetration", "LifeSteal"},
+    "Support": {"ManaRegen", "Aura", "Active", "Health", "SpellDamage", "CooldownReduction", "AbilityHaste"},
+}
+
+PRIMARY_CLASS_WEIGHT = 2  # The first tag of a champion counts double
+ITEMS_PER_BUILD = 5
+
+class AliasTable:
+    """Vose alias table: an index is drawn with probability proportional to its weight in O(1).
+
+    Index i is kept if a uniform x in [i, i + 1) stays below i + probabilities[i], otherwise
+    aliases[i] is drawn instead.
+    """
+
+    __slots__ = ("size", "probabilities", "aliases")
+
+    def __init__(self, weights):
+        size = len(weights)
+        total = sum(weights)
+        if not size or total <= 0:
+            raise ValueError("An alias table needs at least one positive weight")
+        scaled = [w * size / total for w in weights]
+        self.size = size
+        self.probabilities = array("d", [1.0] * size)
+        self.aliases = array("I", range(size))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding errors and keeps its default
+
+class AffinityIndex:
+    """Which roles and full items suit each champion, from the Data Dragon class tags.
+
+    Champions with the same classes share their tables, so there is one role alias table and
+    one set of item weight groups per class combination (a few dozen) instead of per champion.
+    """
+
+    def __init__(self, champion_tags, roles, full_items, item_tags):
+        """Builds the index.
+
+        Args:
+            champion_tags (dict): Champion -> list of class tags, primary class first.
+            roles (tuple): The roles of the game mode, empty outside of Summoner's Rift.
+            full_items (tuple): The full items of the pool.
+            item_tags (dict): Full item -> set of item tags.
+        """
+        self.roles = roles
+        self.full_items = full_items
+        self.class_key = {}  # champion -> tuple of classes
+        self.champions_by_class = {}  # tuple of classes -> champions, in the given order
+        self.role_tables = {}  # classes -> (roles, AliasTable) or None
+        self.item_groups = {}  # classes -> ((weight, items), ...) of the suitable items
+
+        for champion, tags in champion_tags.items():
+            key = tuple(tag for tag in tags if tag in CLASS_ROLES)
+            self.class_key[champion] = key
+            self.champions_by_class.setdefault(key, []).append(champion)
+            if key in self.item_groups:
+                continue
+            weights = {tag: PRIMARY_CLASS_WEIGHT if i == 0 else 1 for i, tag in enumerate(key)}
+            self.role_tables[key] = self._table(roles, lambda role: sum(
+                w * CLASS_ROLES[tag].get(role, 0) for tag, w in weights.items()))
+            self.item_groups[key] = self._groups(full_items, lambda item: sum(
+                w * len(CLASS_ITEM_TAGS[tag] & item_tags.get(item, set())) for tag, w in weights.items()))
+
+    @staticmethod
+    def _table(choices, weight):
+        weighted = [(choice, weight(choice)) for choice in choices]
+        weighted = [(choice, w) for choice, w in weighted if w > 0]
+        if not weighted:
+            return None
+        return tuple(choice for choice, _ in weighted), AliasTable([w for _, w in weighted])
+
+    @staticmethod
+    def _groups(choices, weight):
+        """Groups the choices with a positive integer weight by that weight."""
+        groups = {}
+        for choice in choices:
+            w = weight(choice)
+            if w > 0:
+                groups.setdefault(w, []).append(choice)
+        return tuple((w, tuple(items)) for w, items in sorted(groups.items()))
+
+    def assign_roles(self, rng):
+        """Gives every champion one of their roles, drawn by weight.
+
+        Returns:
+            dict: Role -> champions, grouped by class, the same order for the same draws.
+        """
+        assigned = {role: [] for role in self.roles}
+        for key, champions in self.champions_by_class.items():
+            table = self.role_tables.get(key)
+            for champion in champions:
+                if table is None:
+                    assigned[rng.choice(self.roles)].append(champion)
+                    continue
+                roles, alias = table
+                # Alias table draw, inlined because this runs for every champion
+                x = rng.random() * alias.size
+                index = int(x)
+                role = roles[index if x - index < alias.probabilities[index] else alias.aliases[index]]
+                assigned[role].append(champion)
+        return {role: tuple(champions) for role, champions in assigned.items()}
+
+    def items_for(self, champion, rng):
+        """Draws five different full items, weighted by how well they suit the champion.
+
+        Each draw picks a weight group by its remaining weight, then one of its remaining items
+        uniformly, which is exactly weighted sampling without replacement.
+        """
+        groups = self.item_groups.get(self.class_key.get(champion, ()), ())
+        remaining = [len(items) for _, items in groups]
+        if sum(remaining) < 2 * ITEMS_PER_BUILD:
+            return tuple(rng.sample(self.full_items, ITEMS_PER_BUILD))
+
+        pools = {}  # group -> its items not drawn yet, copied on first use
+        total = sum(w * count for (w, _), count in zip(groups, remaining))
+        chosen = []
+        for _ in range(ITEMS_PER_BUILD):
+            x = rng.random() * total
+            group = None
+            for g, (w, _) in enumerate(groups):
+                if remaining[g]:
+                    group = g  # Falls through to the last non-empty group on rounding errors
+                    x -= w * remaining[g]
+                    if x < 0:
+                        break
+
+            pool = pools.get(group)
+            if pool is None:
+                pool = pools[group] = list(groups[group][1])
+            # Swap the drawn item behind the remaining ones, like a partial Fisher-Yates shuffle
+            index = rng.randrange(remaining[group])
+            last = remaining[group] - 1
+            pool[index], pool[last] = pool[last], pool[index]
+            chosen.append(pool[last])
+            remaining[group] = last
+            total -= groups[group][0]
+        return tuple(chosen)
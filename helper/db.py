@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import os
 from config import DB_CONFIG
 
@@ -69,6 +69,67 @@ class Database:
                     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
                     UNIQUE (server_id, user_id)
                 );""")
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lol_watch_channels (
+                    server_id INTEGER PRIMARY KEY REFERENCES servers(id) ON DELETE CASCADE,
+                    channel_id BIGINT NOT NULL
+                );""")
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lol_watched_players (
+                    id SERIAL PRIMARY KEY,
+                    server_id INTEGER REFERENCES servers(id) ON DELETE CASCADE,
+                    puuid TEXT NOT NULL,
+                    riot_id TEXT NOT NULL,
+                    UNIQUE (server_id, puuid)
+                );""")
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lol_accounts (
+                    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+                    puuid TEXT NOT NULL,
+                    riot_id TEXT NOT NULL,
+                    summoner_id TEXT,
+                    level INTEGER,
+                    tier TEXT,
+                    division TEXT,
+                    league_points INTEGER,
+                    wins INTEGER,
+                    losses INTEGER,
+                    mastery_score INTEGER,
+                    updated_at TIMESTAMP
+                );""")
+                cursor.execute("CREATE INDEX IF NOT EXISTS lol_accounts_updated_at ON lol_accounts (updated_at NULLS FIRST);")
+                # Platform (euw1, na1, kr, ...) the Riot accounts play on
+                cursor.execute("ALTER TABLE lol_accounts ADD COLUMN IF NOT EXISTS platform TEXT NOT NULL DEFAULT 'euw1';")
+                cursor.execute("ALTER TABLE lol_watched_players ADD COLUMN IF NOT EXISTS platform TEXT NOT NULL DEFAULT 'euw1';")
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS identities (
+                    kind TEXT NOT NULL,                   -- 'steam_vanity', 'riot_id'
+                    lookup_key TEXT NOT NULL,
+                    value TEXT,                           -- JSON, NULL if the identifier does not exist
+                    resolved_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (kind, lookup_key)
+                );""")
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS steam_accounts (
+                    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+                    steamid TEXT NOT NULL,
+                    synced_at TIMESTAMP
+                );""")
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS steam_games (
+                    appid INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL
+                );""")
+                # Owned games of linked accounts, the appid index maps a game to its owners
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS steam_owned_games (
+                    user_id INTEGER REFERENCES steam_accounts(user_id) ON DELETE CASCADE,
+                    appid INTEGER NOT NULL,
+                    playtime_forever INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, appid)
+                );""")
+                cursor.execute("CREATE INDEX IF NOT EXISTS steam_owned_games_appid ON steam_owned_games (appid);")
+                cursor.execute("CREATE INDEX IF NOT EXISTS steam_accounts_synced_at ON steam_accounts (synced_at NULLS FIRST);")
 
 
     def get_or_create_user(self, discord_id):
@@ -300,3 +361,246 @@ class Database:
                     WHERE ce.server_id = %s;
                 """, (server_id,))
                 return [int(row["discord_id"]) for row in cursor.fetchall()]
+
+    # LEAGUE LIVE GAME WATCHER
+    def set_lol_watch_channel(self, server_id, channel_id):
+        """Set the channel live game updates are announced in, or disable them with None."""
+        server_pk = self.get_or_create_server(server_id)
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if channel_id is None:
+                    cursor.execute("DELETE FROM lol_watch_channels WHERE server_id = %s;", (server_pk,))
+                    return
+                cursor.execute("""
+                    INSERT INTO lol_watch_channels (server_id, channel_id)
+                    VALUES (%s, %s)
+                    ON CONFLICT (server_id) DO UPDATE SET channel_id = EXCLUDED.channel_id;
+                """, (server_pk, channel_id))
+
+    def add_lol_watched_player(self, server_id, puuid, riot_id, platform):
+        server_pk = self.get_or_create_server(server_id)
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO lol_watched_players (server_id, puuid, riot_id, platform)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (server_id, puuid) DO UPDATE SET riot_id = EXCLUDED.riot_id, platform = EXCLUDED.platform;
+                """, (server_pk, puuid, riot_id, platform))
+
+    def remove_lol_watched_player(self, server_id, puuid):
+        """Remove a watched player from a server. Returns True if the player was watched."""
+        server_pk = self.get_or_create_server(server_id)
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM lol_watched_players
+                    WHERE server_id = %s AND puuid = %s;
+                """, (server_pk, puuid))
+                return cursor.rowcount > 0
+
+    def get_lol_watches(self):
+        """Return all watched players of servers with an announcement channel."""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT s.server_id, wc.channel_id, wp.puuid, wp.riot_id, wp.platform
+                    FROM lol_watched_players wp
+                    JOIN lol_watch_channels wc ON wc.server_id = wp.server_id
+                    JOIN servers s ON s.id = wp.server_id;
+                """)
+                return [(row["server_id"], row["channel_id"], row["puuid"], row["riot_id"], row["platform"]) for row in cursor.fetchall()]
+
+    # LEAGUE LINKED ACCOUNTS
+    def link_lol_account(self, discord_id, puuid, riot_id, platform):
+        """Link a Discord user to a Riot account, replacing any previous link."""
+        user_pk = self.get_or_create_user(discord_id)
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                # A fresh row, so no stats of the previous account are left behind
+                cursor.execute("DELETE FROM lol_accounts WHERE user_id = %s;", (user_pk,))
+                cursor.execute("""
+                    INSERT INTO lol_accounts (user_id, puuid, riot_id, platform)
+                    VALUES (%s, %s, %s, %s);
+                """, (user_pk, puuid, riot_id, platform))
+
+    def unlink_lol_account(self, discord_id):
+        """Remove the Riot account link of a Discord user. Returns True if a link existed."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM lol_accounts la
+                    USING users u
+                    WHERE u.id = la.user_id AND u.discord_id = %s;
+                """, (discord_id,))
+                return cursor.rowcount > 0
+
+    def get_lol_account(self, discord_id):
+        """Return the linked Riot account of a Discord user as a dict, or None."""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT la.* FROM lol_accounts la
+                    JOIN users u ON u.id = la.user_id
+                    WHERE u.discord_id = %s;
+                """, (discord_id,))
+                return cursor.fetchone()
+
+    def get_stale_lol_accounts(self, max_age, limit):
+        """Return up to `limit` linked accounts not refreshed within `max_age`, oldest first."""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT puuid, riot_id, summoner_id, platform FROM lol_accounts
+                    WHERE updated_at IS NULL OR updated_at < %s
+                    ORDER BY updated_at NULLS FIRST
+                    LIMIT %s;
+                """, (datetime.now() - max_age, limit))
+                return cursor.fetchall()
+
+    def update_lol_account_stats(self, puuid, summoner_id, level, tier, division, league_points, wins, losses, mastery_score):
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE lol_accounts
+                    SET summoner_id = %s, level = %s, tier = %s, division = %s, league_points = %s,
+                        wins = %s, losses = %s, mastery_score = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE puuid = %s;
+                """, (summoner_id, level, tier, division, league_points, wins, losses, mastery_score, puuid))
+
+    def get_lol_accounts_for_users(self, discord_ids):
+        """Return the linked accounts of the given Discord users as (discord_id, account dict) pairs."""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT u.discord_id, la.* FROM lol_accounts la
+                    JOIN users u ON u.id = la.user_id
+                    WHERE u.discord_id = ANY(%s);
+                """, (list(discord_ids),))
+                return [(int(row["discord_id"]), row) for row in cursor.fetchall()]
+
+    # IDENTITIES
+    def get_identity(self, kind, lookup_key):
+        """Return (value, resolved_at) of a stored identifier mapping, or None if it was never resolved."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT value, resolved_at FROM identities
+                    WHERE kind = %s AND lookup_key = %s;
+                """, (kind, lookup_key))
+                return cursor.fetchone()
+
+    def store_identity(self, kind, lookup_key, value):
+        """Store the resolved value of an identifier, or None if it does not exist."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO identities (kind, lookup_key, value)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (kind, lookup_key) DO UPDATE
+                    SET value = EXCLUDED.value, resolved_at = CURRENT_TIMESTAMP;
+                """, (kind, lookup_key, value))
+
+    # STEAM LINKED ACCOUNTS
+    def link_steam_account(self, discord_id, steamid):
+        """Link a Discord user to a SteamID64, replacing any previous link and its synced games."""
+        user_pk = self.get_or_create_user(discord_id)
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM steam_owned_games WHERE user_id = %s;", (user_pk,))
+                cursor.execute("""
+                    INSERT INTO steam_accounts (user_id, steamid)
+                    VALUES (%s, %s)
+                    ON CONFLICT (user_id) DO UPDATE
+                    SET steamid = EXCLUDED.steamid, synced_at = NULL;
+                """, (user_pk, steamid))
+        return user_pk
+
+    def unlink_steam_account(self, discord_id):
+        """Remove the Steam link of a Discord user together with its synced games. Returns True if a link existed."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM steam_accounts sa
+                    USING users u
+                    WHERE u.id = sa.user_id AND u.discord_id = %s;
+                """, (discord_id,))
+                return cursor.rowcount > 0
+
+    def get_steam_accounts_for_users(self, discord_ids):
+        """Return {discord_id: steamid} for the given Discord users that linked a Steam account."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT u.discord_id, sa.steamid FROM steam_accounts sa
+                    JOIN users u ON u.id = sa.user_id
+                    WHERE u.discord_id = ANY(%s);
+                """, (list(discord_ids),))
+                return {int(discord_id): steamid for discord_id, steamid in cursor.fetchall()}
+
+    def get_stale_steam_accounts(self, max_age, limit):
+        """Return up to `limit` (user_id, steamid) pairs not synced within `max_age`, oldest first."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT user_id, steamid FROM steam_accounts
+                    WHERE synced_at IS NULL OR synced_at < %s
+                    ORDER BY synced_at NULLS FIRST
+                    LIMIT %s;
+                """, (datetime.now() - max_age, limit))
+                return cursor.fetchall()
+
+    def replace_steam_library(self, user_id, games):
+        """Replace the synced games of a linked account with [(appid, name, playtime_forever), ...]."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO steam_games (appid, name) VALUES %s
+                    ON CONFLICT (appid) DO UPDATE SET name = EXCLUDED.name;
+                """, [(appid, name) for appid, name, _ in games if name])
+                cursor.execute("DELETE FROM steam_owned_games WHERE user_id = %s;", (user_id,))
+                execute_values(cursor, "INSERT INTO steam_owned_games (user_id, appid, playtime_forever) VALUES %s;",
+                               [(user_id, appid, playtime) for appid, _, playtime in games])
+                cursor.execute("UPDATE steam_accounts SET synced_at = CURRENT_TIMESTAMP WHERE user_id = %s;", (user_id,))
+
+    def search_steam_games(self, name, limit=5):
+        """Return [(appid, name)] of games owned by linked members whose name contains `name`, best match first."""
+        # Wildcards typed by the user match themselves
+        pattern = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT appid, name FROM steam_games
+                    WHERE name ILIKE %s ESCAPE '\\'
+                    ORDER BY LOWER(name) = LOWER(%s) DESC, name ILIKE %s ESCAPE '\\' DESC, LENGTH(name)
+                    LIMIT %s;
+                """, (f"%{pattern}%", name, f"{pattern}%", limit))
+                return cursor.fetchall()
+
+    def get_steam_game_owners(self, appid, discord_ids):
+        """Return [(discord_id, playtime_forever)] of the given users owning a game, most played first."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT u.discord_id, og.playtime_forever FROM steam_owned_games og
+                    JOIN users u ON u.id = og.user_id
+                    WHERE og.appid = %s AND u.discord_id = ANY(%s)
+                    ORDER BY og.playtime_forever DESC;
+                """, (appid, list(discord_ids)))
+                return [(int(discord_id), playtime) for discord_id, playtime in cursor.fetchall()]
+
+    def get_common_steam_games(self, discord_ids, limit=50):
+        """Return [(appid, name, combined playtime)] of games all given users own, most played first."""
+        discord_ids = list(set(discord_ids))
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT og.appid, g.name, SUM(og.playtime_forever) AS playtime FROM steam_owned_games og
+                    JOIN users u ON u.id = og.user_id
+                    LEFT JOIN steam_games g ON g.appid = og.appid
+                    WHERE u.discord_id = ANY(%s)
+                    GROUP BY og.appid, g.name
+                    HAVING COUNT(*) = %s
+                    ORDER BY playtime DESC
+                    LIMIT %s;
+                """, (discord_ids, len(discord_ids), limit))
+                return cursor.fetchall()
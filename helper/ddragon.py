@@ -0,0 +1,142 @@
+import os
+import json
+import asyncio
+from bisect import bisect_left
+from logger import get_logger
+
+log = get_logger(__name__)
+
+VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/{file}"
+DATA_FILES = ("champion.json", "item.json", "summoner.json", "runesReforged.json")
+DATA_DIR = os.path.join("data", "ddragon")
+REFRESH_INTERVAL = 6 * 3600  # Seconds between checks for a new patch
+
+def version_key(version):
+    """Sort key for Data Dragon versions like '14.9.1'."""
+    return tuple(int(part) if part.isdigit() else 0 for part in version.split("."))
+
+class DataDragonPatch:
+    """Parsed and indexed Data Dragon data of a single patch."""
+
+    def __init__(self, version, champion_data, item_data, spell_data, rune_data):
+        self.version = version
+
+        # Champions: id -> info, and numeric key -> display name
+        self.champions = champion_data["data"]
+        self.champion_names_by_key = {int(info["key"]): info["name"] for info in self.champions.values()}
+
+        # Items: id -> info, plus indexes by tag, map and total gold
+        self.items = item_data["data"]
+        items_by_tag = {}
+        items_by_map = {}
+        for item_id, item in self.items.items():
+            for tag in item.get("tags", []):
+                items_by_tag.setdefault(tag, []).append(item_id)
+            for map_id, available in item.get("maps", {}).items():
+                if available:
+                    items_by_map.setdefault(map_id, []).append(item_id)
+        self.items_by_tag = {tag: frozenset(ids) for tag, ids in items_by_tag.items()}
+        self.items_by_map = {map_id: frozenset(ids) for map_id, ids in items_by_map.items()}
+        by_gold = sorted((item.get("gold", {}).get("total", 0), item_id) for item_id, item in self.items.items())
+        self._gold_values = [gold for gold, _ in by_gold]
+        self._gold_ids = [item_id for _, item_id in by_gold]
+
+        # Summoner spells and rune paths are used as they are
+        self.spells = list(spell_data["data"].values())
+        self.runes = rune_data
+
+    def items_with_gold_at_least(self, gold):
+        """Returns the ids of all items with a total cost of at least `gold`."""
+        return frozenset(self._gold_ids[bisect_left(self._gold_values, gold):])
+
+class DataDragonStore:
+    """Versioned on-disk store of Data Dragon data with automatic patch detection.
+
+    Every patch is downloaded once into data/ddragon/<version>/ and loaded into a
+    DataDragonPatch. Cogs read `bot.ddragon.current` without any network access.
+    """
+
+    def __init__(self, http_client, data_dir=DATA_DIR):
+        self.http = http_client
+        self.data_dir = data_dir
+        self.current = None  # DataDragonPatch of the newest available patch
+        self._task = None
+
+    def local_versions(self):
+        """Returns all patches that are completely stored on disk, newest first."""
+        if not os.path.isdir(self.data_dir):
+            return []
+        versions = [
+            v for v in os.listdir(self.data_dir)
+            if all(os.path.isfile(os.path.join(self.data_dir, v, f)) for f in DATA_FILES)
+        ]
+        return sorted(versions, key=version_key, reverse=True)
+
+    def load_local(self, version):
+        """Parses the stored files of a patch into a DataDragonPatch."""
+        files = []
+        for filename in DATA_FILES:
+            with open(os.path.join(self.data_dir, version, filename), encoding="utf-8") as f:
+                files.append(json.load(f))
+        return DataDragonPatch(version, *files)
+
+    async def load(self):
+        """Loads the newest stored patch and then checks for a newer one online."""
+        local = self.local_versions()
+        if local:
+            try:
+                self.current = await asyncio.to_thread(self.load_local, local[0])
+                log.info(f"Loaded Data Dragon patch {local[0]} from disk.")
+            except Exception as e:
+                log.error(f"Error loading Data Dragon patch {local[0]} from disk: {e}")
+        await self.refresh()
+
+    async def refresh(self):
+        """Detects the current patch and downloads and loads it if it is not the active one."""
+        try:
+            resp = await self.http.get_json(VERSIONS_URL)
+            if resp.status != 200 or not resp.data:
+                log.warning(f"Failed to fetch Data Dragon versions. HTTP Status: {resp.status}")
+                return
+            latest = resp.data[0]
+            if self.current is not None and self.current.version == latest:
+                return
+
+            if latest not in self.local_versions():
+                await self.download(latest)
+            self.current = await asyncio.to_thread(self.load_local, latest)
+            log.info(f"Data Dragon patch {latest} is now active.")
+        except Exception as e:
+            log.error(f"Error refreshing Data Dragon data: {e}")
+
+    async def download(self, version):
+        """Downloads all data files of a patch and stores them on disk."""
+        patch_dir = os.path.join(self.data_dir, version)
+        os.makedirs(patch_dir, exist_ok=True)
+        for filename in DATA_FILES:
+            resp = await self.http.get_json(DATA_URL.format(version=version, file=filename), cache=False)
+            if resp.status != 200 or resp.data is None:
+                raise RuntimeError(f"Failed to download {filename} for patch {version}. HTTP Status: {resp.status}")
+
+            # Write to a temporary file first so a patch is never half stored
+            path = os.path.join(patch_dir, filename)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(resp.data, f)
+            os.replace(f"{path}.tmp", path)
+        log.info(f"Downloaded Data Dragon patch {version}.")
+
+    def start(self):
+        """Starts checking for new patches in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL)
+            await self.refresh()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
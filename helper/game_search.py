@@ -0,0 +1,151 @@
+import re
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+NON_WORD = re.compile(r"\W+")
+LIBRARY_TTL = 1800  # Seconds a library index is reused, same as the owned-games response cache
+MAX_LIBRARIES = 256  # Library indexes kept in memory
+MAX_SCORED_SUGGESTIONS = 200  # Containing matches ranked by similarity, beyond that by playtime
+
+def normalize(name):
+    """Normalizes a game name for matching: only word characters, lower case."""
+    return NON_WORD.sub("", name).lower()
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class GameSearchIndex:
+    """Search index over one Steam library, built once per library.
+
+    Matches in three tiers, like the original linear search: an exact normalized name, then a
+    name starting with the input (first in library order), then the name containing the input
+    that is most similar to it. Prefix matches use binary search over the sorted names, containment
+    candidates come from a trigram index.
+    """
+
+    def __init__(self, games):
+        self.games = games  # OwnedLibrary
+        self.names = [normalize(name) for name in games.names]
+
+        self.exact = {}  # normalized name -> index of the first game with that name
+        self.trigram_index = {}  # trigram -> set of game indexes
+        for index, name in enumerate(self.names):
+            self.exact.setdefault(name, index)
+            for gram in trigrams(name):
+                self.trigram_index.setdefault(gram, set()).add(index)
+
+        self.sorted_names = sorted((name, index) for index, name in enumerate(self.names))
+        self.sorted_keys = [name for name, _ in self.sorted_names]
+        # Most played games first, used to order suggestions
+        playtime = games.playtime_forever
+        self.by_playtime = sorted(range(len(games)), key=playtime.__getitem__, reverse=True)
+        self.playtime_rank = {index: rank for rank, index in enumerate(self.by_playtime)}
+
+    def find(self, user_input):
+        """Returns the best matching game for the input, or None."""
+        query = normalize(user_input)
+
+        index = self.exact.get(query)
+        if index is not None:
+            return self.games[index]
+
+        # All names starting with the query form one range in the sorted names
+        start = bisect_left(self.sorted_keys, query)
+        end = start
+        while end < len(self.sorted_keys) and self.sorted_keys[end].startswith(query):
+            end += 1
+        if end > start:
+            return self.games[min(index for _, index in self.sorted_names[start:end])]
+
+        return self._best_containing(query)
+
+    def suggest(self, user_input, limit=25):
+        """Returns up to `limit` games for autocompletion.
+
+        Exact and prefix matches come first, most played first, followed by names containing the
+        input ordered by similarity. An empty input suggests the most played games.
+        """
+        query = normalize(user_input)
+        if not query:
+            return [self.games[index] for index in self.by_playtime[:limit]]
+
+        start = bisect_left(self.sorted_keys, query)
+        end = start
+        while end < len(self.sorted_keys) and self.sorted_keys[end].startswith(query):
+            end += 1
+        prefixed = sorted((index for _, index in self.sorted_names[start:end]), key=self.playtime_rank.get)
+        suggestions = prefixed[:limit]
+
+        if len(suggestions) < limit:
+            seen = set(prefixed)
+            containing = [index for index in self._containing(query) if index not in seen]
+            if len(containing) > MAX_SCORED_SUGGESTIONS:
+                # Too many to score within the autocomplete deadline, most played first instead
+                containing.sort(key=self.playtime_rank.get)
+            else:
+                matcher = SequenceMatcher()
+                matcher.set_seq2(query)
+                scores = {}
+                for index in containing:
+                    matcher.set_seq1(self.names[index])
+                    scores[index] = -matcher.ratio()
+                containing.sort(key=lambda index: (scores[index], self.playtime_rank[index]))
+            suggestions.extend(containing[:limit - len(suggestions)])
+
+        return [self.games[index] for index in suggestions]
+
+    def _containing(self, query):
+        """Returns the indexes of all names containing the query, in library order."""
+        if len(query) >= 3:
+            # Only names sharing every trigram of the query can contain it
+            postings = sorted((self.trigram_index.get(gram, set()) for gram in trigrams(query)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            candidates = range(len(self.names))
+        return sorted(index for index in candidates if query in self.names[index])
+
+    def _best_containing(self, query):
+        candidates = self._containing(query)
+        if not candidates:
+            return None
+
+        # Most similar name wins, ties go to the larger name like difflib.get_close_matches
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        best_key, best_index = None, None
+        for index in candidates:
+            matcher.set_seq1(self.names[index])
+            key = (matcher.ratio(), self.names[index])
+            if best_key is None or key > best_key:
+                best_key, best_index = key, index
+        # The first game carrying the winning name
+        return self.games[self.exact[self.names[best_index]]]
+
+class LibraryIndexCache:
+    """Keeps the search indexes of recently used libraries, keyed by SteamID64."""
+
+    def __init__(self, ttl=LIBRARY_TTL, max_entries=MAX_LIBRARIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # steamid64 -> (expires_at, GameSearchIndex)
+
+    def get(self, steamid64):
+        entry = self.entries.get(steamid64)
+        if entry is None:
+            return None
+        expires_at, index = entry
+        if time.monotonic() >= expires_at:
+            del self.entries[steamid64]
+            return None
+        self.entries.move_to_end(steamid64)
+        return index
+
+    def put(self, steamid64, games):
+        index = GameSearchIndex(games)
+        self.entries[steamid64] = (time.monotonic() + self.ttl, index)
+        self.entries.move_to_end(steamid64)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return index
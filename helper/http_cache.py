@@ -0,0 +1,260 @@
+import os
+import re
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from logger import get_logger
+
+log = get_logger(__name__)
+
+CACHE_DIR = "cache"
+CACHE_DB_FILE = os.path.join(CACHE_DIR, "http_cache.sqlite3")
+MEMORY_MAX_ENTRIES = 512  # Max responses kept in the in-memory LRU
+MEMORY_MAX_BYTES = 32 * 1024 * 1024  # 32 MiB of response bodies in memory
+STALE_GRACE = 7 * 24 * 3600  # Seconds a stale entry with validators is kept for revalidation
+FLUSH_INTERVAL = 2  # Seconds writes are collected before they go to disk in one commit
+
+# Query parameters that carry credentials and must never be part of a cache key
+SECRET_PARAMS = {"key", "api_key"}
+
+class CachePolicy:
+    """TTL policy for all URLs matching a pattern."""
+
+    def __init__(self, name, pattern, ttl, memory=True):
+        self.name = name  # Short name used in the statistics
+        self.pattern = re.compile(pattern)  # Regex matched against the URL
+        self.ttl = ttl  # Seconds a response stays fresh
+        self.memory = memory  # Whether bodies are kept in the memory tier, or on disk only
+
+# Endpoints worth caching, checked in order; URLs without a policy are never cached
+DEFAULT_POLICIES = [
+    CachePolicy("ddragon_versions", r"ddragon\.leagueoflegends\.com/api/versions\.json", 3600),
+    CachePolicy("ddragon_data", r"ddragon\.leagueoflegends\.com/cdn/", 7 * 24 * 3600),
+    CachePolicy("steam_schema", r"api\.steampowered\.com/ISteamUserStats/GetSchemaForGame/", 24 * 3600),
+    # Library bodies are several MB, the Steam cog keeps the parsed libraries in memory instead
+    CachePolicy("steam_owned_games", r"api\.steampowered\.com/IPlayerService/GetOwnedGames/", 1800, memory=False),
+    CachePolicy("riot_summoner", r"api\.riotgames\.com/lol/summoner/v4/", 3600),
+    CachePolicy("riot_mastery", r"api\.riotgames\.com/lol/champion-mastery/v4/", 1800),
+]
+
+class CacheEntry:
+    """A cached response body together with its validators."""
+
+    __slots__ = ("body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body, etag, last_modified, expires_at):
+        self.body = body  # Raw response body (bytes)
+        self.etag = etag  # ETag header of the response, if any
+        self.last_modified = last_modified  # Last-Modified header of the response, if any
+        self.expires_at = expires_at  # Unix time after which the entry is stale
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def has_validators(self):
+        return bool(self.etag or self.last_modified)
+
+class ResponseCache:
+    """Two-tier HTTP response cache: an in-memory LRU in front of an SQLite store on disk.
+
+    The HttpClient asks the cache for the policy of a URL, serves fresh entries directly,
+    and revalidates stale entries with If-None-Match / If-Modified-Since when possible.
+    Disk reads run in a worker thread, disk writes are collected and committed together.
+    """
+
+    def __init__(self, policies=None, db_file=CACHE_DB_FILE, max_entries=MEMORY_MAX_ENTRIES, max_bytes=MEMORY_MAX_BYTES):
+        self.policies = policies if policies is not None else DEFAULT_POLICIES
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()  # cache key -> CacheEntry
+        self.memory_bytes = 0
+        self.counters = {}  # policy name -> dict of counters
+        self.pending = {}  # cache key -> CacheEntry not written to disk yet
+        self.pending_refreshes = {}  # cache key -> new expires_at not written to disk yet
+        self._flush_task = None
+        self._db = None
+        self._db_lock = threading.Lock()  # The connection is used from worker threads
+
+    # -----------------------------------------
+    # Keys and policies
+    # -----------------------------------------
+
+    def policy_for(self, url):
+        """Returns the first policy matching the URL, or None if it must not be cached."""
+        for policy in self.policies:
+            if policy.pattern.search(url):
+                return policy
+        return None
+
+    @staticmethod
+    def make_key(url, params=None):
+        """Builds a stable cache key from a URL and its query parameters, without credentials."""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if params:
+            query.extend((k, str(v)) for k, v in params.items())
+        query = sorted((k, v) for k, v in query if k not in SECRET_PARAMS)
+        return f"{parts.netloc}{parts.path}?{urlencode(query)}"
+
+    # -----------------------------------------
+    # Lookup and storage
+    # -----------------------------------------
+
+    async def get(self, key, remember=True):
+        """Returns the entry for a key from memory or disk, or None. Stale entries are returned too.
+
+        Entries read from disk are only put into the memory tier if `remember` is set.
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            return entry
+        entry = self.pending.get(key)
+        if entry is not None:
+            return entry  # Not written to disk yet
+
+        row = await asyncio.to_thread(self._read, key)
+        if row is None:
+            return None
+
+        entry = CacheEntry(*row)
+        if remember:
+            self._remember(key, entry)
+        return entry
+
+    def store(self, key, body, etag, last_modified, ttl, remember=True):
+        """Stores a response body under a key on disk, and in memory if `remember` is set.
+
+        The disk write happens in the background, together with the other writes of the next
+        flush interval.
+        """
+        entry = CacheEntry(body, etag, last_modified, time.time() + ttl)
+        if remember:
+            self._remember(key, entry)
+        self.pending[key] = entry
+        self.pending_refreshes.pop(key, None)
+        self._schedule_flush()
+        return entry
+
+    def refresh(self, key, entry, ttl):
+        """Extends the lifetime of an entry after a successful revalidation (HTTP 304)."""
+        entry.expires_at = time.time() + ttl
+        if key not in self.pending:
+            self.pending_refreshes[key] = entry.expires_at
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(FLUSH_INTERVAL)
+        entries, self.pending = self.pending, {}
+        refreshes, self.pending_refreshes = self.pending_refreshes, {}
+        try:
+            await asyncio.to_thread(self._write, entries, refreshes)
+        except Exception as e:
+            log.error(f"Error writing {len(entries) + len(refreshes)} cache entries: {e}")
+
+    def _read(self, key):
+        with self._db_lock:
+            return self.db.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _write(self, entries, refreshes):
+        """Writes stored entries and extended lifetimes to disk in one transaction."""
+        if not entries and not refreshes:
+            return
+        with self._db_lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, expires_at) VALUES (?, ?, ?, ?, ?)",
+                [(key, e.body, e.etag, e.last_modified, e.expires_at) for key, e in entries.items()]
+            )
+            self.db.executemany(
+                "UPDATE responses SET expires_at = ? WHERE key = ?",
+                [(expires_at, key) for key, expires_at in refreshes.items()]
+            )
+            self.db.commit()
+
+    def _remember(self, key, entry):
+        """Puts an entry into the memory tier and evicts the least recently used entries."""
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= len(previous.body)
+        self.memory[key] = entry
+        self.memory_bytes += len(entry.body)
+
+        while self.memory and (len(self.memory) > self.max_entries or self.memory_bytes > self.max_bytes):
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted.body)
+
+    @property
+    def db(self):
+        """Returns the SQLite connection, creating the store on first use."""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL
+            );""")
+            self._purge()
+        return self._db
+
+    def _purge(self):
+        """Deletes entries that are stale and can no longer be revalidated."""
+        now = time.time()
+        self._db.execute("""
+            DELETE FROM responses
+            WHERE (expires_at < ? AND etag IS NULL AND last_modified IS NULL)
+               OR expires_at < ?
+        """, (now, now - STALE_GRACE))
+        self._db.commit()
+
+    # -----------------------------------------
+    # Statistics
+    # -----------------------------------------
+
+    def count(self, policy, event, size=0):
+        """Records a cache event (hit, miss, revalidated) and the bytes involved for a policy."""
+        counters = self.counters.setdefault(policy.name, {
+            "hits": 0, "misses": 0, "revalidated": 0, "bytes_served": 0, "bytes_fetched": 0
+        })
+        counters[event] += 1
+        if event == "misses":
+            counters["bytes_fetched"] += size
+        else:
+            counters["bytes_served"] += size
+
+    def log_stats(self):
+        """Writes the counters of every policy to the log."""
+        for name, c in self.counters.items():
+            lookups = c["hits"] + c["misses"] + c["revalidated"]
+            hit_rate = (c["hits"] + c["revalidated"]) / lookups * 100 if lookups else 0
+            log.info(
+                f"Cache {name}: {c['hits']} hits, {c['revalidated']} revalidated, {c['misses']} misses "
+                f"({hit_rate:.0f}% hit rate), {c['bytes_served']} bytes served, {c['bytes_fetched']} bytes fetched"
+            )
+        log.info(f"Cache memory: {len(self.memory)} entries, {self.memory_bytes} bytes")
+
+    async def close(self):
+        """Writes the pending entries and closes the disk store."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task  # At most FLUSH_INTERVAL
+        await asyncio.to_thread(self._write, self.pending, self.pending_refreshes)
+        self.pending, self.pending_refreshes = {}, {}
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
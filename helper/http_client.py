@@ -0,0 +1,193 @@
+import json
+import aiohttp
+from helper.singleflight import SingleFlight
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Connection pool defaults shared by all cogs
+TOTAL_CONNECTION_LIMIT = 100  # Max open connections across all hosts
+PER_HOST_CONNECTION_LIMIT = 10  # Max open connections to a single host
+DNS_CACHE_TTL = 300  # Seconds a resolved hostname is reused
+KEEPALIVE_TIMEOUT = 30  # Seconds an idle connection is kept open
+REQUEST_TIMEOUT = 10  # Total seconds a single request may take
+CONNECT_TIMEOUT = 5  # Seconds allowed for establishing a connection
+
+class HttpResponse:
+    """Result of a request made through the HttpClient."""
+
+    __slots__ = ("status", "data", "headers", "cached")
+
+    def __init__(self, status, data, headers, cached=False):
+        self.status = status  # HTTP status code
+        self.data = data  # Decoded JSON body, or None if the body was not JSON
+        self.headers = headers  # Response headers
+        self.cached = cached  # Whether the body was served from the response cache
+
+    @property
+    def ok(self):
+        return self.status == 200
+
+class HttpClient:
+    """Bot-wide HTTP client with a pooled, keep-alive aiohttp session.
+
+    A single instance is attached to the bot as `bot.http_client` and shared by all cogs,
+    so connections and DNS lookups are reused between commands. If a ResponseCache is given,
+    GET requests for URLs with a cache policy are served from it. Identical GET requests that
+    run at the same time share a single upstream request.
+    """
+
+    def __init__(self, limit=TOTAL_CONNECTION_LIMIT, limit_per_host=PER_HOST_CONNECTION_LIMIT,
+                 dns_ttl=DNS_CACHE_TTL, keepalive_timeout=KEEPALIVE_TIMEOUT, timeout=REQUEST_TIMEOUT, cache=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=CONNECT_TIMEOUT)
+        self.cache = cache  # Optional ResponseCache
+        self.flights = SingleFlight()  # Coalesces concurrent identical requests
+        self._session = None
+        self._pools = {}  # Named sessions with their own connection pool
+
+    def _new_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    @property
+    def session(self):
+        """Returns the shared session, creating it on first use inside the running event loop."""
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+            log.info("HTTP client session created.")
+        return self._session
+
+    def session_for(self, pool=None):
+        """Returns the session of a named connection pool, or the shared session if no pool is given."""
+        if pool is None:
+            return self.session
+        session = self._pools.get(pool)
+        if session is None or session.closed:
+            session = self._new_session()
+            self._pools[pool] = session
+            log.info(f"HTTP connection pool '{pool}' created.")
+        return session
+
+    async def peek(self, url, params=None):
+        """Returns a fresh cached response for a URL without any network access, or None.
+
+        Used by rate-limited API clients to avoid spending a request token on a cache hit.
+        """
+        policy = self.cache.policy_for(url) if self.cache else None
+        if policy is None:
+            return None
+        entry = await self.cache.get(self.cache.make_key(url, params), remember=policy.memory)
+        if entry is None or not entry.fresh:
+            return None
+        self.cache.count(policy, "hits", len(entry.body))
+        return HttpResponse(200, self._decode(entry.body), {}, cached=True)
+
+    async def get_json(self, url, params=None, headers=None, timeout=None, cache=True, pool=None, decoder=None):
+        """Performs a GET request and decodes the JSON body.
+
+        Args:
+            url (str): The URL to fetch.
+            params (dict, optional): Query parameters.
+            headers (dict, optional): Additional request headers.
+            timeout (float, optional): Overrides the default total timeout in seconds.
+            cache (bool, optional): Set to False to bypass the response cache.
+            pool (str, optional): Name of a separate connection pool to use.
+            decoder (callable, optional): Turns the body bytes into the response data instead of
+                json.loads. Returns None if the body cannot be decoded.
+
+        Returns:
+            HttpResponse: The status, decoded body and headers of the response.
+        """
+        key = ("GET", url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())), cache, decoder)
+        return await self.flights.do(key, lambda: self._get_json(url, params, headers, timeout, cache, pool, decoder or self._decode))
+
+    async def _get_json(self, url, params, headers, timeout, cache, pool, decode):
+        """Performs the GET request of get_json, using the response cache if a policy applies."""
+        policy = self.cache.policy_for(url) if self.cache and cache else None
+        if policy is None:
+            status, body, resp_headers = await self._get(url, params, headers, timeout, pool)
+            return HttpResponse(status, decode(body), resp_headers)
+
+        key = self.cache.make_key(url, params)
+        entry = await self.cache.get(key, remember=policy.memory)
+        if entry is not None and entry.fresh:
+            self.cache.count(policy, "hits", len(entry.body))
+            return HttpResponse(200, decode(entry.body), {}, cached=True)
+
+        # Revalidate stale entries instead of downloading the body again
+        request_headers = dict(headers or {})
+        if entry is not None and entry.has_validators:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        status, body, resp_headers = await self._get(url, params, request_headers, timeout, pool)
+        if status == 304 and entry is not None:
+            self.cache.refresh(key, entry, policy.ttl)
+            self.cache.count(policy, "revalidated", len(entry.body))
+            return HttpResponse(200, decode(entry.body), resp_headers, cached=True)
+
+        self.cache.count(policy, "misses", len(body))
+        data = decode(body)
+        if status == 200 and data is not None:
+            self.cache.store(key, body, resp_headers.get("ETag"), resp_headers.get("Last-Modified"), policy.ttl, policy.memory)
+        return HttpResponse(status, data, resp_headers)
+
+    async def _get(self, url, params, headers, timeout, pool=None):
+        """Performs the raw GET request and returns status, body bytes and headers."""
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        async with self.session_for(pool).get(url, params=params, headers=headers, timeout=request_timeout) as resp:
+            return resp.status, await resp.read(), resp.headers
+
+    @staticmethod
+    def _decode(body):
+        """Decodes a JSON body, returning None if it is empty or not JSON."""
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    async def post_json(self, url, json=None, headers=None, timeout=None):
+        """Performs a POST request with a JSON body and decodes the JSON response.
+
+        Args:
+            url (str): The URL to post to.
+            json (dict, optional): The JSON payload.
+            headers (dict, optional): Additional request headers.
+            timeout (float, optional): Overrides the default total timeout in seconds.
+
+        Returns:
+            HttpResponse: The status, decoded body and headers of the response.
+        """
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        async with self.session.post(url, json=json, headers=headers, timeout=request_timeout) as resp:
+            try:
+                data = await resp.json(content_type=None)
+            except ValueError:
+                data = None
+            return HttpResponse(resp.status, data, resp.headers)
+
+    async def close(self):
+        """Closes the shared session and its connection pool, and the response cache."""
+        if self.cache is not None:
+            self.cache.log_stats()
+            await self.cache.close()
+        log.info(f"Single-flight coalescing saved {self.flights.saved} requests.")
+        for session in self._pools.values():
+            if not session.closed:
+                await session.close()
+        self._pools = {}
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            log.info("HTTP client session closed.")
+        self._session = None
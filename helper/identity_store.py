@@ -0,0 +1,125 @@
+import asyncio
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Kinds of identifiers the store resolves
+KIND_STEAM_VANITY = "steam_vanity"  # Steam custom URL -> SteamID64
+KIND_RIOT_ID = "riot_id"  # Riot ID (Name#Tag) -> account-v1 account
+
+# How long a resolved mapping is trusted. Vanity URLs and Riot IDs can be given up and taken
+# by someone else, so they are re-checked eventually, just rarely.
+POSITIVE_TTLS = {
+    KIND_STEAM_VANITY: timedelta(days=30),
+    KIND_RIOT_ID: timedelta(days=7),
+}
+DEFAULT_POSITIVE_TTL = timedelta(days=1)
+NEGATIVE_TTL = timedelta(minutes=10)  # "Not found" may turn into a hit once the user sets up the name
+MEMORY_MAX_ENTRIES = 4096  # Mappings kept in the in-memory LRU
+
+class IdentityLookupError(Exception):
+    """Raised by a resolver when the upstream API failed, which must not be cached as "not found"."""
+
+    def __init__(self, status):
+        super().__init__(f"Identity lookup failed. HTTP Status: {status}")
+        self.status = status
+
+class IdentityStore:
+    """Persistent map of user-facing identifiers to stable IDs.
+
+    Lookups go to an in-memory LRU first, then to the identities table, and only call the
+    resolver (an HTTP request) when both have no fresh answer. Identifiers that do not exist
+    are remembered as well, but only for a short time.
+    """
+
+    def __init__(self, db, ttls=None, negative_ttl=NEGATIVE_TTL, max_entries=MEMORY_MAX_ENTRIES):
+        self.db = db
+        self.ttls = ttls or POSITIVE_TTLS
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.memory = OrderedDict()  # (kind, key) -> (value, expires_at)
+        self.stats = {"memory_hits": 0, "db_hits": 0, "resolved": 0}
+
+    @staticmethod
+    def normalize(key):
+        # Vanity URLs and Riot IDs are case-insensitive
+        return key.strip().lower()
+
+    def expires_at(self, kind, value, resolved_at):
+        ttl = self.negative_ttl if value is None else self.ttls.get(kind, DEFAULT_POSITIVE_TTL)
+        return resolved_at + ttl
+
+    def _remember_in_memory(self, kind, key, value, expires_at):
+        self.memory[(kind, key)] = (value, expires_at)
+        self.memory.move_to_end((kind, key))
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def peek(self, kind, key):
+        """Like lookup(), but only checks memory. Safe for latency-critical paths like autocomplete."""
+        entry = self.memory.get((kind, self.normalize(key)))
+        if entry is None or datetime.now() >= entry[1]:
+            return False, None
+        return True, entry[0]
+
+    async def lookup(self, kind, key):
+        """Returns (True, value) for a fresh mapping, value being None for "not found", or (False, None)."""
+        key = self.normalize(key)
+        entry = self.memory.get((kind, key))
+        if entry is not None:
+            value, expires_at = entry
+            if datetime.now() < expires_at:
+                self.memory.move_to_end((kind, key))
+                self.stats["memory_hits"] += 1
+                return True, value
+            del self.memory[(kind, key)]
+
+        try:
+            row = await asyncio.to_thread(self.db.get_identity, kind, key)
+        except Exception as e:
+            log.error(f"Error reading identity {kind}:{key}: {e}")
+            return False, None
+        if row is None:
+            return False, None
+
+        raw_value, resolved_at = row
+        value = json.loads(raw_value) if raw_value is not None else None
+        expires_at = self.expires_at(kind, value, resolved_at)
+        if datetime.now() >= expires_at:
+            return False, None
+        self._remember_in_memory(kind, key, value, expires_at)
+        self.stats["db_hits"] += 1
+        return True, value
+
+    async def remember(self, kind, key, value):
+        """Stores a resolved mapping, or None if the identifier does not exist."""
+        key = self.normalize(key)
+        self._remember_in_memory(kind, key, value, self.expires_at(kind, value, datetime.now()))
+        try:
+            await asyncio.to_thread(self.db.store_identity, kind, key, json.dumps(value) if value is not None else None)
+        except Exception as e:
+            log.error(f"Error storing identity {kind}:{key}: {e}")
+
+    async def resolve(self, kind, key, resolver):
+        """Returns the value for an identifier, calling `resolver` only if no fresh mapping is stored.
+
+        Args:
+            kind (str): KIND_STEAM_VANITY or KIND_RIOT_ID.
+            key (str): The identifier as entered by the user.
+            resolver (callable): Async function returning the value, None if the identifier does
+                not exist, or raising IdentityLookupError if the upstream API failed.
+
+        Returns:
+            The value, or None if the identifier does not exist.
+        """
+        found, value = await self.lookup(kind, key)
+        if found:
+            return value
+
+        value = await resolver()
+        self.stats["resolved"] += 1
+        await self.remember(kind, key, value)
+        return value
@@ -0,0 +1,43 @@
+import time
+from collections import deque
+
+class LatencyTracker:
+    """Keeps the most recent latency samples of an operation and reports percentiles."""
+
+    def __init__(self, name, max_samples=1000):
+        self.name = name
+        self.samples = deque(maxlen=max_samples)  # Seconds
+        self.count = 0  # Samples recorded in total
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def measure(self):
+        """Context manager recording the duration of its block."""
+        return _Measurement(self)
+
+    def percentile(self, percent):
+        """Returns the given percentile of the recent samples in seconds, or None without samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+    def summary(self):
+        if not self.samples:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: {self.count} calls, p50 {self.percentile(50) * 1000:.2f}ms, "
+                f"p99 {self.percentile(99) * 1000:.2f}ms, max {max(self.samples) * 1000:.2f}ms")
+
+class _Measurement:
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracker.record(time.perf_counter() - self.start)
+        return False
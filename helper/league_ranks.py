@@ -0,0 +1,63 @@
+import re
+
+TIERS = ["IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND", "MASTER", "GRANDMASTER", "CHALLENGER"]
+DIVISIONS = ["IV", "III", "II", "I"]
+APEX_TIERS = {"MASTER", "GRANDMASTER", "CHALLENGER"}  # Tiers without divisions, ordered by LP only
+QUEUE_SOLO = "RANKED_SOLO_5x5"
+
+def rank_score(tier, division=None, league_points=0):
+    """Converts a rank into a single comparable number: 100 points per division plus LP.
+
+    Iron IV 0 LP is 0, Diamond I 100 LP is 2800. Master and above share one ladder and are ordered by LP.
+    Returns None for unranked players.
+    """
+    if not tier or tier.upper() not in TIERS:
+        return None
+    tier = tier.upper()
+    league_points = league_points or 0
+    if tier in APEX_TIERS:
+        return TIERS.index("MASTER") * 400 + league_points
+    division_index = DIVISIONS.index(division) if division in DIVISIONS else 0
+    return TIERS.index(tier) * 400 + division_index * 100 + league_points
+
+def format_rank(tier, division=None, league_points=0):
+    """Formats a rank like 'GOLD II - 45 LP', or 'Unranked'."""
+    if not tier:
+        return "Unranked"
+    if tier.upper() in APEX_TIERS:
+        return f"{tier} - {league_points} LP"
+    return f"{tier} {division} - {league_points} LP"
+
+def pick_solo_entry(entries):
+    """Returns the solo queue entry of a league-v4 entries list, falling back to the first entry."""
+    if not entries:
+        return None
+    for entry in entries:
+        if entry.get("queueType") == QUEUE_SOLO:
+            return entry
+    return entries[0]
+
+TIER_ALIASES = {"PLAT": "PLATINUM", "EMMY": "EMERALD", "DIA": "DIAMOND", "GM": "GRANDMASTER", "CHALL": "CHALLENGER"}
+RANK_PATTERN = re.compile(r"^([a-z]+)\s*(?:(iv|i{1,3}|[1-4])\b)?\s*(?:(\d+)\s*(?:lp)?)?$", re.IGNORECASE)
+
+def parse_rank(text):
+    """Parses a rank typed by a user into a rank score.
+
+    Accepts inputs like 'Gold 2', 'gold II 40 LP', 'Master 120' or a plain score like '1450'.
+    Returns None if the text is not a rank.
+    """
+    text = (text or "").strip()
+    if text.isdigit():
+        return int(text)
+
+    match = RANK_PATTERN.match(text)
+    if not match:
+        return None
+    word, division, league_points = match.groups()
+    word = word.upper()
+    tier = TIER_ALIASES.get(word) or next((t for t in TIERS if t.startswith(word)), None)
+    if tier is None:
+        return None
+    if division and division.isdigit():
+        division = DIVISIONS[4 - int(division)]
+    return rank_score(tier, division.upper() if division else None, int(league_points or 0))
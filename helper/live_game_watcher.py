@@ -0,0 +1,145 @@
+import asyncio
+import time
+from helper.riot_client import PRIORITY_BACKGROUND
+from logger import get_logger
+
+log = get_logger(__name__)
+
+ROUND_INTERVAL = 15  # Seconds between polling rounds
+IN_GAME_INTERVAL = 60  # Seconds between polls while a player is in a game
+IDLE_INTERVAL = 180  # Seconds between polls right after a player was seen idle
+MAX_IDLE_INTERVAL = 900  # Idle polling backs off up to this interval
+BUDGET_SHARE = 0.2  # Share of the Riot application rate limit the watcher may use
+REQUEST_TIMEOUT = 10  # Seconds a single spectator request may take
+
+class WatchedPlayer:
+    """Polling state of one watched League account."""
+
+    __slots__ = ("puuid", "riot_id", "host", "next_poll", "interval", "game_id", "game_start")
+
+    def __init__(self, puuid, riot_id, host):
+        self.puuid = puuid
+        self.riot_id = riot_id
+        self.host = host  # Platform host the account plays on
+        self.next_poll = 0  # Monotonic time of the next spectator request
+        self.interval = IDLE_INTERVAL  # Current polling interval
+        self.game_id = None  # Id of the game the player is currently in
+        self.game_start = None  # Unix time the current game was first seen
+
+class LiveGameWatcher:
+    """Polls the spectator endpoint for watched players and reports game starts and ends.
+
+    Players are polled in rounds. Players in a game are polled quickly, idle players back off
+    exponentially. Each round spends at most the budget accumulated since the last round, which is
+    a fixed share of the Riot application rate limit of each platform, no matter how many players
+    are watched.
+    """
+
+    def __init__(self, riot, on_game_start, on_game_end, budget_share=BUDGET_SHARE):
+        self.riot = riot  # RiotClient used for the spectator requests
+        self.on_game_start = on_game_start  # async callback(player, game)
+        self.on_game_end = on_game_end  # async callback(player, duration_seconds)
+        self.budget_share = budget_share
+        self.players = {}  # puuid -> WatchedPlayer
+        self.tokens = {}  # host -> requests the watcher may currently send to that platform
+        self._last_round = None
+        self._task = None
+
+    def watch(self, puuid, riot_id, host):
+        player = self.players.get(puuid)
+        if player is None or player.host != host:
+            self.players[puuid] = WatchedPlayer(puuid, riot_id, host)
+
+    def unwatch(self, puuid):
+        self.players.pop(puuid, None)
+
+    def budget_per_second(self, host):
+        """Returns the number of requests per second the watcher may send to a platform."""
+        bucket = self.riot.limiter.app_bucket(host)
+        rates = [window.limit / window.seconds for window in bucket.windows]
+        return self.budget_share * min(rates) if rates else 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_round()
+            except Exception as e:
+                log.error(f"Error in live game polling round: {e}")
+            await asyncio.sleep(ROUND_INTERVAL)
+
+    async def poll_round(self):
+        """Polls every due player that fits into the accumulated request budget of their platform."""
+        now = time.monotonic()
+        elapsed = now - self._last_round if self._last_round is not None else 0
+        self._last_round = now
+
+        due_by_host = {}
+        for player in sorted(self.players.values(), key=lambda p: p.next_poll):
+            if player.next_poll <= now:
+                due_by_host.setdefault(player.host, []).append(player)
+
+        batch = []
+        for host in {p.host for p in self.players.values()}:
+            rate = self.budget_per_second(host)
+            # Never save up more than one round worth of requests beyond the current one
+            tokens = min(self.tokens.get(host, 0.0) + rate * elapsed, rate * ROUND_INTERVAL * 2)
+            allowed = due_by_host.get(host, [])[:int(tokens)]
+            self.tokens[host] = tokens - len(allowed)
+            batch.extend(allowed)
+
+        if batch:
+            await asyncio.gather(*(self.poll_player(player) for player in batch))
+
+    async def poll_player(self, player):
+        """Checks whether a player is in a game and reports changes."""
+        try:
+            resp = await asyncio.wait_for(
+                self.riot.get(player.host, "spectator-v5.active-game", f"/lol/spectator/v5/active-games/by-summoner/{player.puuid}",
+                              priority=PRIORITY_BACKGROUND, cache=False),
+                timeout=REQUEST_TIMEOUT
+            )
+        except Exception as e:
+            log.warning(f"Live game check for {player.riot_id} failed: {e}")
+            player.next_poll = time.monotonic() + player.interval
+            return
+
+        if resp.status == 200:
+            game = resp.data
+            if game.get("gameId") != player.game_id:
+                if player.game_id is not None:
+                    await self._report_end(player)
+                player.game_id = game.get("gameId")
+                player.game_start = time.time()
+                await self._report(self.on_game_start, player, game)
+            player.interval = IN_GAME_INTERVAL
+        elif resp.status == 404:
+            if player.game_id is not None:
+                await self._report_end(player)
+                player.interval = IDLE_INTERVAL
+            else:
+                player.interval = min(player.interval * 2, MAX_IDLE_INTERVAL)
+        else:
+            log.warning(f"Live game check for {player.riot_id} failed. HTTP Status: {resp.status}")
+
+        player.next_poll = time.monotonic() + player.interval
+
+    async def _report_end(self, player):
+        duration = time.time() - player.game_start if player.game_start else 0
+        player.game_id = None
+        player.game_start = None
+        await self._report(self.on_game_end, player, duration)
+
+    async def _report(self, callback, player, payload):
+        try:
+            await callback(player, payload)
+        except Exception as e:
+            log.error(f"Error announcing live game update for {player.riot_id}: {e}")
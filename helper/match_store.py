@@ -0,0 +1,140 @@
+import os
+import gzip
+import json
+import asyncio
+import tempfile
+from collections import Counter
+from helper.riot_client import PRIORITY_INTERACTIVE
+from logger import get_logger
+
+log = get_logger(__name__)
+
+MATCH_DIR = os.path.join("data", "matches")
+
+class MatchStore:
+    """Permanent on-disk cache of Riot match-v5 match data.
+
+    Matches never change once they are finished, so every match is downloaded exactly once
+    and stored gzip-compressed as data/matches/<match id>.json.gz.
+    """
+
+    def __init__(self, riot, match_dir=MATCH_DIR):
+        self.riot = riot  # RiotClient for the match-v5 requests
+        self.match_dir = match_dir
+
+    def path(self, match_id):
+        # Match ids look like EUW1_1234567890, keep only safe characters for the file name
+        safe_id = "".join(c for c in match_id if c.isalnum() or c == "_")
+        return os.path.join(self.match_dir, f"{safe_id}.json.gz")
+
+    def load(self, match_id):
+        """Returns a stored match, or None if it has not been downloaded yet."""
+        try:
+            with gzip.open(self.path(match_id), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"Discarding unreadable cached match {match_id}: {e}")
+            return None
+
+    def save(self, match_id, match):
+        os.makedirs(self.match_dir, exist_ok=True)
+        path = self.path(match_id)
+        # Every writer gets its own temporary file, concurrent saves of a match must not mix
+        with tempfile.NamedTemporaryFile(dir=self.match_dir, prefix=os.path.basename(path), suffix=".tmp", delete=False) as tmp:
+            try:
+                with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                    json.dump(match, f, separators=(",", ":"))
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+
+    async def get_match_ids(self, host, puuid, count, priority=PRIORITY_INTERACTIVE):
+        """Returns the ids of a player's most recent matches, newest first.
+
+        `host` is the regional routing host of the player's platform, e.g. europe.api.riotgames.com.
+        """
+        resp = await self.riot.get(
+            host, "match-v5.ids-by-puuid", f"/lol/match/v5/matches/by-puuid/{puuid}/ids",
+            params={"start": 0, "count": count}, priority=priority, cache=False
+        )
+        if resp.status != 200:
+            raise RuntimeError(f"Failed to fetch match ids. HTTP Status: {resp.status}")
+        return resp.data
+
+    async def get_match(self, host, match_id, priority=PRIORITY_INTERACTIVE):
+        """Returns a match from disk, downloading and storing it first if necessary."""
+        match = await asyncio.to_thread(self.load, match_id)
+        if match is not None:
+            return match
+
+        resp = await self.riot.get(host, "match-v5.match", f"/lol/match/v5/matches/{match_id}", priority=priority, cache=False)
+        if resp.status != 200:
+            log.warning(f"Failed to fetch match {match_id}. HTTP Status: {resp.status}")
+            return None
+        await asyncio.to_thread(self.save, match_id, resp.data)
+        return resp.data
+
+    async def get_recent_matches(self, host, puuid, count, priority=PRIORITY_INTERACTIVE):
+        """Returns a player's most recent matches. Only matches not stored yet are downloaded."""
+        match_ids = await self.get_match_ids(host, puuid, count, priority)
+        matches = await asyncio.gather(*(self.get_match(host, match_id, priority) for match_id in match_ids))
+        return [m for m in matches if m is not None]
+
+class MatchSummary:
+    """The stats of one player in one match."""
+
+    __slots__ = ("match_id", "champion", "kills", "deaths", "assists", "win", "queue", "duration", "played_at")
+
+    def __init__(self, match, puuid):
+        info = match["info"]
+        player = next(p for p in info["participants"] if p["puuid"] == puuid)
+        self.match_id = match["metadata"]["matchId"]
+        self.champion = player["championName"]
+        self.kills = player["kills"]
+        self.deaths = player["deaths"]
+        self.assists = player["assists"]
+        self.win = player["win"]
+        self.queue = info.get("gameMode", "Unknown")
+        self.duration = info.get("gameDuration", 0)  # Seconds
+        self.played_at = info.get("gameStartTimestamp", 0) // 1000  # Unix time
+
+    @property
+    def kda(self):
+        return (self.kills + self.assists) / max(self.deaths, 1)
+
+def summarize_matches(matches, puuid):
+    """Turns raw matches into MatchSummary objects, skipping matches the player is not part of."""
+    summaries = []
+    for match in matches:
+        try:
+            summaries.append(MatchSummary(match, puuid))
+        except (KeyError, StopIteration):
+            continue
+    return summaries
+
+def aggregate(summaries):
+    """Aggregates win rate, KDA and champion pool over a list of MatchSummary objects."""
+    games = len(summaries)
+    wins = sum(s.win for s in summaries)
+    kills = sum(s.kills for s in summaries)
+    deaths = sum(s.deaths for s in summaries)
+    assists = sum(s.assists for s in summaries)
+
+    champion_games = Counter(s.champion for s in summaries)
+    champion_wins = Counter(s.champion for s in summaries if s.win)
+    champions = [(champ, played, champion_wins[champ]) for champ, played in champion_games.most_common()]
+
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games * 100 if games else 0,
+        "kills": kills / games if games else 0,
+        "deaths": deaths / games if games else 0,
+        "assists": assists / games if games else 0,
+        "kda": (kills + assists) / max(deaths, 1),
+        "champions": champions,  # [(champion, games, wins), ...] most played first
+    }
@@ -0,0 +1,109 @@
+import json
+import time
+import asyncio
+import hashlib
+from logger import get_logger
+
+log = get_logger(__name__)
+
+EDIT_INTERVAL = 1.0  # Minimum seconds between two edits of the same message
+STATS_LOG_INTERVAL = 100  # Coalescing stats are logged every this many requested edits
+STATE_TTL = 3600  # Seconds the last edit of a message is remembered without new edits
+
+def payload_hash(payload):
+    """Hashes the keyword arguments of a message edit by their rendered Discord payload."""
+    def rendered(value):
+        if isinstance(value, (list, tuple)):
+            return [rendered(v) for v in value]
+        if hasattr(value, "to_components"):
+            return value.to_components()  # discord.ui.View
+        if hasattr(value, "to_dict"):
+            return value.to_dict()  # discord.Embed
+        return value
+
+    data = json.dumps({key: rendered(value) for key, value in payload.items()}, sort_keys=True, default=str)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+class EditCoalescer:
+    """Merges edits of the same message into at most one edit per interval.
+
+    Callers pass a render function instead of the edit itself. It is called right before the
+    edit is sent, so all state changes that arrived in the meantime end up in one edit. An edit
+    whose rendered payload equals the last one sent is skipped entirely.
+    """
+
+    def __init__(self, interval=EDIT_INTERVAL):
+        self.interval = interval
+        self.pending = {}  # message ID -> (message, render)
+        self.tasks = {}  # message ID -> task sending the pending edit
+        self.last_edit = {}  # message ID -> monotonic time of the last edit
+        self.last_hash = {}  # message ID -> payload hash of the last edit
+        self.requested = 0  # Edits asked for
+        self.sent = 0  # Edits actually sent to Discord
+        self.unchanged = 0  # Edits skipped because the payload did not change
+
+    @property
+    def saved(self):
+        """Edits that were merged into another one or skipped."""
+        return self.requested - self.sent - len(self.pending)
+
+    def request(self, message, render):
+        """Schedules an edit of a message.
+
+        Args:
+            message (discord.Message): The message to edit.
+            render (callable): Returns the keyword arguments for `message.edit`.
+        """
+        self.pending[message.id] = (message, render)
+        self.requested += 1
+        if self.requested % STATS_LOG_INTERVAL == 0:
+            log.info(self.summary())
+            self._prune()
+        if message.id not in self.tasks:
+            self.tasks[message.id] = asyncio.create_task(self._send(message.id))
+
+    def discard(self, message):
+        """Drops the pending edit and state of a message, e.g. before it is edited directly."""
+        task = self.tasks.pop(message.id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        self.pending.pop(message.id, None)
+        self.last_edit.pop(message.id, None)
+        self.last_hash.pop(message.id, None)
+
+    async def _send(self, message_id):
+        try:
+            while message_id in self.pending:
+                # The first edit goes out right away, later ones wait for the interval
+                delay = self.last_edit.get(message_id, 0) + self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                message, render = self.pending.pop(message_id)
+                try:
+                    payload = render()
+                    digest = payload_hash(payload)
+                    if digest == self.last_hash.get(message_id):
+                        self.unchanged += 1
+                        continue
+
+                    await message.edit(**payload)
+                    self.sent += 1
+                    self.last_hash[message_id] = digest
+                except Exception as e:
+                    # A failed edit must not strand the ones requested after it
+                    log.error(f"Error editing message {message_id}: {e}")
+                self.last_edit[message_id] = time.monotonic()
+        finally:
+            if self.tasks.get(message_id) is asyncio.current_task():
+                del self.tasks[message_id]
+
+    def _prune(self):
+        cutoff = time.monotonic() - STATE_TTL
+        for message_id in [m for m, at in self.last_edit.items() if at < cutoff and m not in self.tasks]:
+            del self.last_edit[message_id]
+            self.last_hash.pop(message_id, None)
+
+    def summary(self):
+        return (f"Message edits: {self.requested} requested, {self.sent} sent, {self.saved} saved "
+                f"({self.unchanged} unchanged)")
@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Request priorities, lower values are served first
+PRIORITY_INTERACTIVE = 0  # Slash commands a user is waiting for
+PRIORITY_BACKGROUND = 10  # Refreshers and watchers
+
+# Limits of a development key, used until Riot reports the real limits in the response headers
+DEFAULT_APP_LIMITS = "20:1,100:120"
+MAX_RETRIES = 3  # How often a request is retried after a 429
+DEFAULT_RETRY_AFTER = 1  # Seconds to back off when a 429 has no Retry-After header
+
+def parse_rate_limits(header):
+    """Parses a Riot rate limit header like '20:1,100:120' into [(limit, seconds), ...]."""
+    limits = []
+    for part in (header or "").split(","):
+        if ":" not in part:
+            continue
+        limit, seconds = part.split(":", 1)
+        try:
+            limits.append((int(limit), int(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+class RateWindow:
+    """Sliding window allowing `limit` requests every `seconds`."""
+
+    def __init__(self, limit, seconds):
+        self.limit = limit
+        self.seconds = seconds
+        self.timestamps = deque()  # Monotonic times of the requests inside the window
+
+    def wait_time(self, now):
+        """Returns how long to wait until one more request fits into the window."""
+        while self.timestamps and now - self.timestamps[0] >= self.seconds:
+            self.timestamps.popleft()
+        if len(self.timestamps) < self.limit:
+            return 0
+        return self.timestamps[0] + self.seconds - now
+
+    def consume(self, now):
+        self.timestamps.append(now)
+
+class RateBucket:
+    """A set of rate windows that must all allow a request, e.g. 20 per second and 100 per 2 minutes."""
+
+    def __init__(self, limits=None):
+        self.windows = [RateWindow(limit, seconds) for limit, seconds in (limits or [])]
+        self.blocked_until = 0  # Monotonic time until which a Retry-After forbids requests
+
+    def wait_time(self, now):
+        waits = [window.wait_time(now) for window in self.windows]
+        waits.append(self.blocked_until - now)
+        return max(waits)
+
+    def consume(self, now):
+        for window in self.windows:
+            window.consume(now)
+
+    def update_limits(self, limits):
+        """Replaces the windows when Riot reports different limits, keeping recorded requests."""
+        current = [(w.limit, w.seconds) for w in self.windows]
+        if not limits or limits == current:
+            return
+        old = {w.seconds: w for w in self.windows}
+        windows = []
+        for limit, seconds in limits:
+            window = RateWindow(limit, seconds)
+            if seconds in old:
+                window.timestamps = old[seconds].timestamps
+            windows.append(window)
+        self.windows = windows
+
+class RiotRateLimiter:
+    """Token buckets per region (application limit) and per region and method (method limit).
+
+    Requests wait in a priority queue per region, so interactive commands are granted before
+    background work, and a burst of commands turns into queueing latency instead of 429 errors.
+    """
+
+    def __init__(self, app_limits=DEFAULT_APP_LIMITS):
+        self.default_app_limits = parse_rate_limits(app_limits)
+        self.app_buckets = {}  # host -> RateBucket
+        self.method_buckets = {}  # (host, method) -> RateBucket
+        self.waiters = {}  # host -> list of [priority, seq, method, future]
+        self.wakeups = {}  # host -> asyncio.Event set when a new request is queued
+        self.schedulers = {}  # host -> scheduler task
+        self._seq = itertools.count()
+
+    def app_bucket(self, host):
+        if host not in self.app_buckets:
+            self.app_buckets[host] = RateBucket(self.default_app_limits)
+        return self.app_buckets[host]
+
+    def method_bucket(self, host, method):
+        key = (host, method)
+        if key not in self.method_buckets:
+            self.method_buckets[key] = RateBucket()
+        return self.method_buckets[key]
+
+    async def acquire(self, host, method, priority=PRIORITY_INTERACTIVE):
+        """Waits until a request to `method` on `host` may be sent."""
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(host, []).append([priority, next(self._seq), method, future])
+        self.wakeups.setdefault(host, asyncio.Event()).set()
+
+        scheduler = self.schedulers.get(host)
+        if scheduler is None or scheduler.done():
+            self.schedulers[host] = asyncio.create_task(self._schedule(host))
+
+        await future
+
+    async def _schedule(self, host):
+        """Grants queued requests for one host in priority order as the buckets allow."""
+        waiters = self.waiters[host]
+        wakeup = self.wakeups[host]
+        app = self.app_bucket(host)
+
+        while waiters:
+            wakeup.clear()
+            waiters[:] = [w for w in waiters if not w[3].done()]
+            waiters.sort()
+            now = time.monotonic()
+
+            delay = app.wait_time(now)
+            if delay <= 0:
+                delay = float("inf")
+                for waiter in waiters:
+                    method_bucket = self.method_bucket(host, waiter[2])
+                    method_delay = method_bucket.wait_time(now)
+                    if method_delay <= 0:
+                        app.consume(now)
+                        method_bucket.consume(now)
+                        waiters.remove(waiter)
+                        waiter[3].set_result(None)
+                        delay = 0
+                        break
+                    delay = min(delay, method_delay)
+
+            if delay > 0 and waiters:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def update(self, host, method, headers):
+        """Adopts the limits Riot reports in the response headers."""
+        app_limits = parse_rate_limits(headers.get("X-App-Rate-Limit"))
+        method_limits = parse_rate_limits(headers.get("X-Method-Rate-Limit"))
+        self.app_bucket(host).update_limits(app_limits)
+        self.method_bucket(host, method).update_limits(method_limits)
+
+    def back_off(self, host, method, headers):
+        """Blocks the bucket responsible for a 429 for the duration of its Retry-After header."""
+        try:
+            retry_after = float(headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+        except ValueError:
+            retry_after = DEFAULT_RETRY_AFTER
+        until = time.monotonic() + retry_after
+
+        limit_type = headers.get("X-Rate-Limit-Type", "application")
+        if limit_type == "method":
+            bucket = self.method_bucket(host, method)
+        else:
+            # Application limits and underlying service limits both block the whole host
+            bucket = self.app_bucket(host)
+        bucket.blocked_until = max(bucket.blocked_until, until)
+        log.warning(f"Riot rate limit hit on {host} ({method}, {limit_type}). Backing off {retry_after}s.")
+        return retry_after
+
+class RiotClient:
+    """Client for the Riot Games API that goes through the shared HttpClient and a RiotRateLimiter.
+
+    Concurrent identical requests are coalesced before they reach the rate limiter, so they
+    share one request token and one upstream call.
+    """
+
+    def __init__(self, http_client, api_key, limiter=None):
+        self.http = http_client
+        self.api_key = api_key
+        self.limiter = limiter or RiotRateLimiter()
+        self.flights = http_client.flights  # Shared with the HttpClient so savings are counted once
+
+    async def get(self, host, method, path, params=None, priority=PRIORITY_INTERACTIVE, timeout=None, cache=True):
+        """Performs a rate-limited GET request against the Riot API.
+
+        Args:
+            host (str): The API host, e.g. "euw1.api.riotgames.com".
+            method (str): Name of the API method, used for the method rate limit (e.g. "summoner-v4.by-puuid").
+            path (str): The request path, starting with a slash.
+            params (dict, optional): Query parameters.
+            priority (int, optional): PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND.
+            timeout (float, optional): Overrides the default total timeout in seconds.
+            cache (bool, optional): Set to False to bypass the response cache.
+
+        Returns:
+            HttpResponse: The response. A 429 is only returned after all retries were used up.
+        """
+        # The priority is part of the key, an interactive call must not wait in a background flight's queue
+        key = ("riot", host, path, tuple(sorted((params or {}).items())), priority, cache)
+        return await self.flights.do(key, lambda: self._get(host, method, path, params, priority, timeout, cache))
+
+    async def _get(self, host, method, path, params, priority, timeout, cache):
+        """Performs the request of get(), waiting for the rate limiter and retrying after a 429."""
+        url = f"https://{host}{path}"
+        if cache:
+            cached = await self.http.peek(url, params)
+            if cached is not None:
+                return cached
+
+        headers = {"X-Riot-Token": self.api_key}
+        for attempt in range(MAX_RETRIES + 1):
+            await self.limiter.acquire(host, method, priority)
+            # Every routing host gets its own connection pool
+            resp = await self.http.get_json(url, params=params, headers=headers, timeout=timeout, cache=cache, pool=host)
+            if resp.cached:
+                return resp
+
+            self.limiter.update(host, method, resp.headers)
+            if resp.status != 429:
+                return resp
+            self.limiter.back_off(host, method, resp.headers)
+
+        log.error(f"Riot request {method} on {host} still rate limited after {MAX_RETRIES} retries.")
+        return resp
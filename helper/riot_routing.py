@@ -0,0 +1,72 @@
+import asyncio
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Platform -> regional cluster used by match-v5
+PLATFORM_REGIONS = {
+    "euw1": "europe", "eun1": "europe", "tr1": "europe", "ru": "europe", "me1": "europe",
+    "na1": "americas", "br1": "americas", "la1": "americas", "la2": "americas",
+    "kr": "asia", "jp1": "asia",
+    "oc1": "sea", "ph2": "sea", "sg2": "sea", "th2": "sea", "tw2": "sea", "vn2": "sea",
+}
+
+DEFAULT_PLATFORM = "euw1"
+AUTO = "auto"
+AUTO_PROBE_PLATFORMS = ("euw1", "eun1", "na1", "kr", "tr1", "br1", "oc1")  # Probed concurrently in auto mode
+
+def platform_host(platform):
+    """Host for platform endpoints (summoner, league, mastery, spectator)."""
+    return f"{platform}.api.riotgames.com"
+
+def regional_host(platform):
+    """Host of the regional cluster for match endpoints."""
+    return f"{PLATFORM_REGIONS[platform]}.api.riotgames.com"
+
+def account_host(platform):
+    """Host for account endpoints, which only exist on the americas, asia and europe clusters."""
+    region = PLATFORM_REGIONS[platform]
+    return f"{'asia' if region == 'sea' else region}.api.riotgames.com"
+
+class PlatformLocator:
+    """Finds the platform an account plays on by probing likely platforms concurrently.
+
+    Every platform has its own host and therefore its own connection pool and rate limiter
+    in the RiotClient. Found platforms are remembered per PUUID.
+    """
+
+    def __init__(self, riot, candidates=AUTO_PROBE_PLATFORMS):
+        self.riot = riot
+        self.candidates = candidates
+        self.known = {}  # puuid -> platform
+
+    def remember(self, puuid, platform):
+        self.known[puuid] = platform
+
+    async def locate(self, puuid, priority=None):
+        """Returns the platform of an account, or None if it has no summoner on any candidate."""
+        if puuid in self.known:
+            return self.known[puuid]
+
+        kwargs = {"priority": priority} if priority is not None else {}
+
+        async def probe(platform):
+            resp = await self.riot.get(platform_host(platform), "summoner-v4.by-puuid", f"/lol/summoner/v4/summoners/by-puuid/{puuid}", **kwargs)
+            return platform if resp.status == 200 else None
+
+        probes = [asyncio.create_task(probe(p)) for p in self.candidates]
+        try:
+            for next_done in asyncio.as_completed(probes):
+                try:
+                    platform = await next_done
+                except Exception as e:
+                    log.warning(f"Platform probe failed: {e}")
+                    continue
+                if platform:
+                    self.known[puuid] = platform
+                    return platform
+            return None
+        finally:
+            # The first hit wins, the remaining probes are not needed anymore
+            for task in probes:
+                task.cancel()
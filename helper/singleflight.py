@@ -0,0 +1,56 @@
+import asyncio
+
+class _Call:
+    """An in-flight call shared by all callers that asked for the same key."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one shared in-flight task.
+
+    The first caller starts the work, later callers with the same key await the same task.
+    If every caller is cancelled, the shared task is cancelled too, and the key is forgotten
+    as soon as the task finishes, so the next call starts fresh.
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> _Call
+        self.saved = 0  # Number of calls answered by an already running task
+
+    async def do(self, key, func):
+        """Runs `func()` for a key, or joins the call that is already running for it.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            func (callable): Zero-argument function returning the coroutine to run.
+
+        Returns:
+            The result of the shared call. Exceptions are raised to every caller.
+        """
+        call = self.calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self.calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+        else:
+            self.saved += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # The last interested caller was cancelled, nobody needs the result anymore
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+        if not call.task.cancelled():
+            # Mark a failure as retrieved even if every caller has left already
+            call.task.exception()
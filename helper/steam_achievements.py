@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+
+SCHEMA_URL = "https://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v2/"
+PLAYER_ACHIEVEMENTS_URL = "https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v1/"
+SCHEMA_TTL = 24 * 3600  # Seconds a parsed schema is reused, achievements are rarely added
+MAX_SCHEMAS = 128  # Parsed schemas kept in memory
+
+class AchievementSchema:
+    """The achievements of one game, each with a fixed bit position."""
+
+    __slots__ = ("appid", "game_name", "api_names", "display_names", "positions")
+
+    def __init__(self, appid, data):
+        game = (data or {}).get("game", {})
+        achievements = game.get("availableGameStats", {}).get("achievements", [])
+        self.appid = appid
+        self.game_name = game.get("gameName") or str(appid)
+        self.api_names = [a["name"] for a in achievements]
+        self.display_names = [a.get("displayName") or a["name"] for a in achievements]
+        self.positions = {name: bit for bit, name in enumerate(self.api_names)}  # API name -> bit
+
+    def __len__(self):
+        return len(self.api_names)
+
+    @property
+    def all_bits(self):
+        return (1 << len(self.api_names)) - 1
+
+    def bitset(self, player_data):
+        """Turns a GetPlayerAchievements response into an int with one bit per unlocked achievement.
+
+        Returns None if the player's stats are not available (private profile or game not owned).
+        """
+        stats = (player_data or {}).get("playerstats", {})
+        if not stats.get("success"):
+            return None
+        bits = 0
+        for achievement in stats.get("achievements", []):
+            bit = self.positions.get(achievement.get("apiname"))
+            if bit is not None and achievement.get("achieved"):
+                bits |= 1 << bit
+        return bits
+
+    def bits_to_indexes(self, bits):
+        """Returns the achievement indexes of the set bits, lowest first."""
+        indexes = []
+        while bits:
+            low_bit = bits & -bits
+            indexes.append(low_bit.bit_length() - 1)
+            bits ^= low_bit
+        return indexes
+
+class SchemaCache:
+    """Parsed achievement schemas by appid, so repeated comparisons skip the schema entirely."""
+
+    def __init__(self, ttl=SCHEMA_TTL, max_entries=MAX_SCHEMAS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # appid -> (expires_at, AchievementSchema)
+
+    def get(self, appid):
+        entry = self.entries.get(appid)
+        if entry is None or time.monotonic() >= entry[0]:
+            return None
+        self.entries.move_to_end(appid)
+        return entry[1]
+
+    def put(self, schema):
+        self.entries[schema.appid] = (time.monotonic() + self.ttl, schema)
+        self.entries.move_to_end(schema.appid)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return schema
@@ -0,0 +1,275 @@
+import os
+import re
+import mmap
+import time
+import heapq
+import struct
+import asyncio
+from array import array
+from bisect import bisect_left
+from logger import get_logger
+
+log = get_logger(__name__)
+
+APP_LIST_URL = "https://api.steampowered.com/IStoreService/GetAppList/v1/"
+PAGE_SIZE = 50000  # Maximum page size of GetAppList
+CATALOG_FILE = os.path.join("data", "steam", "apps.bin")
+REFRESH_INTERVAL = 24 * 3600  # Seconds between catalog downloads
+RETRY_DELAY = 60  # Seconds before the first retry of a failed download, doubled up to REFRESH_INTERVAL
+MAX_PREFIX_TOKENS = 2000  # Tokens a prefix may expand to before the search gives up on it
+MAX_RANKED_CANDIDATES = 500  # Search matches ranked by name, the shortest names are kept beyond that
+
+# File layout, all integers little-endian:
+#   header: magic, version, app count, token count, posting count, fetch time
+#   appids[apps]              sorted appids
+#   name_offsets[apps + 1]    offsets into the name blob
+#   token_offsets[tokens + 1] offsets into the token blob, tokens sorted
+#   posting_offsets[tokens + 1]
+#   postings[postings]        app indexes containing each token
+#   name blob, token blob     UTF-8
+MAGIC = b"SAPP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIIIQ")
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(name):
+    """Splits a name into lower case word tokens."""
+    return TOKEN_PATTERN.findall(name.lower())
+
+def build_catalog(apps, fetched_at):
+    """Serializes (appid, name) pairs into the catalog file format."""
+    apps = sorted({appid: name for appid, name in apps}.items())
+
+    appids = array("I", (appid for appid, _ in apps))
+    name_offsets = array("I", [0])
+    names = bytearray()
+    postings_by_token = {}
+    for index, (_, name) in enumerate(apps):
+        names += name.encode("utf-8")
+        name_offsets.append(len(names))
+        for token in set(tokenize(name)):
+            postings_by_token.setdefault(token, []).append(index)
+
+    token_offsets = array("I", [0])
+    posting_offsets = array("I", [0])
+    tokens = bytearray()
+    postings = array("I")
+    for token in sorted(postings_by_token):
+        tokens += token.encode("utf-8")
+        token_offsets.append(len(tokens))
+        postings.extend(postings_by_token[token])
+        posting_offsets.append(len(postings))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(appids), len(postings_by_token), len(postings), int(fetched_at))
+    return b"".join((header, appids.tobytes(), name_offsets.tobytes(), token_offsets.tobytes(),
+                     posting_offsets.tobytes(), postings.tobytes(), bytes(names), bytes(tokens)))
+
+class _Tokens:
+    """Sequence view of the sorted tokens in the mapped file, for bisect."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        return self.catalog.token_count
+
+    def __getitem__(self, index):
+        return self.catalog.token(index)
+
+class CatalogFile:
+    """Read-only view of a memory-mapped catalog file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.app_count, self.token_count, posting_count, self.fetched_at = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.map.close()
+            raise ValueError(f"Unsupported Steam app catalog file {path}")
+
+        self.view = memoryview(self.map)
+        offset = HEADER.size
+
+        def section(count):
+            nonlocal offset
+            part = self.view[offset:offset + count * 4].cast("I")
+            offset += count * 4
+            return part
+
+        self.appids = section(self.app_count)
+        self.name_offsets = section(self.app_count + 1)
+        self.token_offsets = section(self.token_count + 1)
+        self.posting_offsets = section(self.token_count + 1)
+        self.postings = section(posting_count)
+        self.names_start = offset
+        self.tokens_start = offset + self.name_offsets[self.app_count]
+        self.tokens = _Tokens(self)
+
+    def close(self):
+        for part in (self.appids, self.name_offsets, self.token_offsets, self.posting_offsets, self.postings):
+            part.release()
+        self.view.release()
+        self.map.close()
+
+    def name_at(self, index):
+        start = self.names_start + self.name_offsets[index]
+        end = self.names_start + self.name_offsets[index + 1]
+        return self.map[start:end].decode("utf-8")
+
+    def token(self, index):
+        start = self.tokens_start + self.token_offsets[index]
+        end = self.tokens_start + self.token_offsets[index + 1]
+        return self.map[start:end].decode("utf-8")
+
+    def apps_with_token(self, index):
+        return set(self.postings[self.posting_offsets[index]:self.posting_offsets[index + 1]])
+
+class SteamAppCatalog:
+    """Local catalog of all Steam apps (appid and name), stored as a compact memory-mapped file.
+
+    Backs store-wide game search and appid -> name lookups without any request per query. The
+    catalog is downloaded once a day in the background.
+    """
+
+    def __init__(self, http_client, api_key, path=CATALOG_FILE):
+        self.http = http_client
+        self.api_key = api_key
+        self.path = path
+        self.file = None  # CatalogFile of the current catalog
+        self._task = None
+
+    @property
+    def loaded(self):
+        return self.file is not None
+
+    def load(self):
+        """Maps the catalog file on disk, if there is one."""
+        try:
+            catalog = CatalogFile(self.path)
+        except FileNotFoundError:
+            log.info("No local Steam app catalog yet.")
+            return False
+        except Exception as e:
+            log.error(f"Error loading Steam app catalog: {e}")
+            return False
+        old, self.file = self.file, catalog
+        if old is not None:
+            old.close()
+        log.info(f"Loaded Steam app catalog with {catalog.app_count} apps.")
+        return True
+
+    async def download(self):
+        """Downloads the full app list page by page. Returns [(appid, name), ...]."""
+        apps = []
+        last_appid = 0
+        while True:
+            params = {"key": self.api_key, "max_results": PAGE_SIZE, "last_appid": last_appid,
+                      "include_games": "true", "include_dlc": "false", "include_software": "true"}
+            resp = await self.http.get_json(APP_LIST_URL, params=params, cache=False, timeout=60)
+            if resp.status != 200:
+                raise RuntimeError(f"Failed to fetch the Steam app list. HTTP Status: {resp.status}")
+            page = resp.data.get("response", {})
+            apps.extend((app["appid"], app["name"]) for app in page.get("apps", []) if app.get("name"))
+            if not page.get("have_more_results"):
+                return apps
+            last_appid = page["last_appid"]
+
+    async def refresh(self):
+        """Downloads the app list, writes a new catalog file and maps it.
+
+        Returns:
+            bool: True if the new catalog is loaded.
+        """
+        try:
+            apps = await self.download()
+            data = await asyncio.to_thread(build_catalog, apps, time.time())
+            await asyncio.to_thread(self._write, data)
+            return self.load()
+        except Exception as e:
+            log.error(f"Error refreshing Steam app catalog: {e}")
+            return False
+
+    def _write(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def start(self):
+        """Starts the daily refresh in the background, right away if the catalog is missing or old."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        retry_delay = RETRY_DELAY
+        while True:
+            age = time.time() - self.file.fetched_at if self.file else REFRESH_INTERVAL
+            await asyncio.sleep(max(REFRESH_INTERVAL - age, 0))
+            while not await self.refresh():
+                # Back off after every failed attempt, a loaded catalog stays in use meanwhile
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, REFRESH_INTERVAL)
+            retry_delay = RETRY_DELAY
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def name(self, appid):
+        """Returns the name of an app, or None if it is not in the catalog."""
+        catalog = self.file
+        if catalog is None:
+            return None
+        index = bisect_left(catalog.appids, appid)
+        if index < catalog.app_count and catalog.appids[index] == appid:
+            return catalog.name_at(index)
+        return None
+
+    def search(self, query, limit=10):
+        """Finds apps whose name contains all words of the query, the last word as a prefix.
+
+        Returns [(appid, name), ...] with exact names first, then names starting with the query,
+        then shorter names.
+        """
+        catalog = self.file
+        query_tokens = tokenize(query)
+        if catalog is None or not query_tokens:
+            return []
+
+        *full_tokens, prefix = query_tokens
+        candidate_sets = []
+        for token in full_tokens:
+            index = bisect_left(catalog.tokens, token)
+            if index >= catalog.token_count or catalog.tokens[index] != token:
+                return []
+            candidate_sets.append(catalog.apps_with_token(index))
+
+        # The last word may still be typed, so every token starting with it counts
+        start = bisect_left(catalog.tokens, prefix)
+        end = start
+        prefixed = set()
+        while end < catalog.token_count and end - start < MAX_PREFIX_TOKENS and catalog.tokens[end].startswith(prefix):
+            prefixed |= catalog.apps_with_token(end)
+            end += 1
+        candidate_sets.append(prefixed)
+
+        candidate_sets.sort(key=len)
+        candidates = candidate_sets[0].intersection(*candidate_sets[1:])
+
+        if len(candidates) > MAX_RANKED_CANDIDATES:
+            # Exact and prefix matches are among the shortest names, which are found without decoding
+            offsets = catalog.name_offsets
+            candidates = heapq.nsmallest(MAX_RANKED_CANDIDATES, candidates, key=lambda i: offsets[i + 1] - offsets[i])
+
+        normalized_query = " ".join(query_tokens)
+        def rank(index):
+            name = catalog.name_at(index)
+            normalized = " ".join(tokenize(name))
+            return (normalized != normalized_query, not normalized.startswith(normalized_query), len(name), index)
+
+        return [(catalog.appids[i], catalog.name_at(i)) for i in heapq.nsmallest(limit, candidates, key=rank)]
@@ -0,0 +1,137 @@
+import json
+import time
+from array import array
+from collections import OrderedDict
+
+GAMES_KEY = '"games"'
+LIBRARY_TTL = 1800  # Seconds a parsed library is reused, same as the owned-games response cache
+MAX_LIBRARIES = 256  # Parsed libraries kept in memory
+_decoder = json.JSONDecoder()
+
+class OwnedGame:
+    """One game of an OwnedLibrary."""
+
+    __slots__ = ("appid", "name", "playtime_forever", "playtime_2weeks", "img_logo_url", "has_community_visible_stats")
+
+    def __init__(self, appid, name, playtime_forever, playtime_2weeks, img_logo_url, has_community_visible_stats):
+        self.appid = appid
+        self.name = name
+        self.playtime_forever = playtime_forever  # Minutes
+        self.playtime_2weeks = playtime_2weeks  # Minutes
+        self.img_logo_url = img_logo_url  # Logo image hash, or None
+        self.has_community_visible_stats = has_community_visible_stats
+
+class OwnedLibrary:
+    """The owned games of a Steam account, stored column by column.
+
+    Keeps only the fields the bot uses, with numbers in typed arrays instead of one dict per
+    game. Indexing returns an OwnedGame built on demand.
+    """
+
+    __slots__ = ("appids", "names", "playtime_forever", "playtime_2weeks", "logos", "stats_flags")
+
+    def __init__(self):
+        self.appids = array("I")
+        self.names = []
+        self.playtime_forever = array("I")
+        self.playtime_2weeks = array("I")
+        self.logos = {}  # index -> logo hash, most games have none
+        self.stats_flags = bytearray()  # 1 if the game has community visible stats
+
+    def append(self, game):
+        """Adds a game from a GetOwnedGames game object."""
+        logo = game.get("img_logo_url")
+        if logo:
+            self.logos[len(self.names)] = logo
+        self.appids.append(game["appid"])
+        self.names.append(game.get("name", ""))
+        self.playtime_forever.append(game.get("playtime_forever", 0))
+        self.playtime_2weeks.append(game.get("playtime_2weeks", 0))
+        self.stats_flags.append(1 if game.get("has_community_visible_stats") else 0)
+
+    @classmethod
+    def from_games(cls, games):
+        library = cls()
+        for game in games:
+            library.append(game)
+        return library
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        return OwnedGame(self.appids[index], self.names[index], self.playtime_forever[index], self.playtime_2weeks[index],
+                         self.logos.get(index), bool(self.stats_flags[index]))
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+class LibraryCache:
+    """Keeps the parsed OwnedLibrary of recently fetched accounts, keyed by SteamID64.
+
+    The response cache keeps owned-games bodies on disk only, so repeated lookups neither hold
+    the raw body in memory nor parse it again.
+    """
+
+    def __init__(self, ttl=LIBRARY_TTL, max_entries=MAX_LIBRARIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # steamid64 -> (expires_at, OwnedLibrary)
+
+    def get(self, steamid64):
+        entry = self.entries.get(steamid64)
+        if entry is None:
+            return None
+        expires_at, library = entry
+        if time.monotonic() >= expires_at:
+            del self.entries[steamid64]
+            return None
+        self.entries.move_to_end(steamid64)
+        return library
+
+    def put(self, steamid64, library):
+        self.entries[steamid64] = (time.monotonic() + self.ttl, library)
+        self.entries.move_to_end(steamid64)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return library
+
+def parse_owned_games(body):
+    """Parses a GetOwnedGames response body into an OwnedLibrary.
+
+    Decodes the games array one game object at a time, so the full list of game dicts never
+    exists in memory. Returns None if the body is not a GetOwnedGames response. A response
+    without games (e.g. a private profile) gives an empty library.
+    """
+    if not body:
+        return None
+    try:
+        text = body.decode("utf-8") if isinstance(body, (bytes, bytearray)) else body
+    except UnicodeDecodeError:
+        return None
+    if '"response"' not in text:
+        return None
+
+    library = OwnedLibrary()
+    key = text.find(GAMES_KEY)
+    if key < 0:
+        return library
+    position = text.find("[", key + len(GAMES_KEY))
+    if position < 0:
+        return None
+    position += 1
+
+    length = len(text)
+    try:
+        while True:
+            # Skip whitespace and separators between the game objects
+            while position < length and text[position] in " \t\r\n,":
+                position += 1
+            if position >= length:
+                return None
+            if text[position] == "]":
+                return library
+            game, position = _decoder.raw_decode(text, position)
+            library.append(game)
+    except (ValueError, KeyError, TypeError, OverflowError):
+        return None
@@ -0,0 +1,60 @@
+import time
+import asyncio
+from logger import get_logger
+
+log = get_logger(__name__)
+
+PLAYER_SUMMARIES_URL = "https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/"
+BATCH_SIZE = 100  # Maximum SteamIDs per GetPlayerSummaries request
+SUMMARY_TTL = 60  # Seconds a player summary is reused, presence changes quickly
+
+# Values of the personastate field
+PERSONA_STATES = {0: "Offline", 1: "Online", 2: "Busy", 3: "Away", 4: "Snooze", 5: "Looking to trade", 6: "Looking to play"}
+
+class PlayerSummaryCache:
+    """Fetches GetPlayerSummaries in batches of 100 SteamIDs and shares the results for a short time.
+
+    Every caller asks for the IDs it needs; only IDs without a fresh summary are requested. The
+    missing IDs are sorted before they are split into batches, so concurrent callers asking for the
+    same IDs send identical requests, which the HttpClient coalesces into one.
+    """
+
+    def __init__(self, http_client, api_key, ttl=SUMMARY_TTL):
+        self.http = http_client
+        self.api_key = api_key
+        self.ttl = ttl
+        self.summaries = {}  # steamid -> (expires_at, summary or None)
+
+    async def get(self, steamids):
+        """Returns {steamid: summary} for all given SteamIDs that Steam knows."""
+        now = time.monotonic()
+        missing = sorted({sid for sid in steamids if self.summaries.get(sid, (0, None))[0] <= now})
+        if missing:
+            batches = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+            await asyncio.gather(*(self._fetch(batch) for batch in batches))
+            self._prune()
+
+        result = {}
+        for sid in steamids:
+            summary = self.summaries.get(sid, (0, None))[1]
+            if summary is not None:
+                result[sid] = summary
+        return result
+
+    async def _fetch(self, batch):
+        params = {"key": self.api_key, "steamids": ",".join(batch)}
+        resp = await self.http.get_json(PLAYER_SUMMARIES_URL, params=params, cache=False)
+        if resp.status != 200 or resp.data is None:
+            log.warning(f"Failed to fetch {len(batch)} player summaries. HTTP Status: {resp.status}")
+            return
+
+        expires_at = time.monotonic() + self.ttl
+        found = {player["steamid"]: player for player in resp.data.get("response", {}).get("players", [])}
+        for sid in batch:
+            # Unknown IDs are remembered as None so they are not requested again right away
+            self.summaries[sid] = (expires_at, found.get(sid))
+
+    def _prune(self):
+        now = time.monotonic()
+        for sid in [sid for sid, (expires_at, _) in self.summaries.items() if expires_at <= now]:
+            del self.summaries[sid]
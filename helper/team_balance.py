@@ -0,0 +1,96 @@
+import heapq
+import random
+from bisect import bisect_left
+
+DEFAULT_SPLITS = 5  # How many of the best splits best_splits() returns
+
+def _subset_sums(ratings):
+    """Returns the rating sum of every subset of `ratings`, indexed by bitmask."""
+    sums = [0] * (1 << len(ratings))
+    for mask in range(1, len(sums)):
+        low_bit = mask & -mask
+        sums[mask] = sums[mask ^ low_bit] + ratings[low_bit.bit_length() - 1]
+    return sums
+
+def best_splits(ratings, count=DEFAULT_SPLITS):
+    """Finds the splits into two teams with the smallest difference in total rating.
+
+    Team sizes differ by at most one. The search is exact and uses meet-in-the-middle: the
+    subset sums of both halves of the player list are enumerated, and for every subset of the
+    first half the closest fitting sums of the second half are found by binary search. Only the
+    `count` nearest neighbours around the ideal sum can be among the `count` best splits, so
+    20 players need about a thousand lookups instead of 184756 combinations.
+
+    Args:
+        ratings (list[int]): The rating of each player.
+        count (int, optional): How many splits to return.
+
+    Returns:
+        list[tuple[int, list[int], list[int]]]: (difference, team A indices, team B indices)
+        for the best splits, best first.
+    """
+    n = len(ratings)
+    team_size = n // 2
+    total = sum(ratings)
+    half = n // 2
+    left, right = ratings[:half], ratings[half:]
+
+    left_sums = _subset_sums(left)
+    right_sums = _subset_sums(right)
+
+    # Subsets of the right half grouped by size, sorted by sum
+    right_by_size = [[] for _ in range(len(right) + 1)]
+    for mask, subset_sum in enumerate(right_sums):
+        right_by_size[bin(mask).count("1")].append((subset_sum, mask))
+    for group in right_by_size:
+        group.sort()
+    right_keys = [[subset_sum for subset_sum, _ in group] for group in right_by_size]
+
+    # With equal team sizes a split and its mirror image are the same split,
+    # so the first player is always put into team A
+    first_mask = 1 if n % 2 == 0 else 0
+
+    found = {}  # team A mask -> difference
+    for left_mask, left_sum in enumerate(left_sums):
+        if left_mask & first_mask != first_mask:
+            continue
+        needed = team_size - bin(left_mask).count("1")
+        if needed < 0 or needed > len(right):
+            continue
+        group = right_by_size[needed]
+        # Team A ideally sums to half the total, search around the matching right half sum
+        position = bisect_left(right_keys[needed], total / 2 - left_sum)
+        for subset_sum, right_mask in group[max(position - count, 0):position + count]:
+            found[left_mask | (right_mask << half)] = abs(total - 2 * (left_sum + subset_sum))
+
+    best = heapq.nsmallest(count, found.items(), key=lambda item: item[1])
+    return [
+        (difference, [i for i in range(n) if mask >> i & 1], [i for i in range(n) if not mask >> i & 1])
+        for mask, difference in best
+    ]
+
+def pick_split(ratings, tolerance=0, count=DEFAULT_SPLITS, rng=random):
+    """Picks a balanced split at random among the best splits.
+
+    Args:
+        ratings (list[int]): The rating of each player.
+        tolerance (int, optional): Splits whose difference is at most this much worse than the
+            best split are equally likely. 0 always picks one of the best splits.
+        count (int, optional): How many of the best splits are considered.
+        rng (random.Random, optional): Source of randomness.
+
+    Returns:
+        tuple[int, list[int], list[int]]: (difference, team A indices, team B indices)
+    """
+    # Shuffle first so players with equal ratings do not always end up on the same team
+    order = list(range(len(ratings)))
+    rng.shuffle(order)
+    splits = best_splits([ratings[i] for i in order], count)
+
+    best_difference = splits[0][0]
+    difference, team_a, team_b = rng.choice([s for s in splits if s[0] <= best_difference + tolerance])
+    team_a, team_b = [order[i] for i in team_a], [order[i] for i in team_b]
+    # Random sides, otherwise the stronger half would always be the same team
+    if rng.random() < 0.5:
+        team_a, team_b = team_b, team_a
+    return difference, team_a, team_b
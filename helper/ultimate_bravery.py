@@ -0,0 +1,291 @@
+import re
+import random
+from collections import OrderedDict
+from helper.bravery_affinity import AffinityIndex
+
+ROLES = ("TOP", "JUNGLE", "MID", "ADC", "SUPPORT")
+STARTER_ITEMS = ("Doran's Blade", "Doran's Ring", "Doran's Shield", "Cull", "Tear of the Goddess", "Corrupting Potion", "Dark Seal", "Long Sword", "Amplifying Tome", "Cloth Armor", "Sapphire Crystal")
+SUPPORT_UPGRADES = (
+    "Celestial Opposition",
+    "Solstice Sleigh",
+    "Bloodsong",
+    "Dream Maker",
+    "Zaz’Zak’s Realmspike"
+)
+JUNGLE_ITEMS = (
+    ("Mosstomper Seedling", "Mosstomper"),
+    ("Scorchclaw Pup", "Scorchclaw"),
+    ("Gustwalker Hatchling", "Gustwalker")
+)
+FIRST_SKILLS = ("Q", "W", "E")
+SMITE = "Smite"
+FULL_ITEM_GOLD = 2000  # Minimum total cost of a full item
+EXCLUDED_BOOTS = {"Slightly Magical Boots"}
+
+# Ornn Masterwork Items (should be excluded from Ultimate Bravery)
+MASTERWORK_ITEMS = {
+    "Forgefire Crest",
+    "Rimeforged Grasp",
+    "Molten Edge",
+    "Liandry's Lament",
+    "Rabadon's Deathcrown",
+    "Infinity Force",
+    "Syzygy",
+    "Dreamshatter",
+    "Shurelya's Requiem",
+    "Cry of the Shrieking City",
+    "Reliquary of the Golden Dawn",
+    "Upgraded Aeropack",
+    "The Unspoken Parasite",
+    "Starcaster",
+    "Vespertide",
+    "Bloodward",
+    "Obsidian Cleaver",
+    "Ceaseless Hunger",
+    "Typhoon",
+    "Deicide",
+    "Edge of Finality",
+    "Flicker",
+    "Heavensfall",
+    "Icathia's Curse",
+    "Leviathan",
+    "Might of the Ruined King",
+    "Sandshrike's Claw",
+    "Seat of Command",
+    "Shojin's Resolve",
+    "The Baron's Gift",
+    "Wyrmfallen Sacrifice"
+}
+
+MAX_REROLLS = 10000  # Reroll counter wraps around to keep codes short
+MAX_CACHED_LOBBIES = 64  # Semi-brave role assignments kept per pool, rerolls of a lobby reuse them
+MAX_CACHED_POOLS = 6  # Pools kept in memory, older patches are only needed for old build codes
+BUILD_CODE_PATTERN = re.compile(r"^(semi-)?(sr|aram)-(\d+(?:\.\d+)+)-([0-9a-f]{1,8})-(\d{1,3})-(\d{1,3})-(\d{1,4})$")
+
+# Game mode -> (summoner spell mode, Data Dragon map id)
+MODES = {
+    "sr": ("CLASSIC", "11"),
+    "aram": ("ARAM", "12"),
+}
+
+class RunePath:
+    """A rune path reduced to the names a build needs."""
+
+    __slots__ = ("id", "name", "keystones", "slots", "minor_runes")
+
+    def __init__(self, path):
+        self.id = path["id"]
+        self.name = path["name"]
+        self.keystones = tuple(r["name"] for r in path["slots"][0]["runes"])
+        self.slots = tuple(tuple(r["name"] for r in slot["runes"]) for slot in path["slots"][1:])
+        self.minor_runes = tuple(name for slot in self.slots for name in slot)  # Pool for secondary runes
+
+class Build:
+    """One rolled Ultimate Bravery build."""
+
+    __slots__ = ("champion", "role", "spells", "first_skill", "primary_path", "keystone", "primary_runes",
+                 "secondary_path", "secondary_runes", "starter", "items")
+
+    def __init__(self, champion, role, spells, first_skill, primary_path, keystone, primary_runes,
+                 secondary_path, secondary_runes, starter, items):
+        self.champion = champion
+        self.role = role  # None outside of Summoner's Rift
+        self.spells = spells
+        self.first_skill = first_skill
+        self.primary_path = primary_path
+        self.keystone = keystone
+        self.primary_runes = primary_runes
+        self.secondary_path = secondary_path
+        self.secondary_runes = secondary_runes
+        self.starter = starter
+        self.items = items  # Boots first, then five full items
+
+class BuildCode:
+    """Everything needed to derive a lobby build again, in a short shareable form.
+
+    The code looks like `sr-14.9.1-9f3a21c7-10-3-0`: mode, patch, lobby seed, lobby size,
+    player position and reroll count. Semi-brave builds start with `semi-`.
+    """
+
+    __slots__ = ("mode", "version", "seed", "count", "index", "reroll", "semi")
+
+    def __init__(self, mode, version, seed, count, index, reroll=0, semi=False):
+        self.semi = semi  # Only roles and items that suit the champion
+        self.mode = mode
+        self.version = version
+        self.seed = seed
+        self.count = count  # Players in the lobby
+        self.index = index  # Position of the player in the lobby
+        self.reroll = reroll
+
+    def __str__(self):
+        prefix = "semi-" if self.semi else ""
+        return f"{prefix}{self.mode}-{self.version}-{self.seed:x}-{self.count}-{self.index}-{self.reroll}"
+
+    @classmethod
+    def parse(cls, text):
+        """Parses a build code. Returns None if the text is not a valid code."""
+        match = BUILD_CODE_PATTERN.match(text.strip().lower())
+        if match is None:
+            return None
+        semi, mode, version, seed, count, index, reroll = match.groups()
+        if int(index) >= int(count):
+            return None
+        return cls(mode, version, int(seed, 16), int(count), int(index), int(reroll), semi=bool(semi))
+
+    def rerolled(self, version):
+        """Returns the code of the next reroll on the given patch."""
+        return BuildCode(self.mode, version, self.seed, self.count, self.index, (self.reroll + 1) % MAX_REROLLS,
+                         semi=self.semi)
+
+class BraveryPool:
+    """Everything a build is drawn from for one patch and game mode, computed once.
+
+    All pools are sorted tuples, so rolling a build only samples from them.
+    """
+
+    def __init__(self, patch, mode):
+        spell_mode, map_id = MODES[mode]
+        self.version = patch.version
+        self.mode = mode
+        self.champions = tuple(sorted(patch.champions))
+
+        self.spells = tuple(sorted({s["name"] for s in patch.spells if spell_mode in s["modes"]}))
+        self.jungle_spells = tuple(s for s in self.spells if s != SMITE)  # Second spell next to Smite
+
+        map_items = patch.items_by_map.get(map_id, frozenset())
+        self.boots = tuple(sorted(
+            {patch.items[i]["name"] for i in patch.items_by_tag.get("Boots", frozenset()) & map_items} - EXCLUDED_BOOTS
+        ))
+        self.full_items = tuple(sorted(
+            {patch.items[i]["name"] for i in patch.items_with_gold_at_least(FULL_ITEM_GOLD) & map_items} - MASTERWORK_ITEMS
+        ))
+
+        self.rune_paths = tuple(RunePath(path) for path in patch.runes)
+        # Primary path index -> the other paths, usable as secondary
+        self.secondary_paths = tuple(
+            tuple(p for p in self.rune_paths if p.id != primary.id) for primary in self.rune_paths
+        )
+
+        self.roles = ROLES if mode == "sr" else ()
+
+        # Inputs of the semi-brave index, which is only built once a semi-brave build is asked for
+        self._champion_tags = {c: patch.champions[c].get("tags", []) for c in self.champions}
+        full_item_names = set(self.full_items)
+        self._item_tags = {}
+        for item in patch.items.values():
+            if item["name"] in full_item_names:
+                self._item_tags.setdefault(item["name"], set()).update(item.get("tags", []))
+        self._affinity = None
+        self._lobby_roles = OrderedDict()  # lobby -> role -> champions
+
+    @property
+    def affinity(self):
+        if self._affinity is None:
+            self._affinity = AffinityIndex(self._champion_tags, self.roles, self.full_items, self._item_tags)
+        return self._affinity
+
+    def build_for(self, code):
+        """Derives the build of a build code, the same one every time.
+
+        The lobby seed shuffles the champions and deals the roles. Player i gets champion
+        i + reroll * count of that shuffle, so the players of a lobby never share a champion
+        (until the rerolls wrap around the whole pool) without knowing each other's rerolls.
+        Semi-brave builds shuffle only the champions the lobby seed gave the player's role.
+
+        Args:
+            code (BuildCode): The code of the build.
+
+        Returns:
+            Build: The build.
+        """
+        lobby = f"{code.seed}:{self.version}:{self.mode}"
+
+        role = None
+        group = code.index
+        groups = code.count
+        if self.roles:
+            # Every group of five players gets all five roles, the role survives rerolls
+            group, seat = divmod(code.index, len(self.roles))
+            groups = -(-code.count // len(self.roles))
+            role = random.Random(f"{lobby}:roles:{group}").sample(self.roles, len(self.roles))[seat]
+
+        if code.semi and role:
+            # The lobby seed gives every champion one of their roles, so the champions of
+            # different roles never overlap. Players of the same role take turns in that list.
+            candidates = list(self._roles_of_lobby(lobby)[role] or self.champions)
+            position = group + code.reroll * groups
+        else:
+            candidates = list(self.champions)
+            position = code.index + code.reroll * code.count
+
+        # Shuffle only as far as this player's position, the same steps for every player
+        position %= len(candidates)
+        champion_rng = random.Random(f"{lobby}:champions:{role}" if code.semi else f"{lobby}:champions")
+        for i in range(position + 1):
+            j = champion_rng.randrange(i, len(candidates))
+            candidates[i], candidates[j] = candidates[j], candidates[i]
+        champion = candidates[position]
+
+        return self._complete(random.Random(f"{lobby}:{code.index}:{code.reroll}"), champion, role, code.semi)
+
+    def _roles_of_lobby(self, lobby):
+        """Returns the semi-brave role -> champions assignment of a lobby."""
+        assigned = self._lobby_roles.get(lobby)
+        if assigned is None:
+            assigned = self._lobby_roles[lobby] = self.affinity.assign_roles(random.Random(f"{lobby}:semi"))
+            while len(self._lobby_roles) > MAX_CACHED_LOBBIES:
+                self._lobby_roles.popitem(last=False)
+        else:
+            self._lobby_roles.move_to_end(lobby)
+        return assigned
+
+    def _complete(self, rng, champion, role, semi=False):
+        """Rolls everything of a build besides the champion and role."""
+        if role == "JUNGLE" and SMITE in self.spells:
+            spells = (SMITE, rng.choice(self.jungle_spells))
+        else:
+            spells = tuple(rng.sample(self.spells, 2))
+
+        if semi:
+            items = (rng.choice(self.boots),) + self.affinity.items_for(champion, rng)
+        else:
+            items = (rng.choice(self.boots),) + tuple(rng.sample(self.full_items, 5))
+
+        primary_index = rng.randrange(len(self.rune_paths))
+        primary = self.rune_paths[primary_index]
+        keystone = rng.choice(primary.keystones)
+        primary_runes = tuple(rng.choice(slot) for slot in primary.slots)
+        secondary = rng.choice(self.secondary_paths[primary_index])
+        secondary_runes = tuple(rng.sample(secondary.minor_runes, 2))
+
+        if role == "SUPPORT":
+            starter = f"World Atlas → {rng.choice(SUPPORT_UPGRADES)}"
+        elif role == "JUNGLE":
+            starter = "{} → {}".format(*rng.choice(JUNGLE_ITEMS))
+        else:
+            starter = rng.choice(STARTER_ITEMS)
+
+        return Build(champion, role, spells, rng.choice(FIRST_SKILLS), primary.name, keystone, primary_runes,
+                     secondary.name, secondary_runes, starter, items)
+
+class PoolCache:
+    """BraveryPools by patch and game mode, the least recently used are dropped."""
+
+    def __init__(self, max_entries=MAX_CACHED_POOLS):
+        self.max_entries = max_entries
+        self.pools = OrderedDict()  # (version, mode) -> BraveryPool
+
+    def peek(self, version, mode):
+        pool = self.pools.get((version, mode))
+        if pool is not None:
+            self.pools.move_to_end((version, mode))
+        return pool
+
+    def get(self, patch, mode):
+        pool = self.peek(patch.version, mode)
+        if pool is None:
+            pool = self.pools[(patch.version, mode)] = BraveryPool(patch, mode)
+            while len(self.pools) > self.max_entries:
+                self.pools.popitem(last=False)
+        return pool
@@ -0,0 +1,58 @@
+import json
+import random
+from helper.steam_library import OwnedLibrary, LibraryCache, parse_owned_games
+
+def columns(library):
+    return (list(library.appids), library.names, list(library.playtime_forever), list(library.playtime_2weeks),
+            library.logos, bytes(library.stats_flags))
+
+def random_games(rng, count):
+    games = []
+    for i in range(count):
+        game = {"appid": rng.randint(10, 3_000_000), "playtime_forever": rng.randint(0, 100000),
+                "img_icon_url": "%040x" % rng.getrandbits(160), "content_descriptorids": [2, 5]}
+        if rng.random() < 0.9:
+            game["name"] = rng.choice((f"Game {i}", f"Spiel \"{i}\" – Ü", f"ゲーム {i}", "Back\\slash ]}, {[", ""))
+        if rng.random() < 0.3:
+            game["playtime_2weeks"] = rng.randint(0, 900)
+        if rng.random() < 0.5:
+            game["img_logo_url"] = "%040x" % rng.getrandbits(160)
+        if rng.random() < 0.7:
+            game["has_community_visible_stats"] = True
+        games.append(game)
+    return games
+
+def test_parse_owned_games_matches_json_loads():
+    rng = random.Random(1)
+    for count in (0, 1, 2, 50, 2000):
+        for indent in (None, 2):
+            body = json.dumps({"response": {"game_count": count, "games": random_games(rng, count)}},
+                              indent=indent, ensure_ascii=rng.random() < 0.5).encode()
+            expected = OwnedLibrary.from_games(json.loads(body)["response"]["games"])
+            assert columns(parse_owned_games(body)) == columns(expected)
+            assert columns(parse_owned_games(body.decode())) == columns(expected)
+
+def test_parse_owned_games_without_games():
+    # Private profiles answer with an empty response
+    assert len(parse_owned_games(b'{"response": {}}')) == 0
+
+def test_parse_owned_games_rejects_invalid_bodies():
+    body = json.dumps({"response": {"game_count": 2, "games": random_games(random.Random(2), 2)}}).encode()
+    for invalid in (b"", None, b"not json", b'{"error": 1}', body[:len(body) // 2], body[:-3], b"\xff\xfe",
+                    b'{"response": {"games": [{"name": "no appid"}]}}'):
+        assert parse_owned_games(invalid) is None
+
+def test_library_cache_drops_least_recently_used():
+    cache = LibraryCache(max_entries=2)
+    first, second, third = OwnedLibrary(), OwnedLibrary(), OwnedLibrary()
+    cache.put("1", first)
+    cache.put("2", second)
+    assert cache.get("1") is first
+    cache.put("3", third)
+    assert cache.get("2") is None
+    assert cache.get("1") is first and cache.get("3") is third
+
+def test_library_cache_expires():
+    cache = LibraryCache(ttl=0)
+    cache.put("1", OwnedLibrary())
+    assert cache.get("1") is None
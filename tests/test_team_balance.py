@@ -0,0 +1,60 @@
+import random
+from itertools import combinations
+from helper.team_balance import best_splits, pick_split
+
+def all_differences(ratings):
+    """Rating differences of every split into two teams, each split once, by brute force."""
+    n = len(ratings)
+    total = sum(ratings)
+    differences = []
+    for team in combinations(range(n), n // 2):
+        if n % 2 == 0 and 0 not in team:
+            continue  # The mirror image of a split that contains player 0
+        differences.append(abs(total - 2 * sum(ratings[i] for i in team)))
+    return sorted(differences)
+
+def random_ratings(rng, n):
+    # Few distinct values as well, so that many splits tie
+    high = rng.choice((5, 3200))
+    return [rng.randint(0, high) for _ in range(n)]
+
+def check_split(ratings, difference, team_a, team_b):
+    assert sorted(team_a + team_b) == list(range(len(ratings)))
+    assert abs(len(team_a) - len(team_b)) <= 1
+    assert abs(sum(ratings[i] for i in team_a) - sum(ratings[i] for i in team_b)) == difference
+
+def test_best_splits_are_the_best_of_all_splits():
+    rng = random.Random(1)
+    for n in range(2, 15):
+        for _ in range(20):
+            ratings = random_ratings(rng, n)
+            splits = best_splits(ratings)
+            assert [d for d, _, _ in splits] == all_differences(ratings)[:5]
+            for split in splits:
+                check_split(ratings, *split)
+
+def test_pick_split_returns_a_best_split():
+    rng = random.Random(2)
+    for n in range(2, 15):
+        for _ in range(20):
+            ratings = random_ratings(rng, n)
+            split = pick_split(ratings, rng=rng)
+            assert split[0] == all_differences(ratings)[0]
+            check_split(ratings, *split)
+
+def test_pick_split_stays_within_tolerance():
+    rng = random.Random(3)
+    for _ in range(200):
+        ratings = random_ratings(rng, rng.randint(2, 12))
+        best = all_differences(ratings)[0]
+        split = pick_split(ratings, tolerance=100, rng=rng)
+        assert split[0] <= best + 100
+        check_split(ratings, *split)
+
+def test_full_lobbies():
+    rng = random.Random(4)
+    for n in (16, 19, 20):
+        ratings = [rng.randint(0, 3200) for _ in range(n)]
+        split = pick_split(ratings, rng=rng)
+        assert split[0] == all_differences(ratings)[0]
+        check_split(ratings, *split)
@@ -0,0 +1,86 @@
+import random
+from collections import Counter
+from helper.ddragon import DataDragonPatch
+from helper.ultimate_bravery import BraveryPool, BuildCode, ROLES, SMITE
+
+def make_patch(rng, champions=170, items=600):
+    """A Data Dragon patch with random champions, items, spells and runes."""
+    classes = ("Fighter", "Tank", "Mage", "Assassin", "Marksman", "Support")
+    champion_data = {"data": {f"Champ{i}": {"key": str(i), "name": f"Champ {i}", "tags": rng.sample(classes, rng.randint(1, 2))}
+                              for i in range(champions)}}
+    item_tags = ("Damage", "CriticalStrike", "AttackSpeed", "OnHit", "SpellDamage", "Mana", "Health", "Armor", "SpellBlock",
+                 "AbilityHaste", "LifeSteal", "MagicPenetration", "ArmorPenetration", "Aura", "Active", "ManaRegen")
+    item_data = {}
+    for i in range(items):
+        tags = ["Boots"] if i < 12 else rng.sample(item_tags, 3)
+        gold = 1100 if i < 12 else rng.choice((300, 1200, 2500, 3000, 3200))
+        item_data[str(1000 + i)] = {"name": f"Item {i}", "tags": tags, "gold": {"total": gold}, "maps": {"11": True, "12": i % 3 != 0}}
+    spell_data = {"data": {f"S{i}": {"name": f"Spell {i}", "modes": ["CLASSIC", "ARAM"]} for i in range(9)}}
+    spell_data["data"]["SummonerSmite"] = {"name": SMITE, "modes": ["CLASSIC"]}
+    rune_data = [{"id": p, "name": f"Path {p}", "slots": [
+        {"runes": [{"name": f"Rune {p}.{s}.{r}"} for r in range(4 if s == 0 else 3)]} for s in range(4)
+    ]} for p in range(5)]
+    return DataDragonPatch("1.0.1", champion_data, {"data": item_data}, spell_data, rune_data)
+
+PATCH = make_patch(random.Random(1))
+
+def fields(build):
+    return tuple(getattr(build, name) for name in build.__slots__)
+
+def lobby(pool, seed, count, semi=False, reroll=0):
+    return [pool.build_for(BuildCode(pool.mode, pool.version, seed, count, i, reroll, semi=semi)) for i in range(count)]
+
+def test_build_code_round_trip():
+    for code in (BuildCode("sr", "14.9.1", 0x9f3a21c7, 10, 3), BuildCode("aram", "1.0.1", 0, 1, 0, 9999, semi=True)):
+        parsed = BuildCode.parse(str(code))
+        assert str(parsed) == str(code) and parsed.semi == code.semi
+    assert BuildCode.parse("sr-14.9.1-9f3a21c7-10-10-0") is None
+    assert BuildCode.parse("sr-14.9.1-xyz-10-1-0") is None
+
+def test_builds_depend_only_on_the_code():
+    first, second = BraveryPool(PATCH, "sr"), BraveryPool(PATCH, "sr")
+    for semi in (False, True):
+        builds = lobby(first, 123, 10, semi)
+        # Players derive their builds on their own, in any order
+        again = [second.build_for(BuildCode("sr", "1.0.1", 123, 10, i, semi=semi)) for i in reversed(range(10))][::-1]
+        assert [fields(b) for b in builds] == [fields(b) for b in again]
+
+def test_lobby_players_get_different_champions_and_every_role():
+    pool = BraveryPool(PATCH, "sr")
+    rng = random.Random(2)
+    for _ in range(50):
+        for semi in (False, True):
+            builds = lobby(pool, rng.getrandbits(32), 10, semi, rng.randrange(20))
+            assert len({b.champion for b in builds}) == 10
+            assert Counter(b.role for b in builds) == Counter(ROLES * 2)
+
+def test_rerolls_go_through_every_champion():
+    pool = BraveryPool(PATCH, "sr")
+    champions = [pool.build_for(BuildCode("sr", "1.0.1", 7, 1, 0, reroll)).champion for reroll in range(len(pool.champions))]
+    assert sorted(champions) == list(pool.champions)
+
+def test_builds_are_complete():
+    rng = random.Random(3)
+    for mode in ("sr", "aram"):
+        pool = BraveryPool(PATCH, mode)
+        for build in lobby(pool, rng.getrandbits(32), 10) + lobby(pool, rng.getrandbits(32), 10, semi=True):
+            assert build.items[0] in pool.boots
+            assert len(set(build.items[1:])) == 5 and set(build.items[1:]) <= set(pool.full_items)
+            assert len(set(build.spells)) == 2 and set(build.spells) <= set(pool.spells)
+            if build.role == "JUNGLE":
+                assert build.spells[0] == SMITE
+            assert (build.role is None) == (mode == "aram")
+
+def test_semi_brave_builds_suit_the_champion():
+    pool = BraveryPool(PATCH, "sr")
+    affinity = pool.affinity
+    rng = random.Random(4)
+    for _ in range(20):
+        seed = rng.getrandbits(32)
+        roles = pool._roles_of_lobby(f"{seed}:1.0.1:sr")
+        for build in lobby(pool, seed, 10, semi=True):
+            assert build.champion in roles[build.role]
+            groups = affinity.item_groups[affinity.class_key[build.champion]]
+            suitable = {item for _, items in groups for item in items}
+            if len(suitable) >= 10:
+                assert set(build.items[1:]) <= suitable